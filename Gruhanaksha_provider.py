@@ -34,6 +34,7 @@ from qgis.core import QgsProcessingProvider
 from qgis.PyQt.QtGui import QIcon
 import inspect
 from .svamitvappm_algorithm import SvamitvaPPMAlgorithm
+from .explode_segments_algorithm import ExplodeSegmentsAlgorithm
 
 
 class SvamitvaPPMProvider(QgsProcessingProvider):
@@ -56,6 +57,7 @@ class SvamitvaPPMProvider(QgsProcessingProvider):
         Loads all algorithms belonging to this provider.
         """
         self.addAlgorithm(SvamitvaPPMAlgorithm())
+        self.addAlgorithm(ExplodeSegmentsAlgorithm())
         # add additional algorithms here
         # self.addAlgorithm(MyOtherAlgorithm())
 
@@ -83,6 +83,29 @@ def rule_based_symbology(inputlayer, rules, outline_status, symbol_xml_path=None
         print(f'Error in rule_based_symbology: {e}')
 
 
+def include_shared_edge_rules(layer, field, shared_field):
+    """
+    Extend the rule filters that test a field so they also match a second field.
+
+    Used for deduplicated exploded lines, where an edge shared by two plots
+    carries the second plot's Ref_Col in another column.
+
+    :param layer: QgsVectorLayer with a rule-based renderer
+    :param field: str - field tested by the rule filters, e.g. Ref_Col
+    :param shared_field: str - field that must match as well, e.g. Ref_Col_2
+    """
+    renderer = layer.renderer()
+    if not isinstance(renderer, QgsRuleBasedRenderer):
+        return
+    quoted = f'"{field}"'
+    for rule in renderer.rootRule().descendants():
+        expression = rule.filterExpression()
+        if quoted in expression:
+            shared = expression.replace(quoted, f'"{shared_field}"')
+            rule.setFilterExpression(f'({expression}) OR ({shared})')
+    layer.triggerRepaint()
+
+
 def apply_custom_symbol(layer: QgsVectorLayer, symbol_xml_path: str, symbol_name: str) -> bool:
     """
     Applies a symbol from an XML style file to a QGIS vector layer.
@@ -123,7 +146,7 @@ def apply_custom_symbol(layer: QgsVectorLayer, symbol_xml_path: str, symbol_name
 def load_template_and_setup_atlas_with_text(
     template_path, template_name,
     coverage_layer, page_name_field,
-    text1="Label 1", text2="Label 2", text3="Label 3"
+    text1="Label 1", text2="Label 2", text3="Label 3", project=None
 ):
     """
     Loads a layout template (.qpt), sets up atlas, and adds two text items (with provided text).
@@ -135,9 +158,11 @@ def load_template_and_setup_atlas_with_text(
     :param page_name_field: str - Field name to use for atlas page name
     :param text1: str - Text to display in the first label
     :param text2: str - Text to display in the second label
+    :param project: QgsProject - project receiving the layout (default: current project)
     """
     try:
-        project = QgsProject.instance()
+        if project is None:
+            project = QgsProject.instance()
         layout_manager = project.layoutManager()
 
         # If layout with same name exists, remove it
@@ -466,13 +491,15 @@ def save_temp_layer(self, layer):
         traceback.print_exc()
 
 
-def toggle_layervisibility(layer_id, action):
+def toggle_layervisibility(layer_id, action, project=None):
+    if project is None:
+        project = QgsProject.instance()
     # Get the layer ID
     layer_id = layer_id
-    layer = QgsProject.instance().mapLayer(layer_id)
+    layer = project.mapLayer(layer_id)
     layer.commitChanges()
     # Get the layer tree root
-    root = QgsProject.instance().layerTreeRoot()
+    root = project.layerTreeRoot()
 
     # Find the layer node based on the layer ID
     layer_node = root.findLayer(layer_id)
@@ -0,0 +1,188 @@
+"""
+Duration and disk usage estimate of an atlas export.
+
+A few randomly chosen pages are exported into a temporary folder with the
+export settings chosen in the dialog (format, DPI, compression, vector or
+raster output), each one timed and measured.  The totals for every page to
+export are extrapolated from the sample mean, with a 95% confidence
+interval from Student's t distribution; the finite population correction
+narrows it as the sample covers more of the export.
+
+Samples are rendered from a clone of the layout on a worker thread.  They
+draw every layer, so an export using the static layer cache will be faster
+than estimated, and the duration with several worker processes assumes they
+scale linearly.
+"""
+
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from qgis.PyQt.QtCore import QThread, pyqtSignal
+from qgis.core import QgsLayoutExporter
+
+# Pages exported for an estimate
+SAMPLE_PAGES = 5
+
+# Two-sided 95% quantiles of Student's t distribution by degrees of freedom
+T_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571,
+        6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228}
+
+
+def extrapolate(samples, total):
+    """(estimate, low, high) of the sum over ``total`` items from a random sample
+
+    low and high are None with fewer than two samples.
+    """
+    n = len(samples)
+    mean = statistics.mean(samples)
+    if n < 2:
+        return mean * total, None, None
+    margin = T_95.get(n - 1, 1.96) * statistics.stdev(samples) / math.sqrt(n)
+    if total > 1:
+        margin *= math.sqrt(max(total - n, 0) / (total - 1))
+    return mean * total, max(mean - margin, 0) * total, (mean + margin) * total
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    if seconds < 3600:
+        return f"{seconds // 60} min {seconds % 60} s"
+    return f"{seconds // 3600} h {seconds % 3600 // 60} min"
+
+
+def format_size(size):
+    for unit in ('bytes', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'bytes' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class ExportEstimate:
+    """Timings and file sizes of the sample pages of an export
+
+    :param total_pages: int - pages the export writes
+    :param workers: int - worker processes of the export
+    """
+
+    def __init__(self, total_pages, workers=1):
+        self.total_pages = total_pages
+        self.workers = max(1, min(workers, total_pages))
+        self.pages = []
+        self.seconds = []
+        self.sizes = []
+        self.error = None
+        self.cancelled = False
+
+    def duration(self):
+        """(estimate, low, high) of the export's wall clock seconds"""
+        return tuple(value / self.workers if value is not None else None
+                     for value in extrapolate(self.seconds, self.total_pages))
+
+    def size(self):
+        """(estimate, low, high) of the bytes written"""
+        return extrapolate(self.sizes, self.total_pages)
+
+    def page_size(self):
+        """(mean bytes per page, pages measured), None without complete samples"""
+        if self.error or self.cancelled or not self.sizes:
+            return None
+        return statistics.mean(self.sizes), len(self.sizes)
+
+    def as_text(self):
+        if self.error:
+            return f"Estimate failed: {self.error}"
+        if not self.seconds:
+            return "Estimate cancelled" if self.cancelled else "No pages to estimate"
+
+        def line(label, values, formatter):
+            estimate, low, high = values
+            text = f"{label}: {formatter(estimate)}"
+            if low is not None:
+                text += f" (95%: {formatter(low)} – {formatter(high)})"
+            return text
+
+        pages = ', '.join(str(page + 1) for page in self.pages)
+        lines = [f"Estimate for {self.total_pages} pages from {len(self.seconds)} "
+                 f"sample pages ({pages}):",
+                 line("  Duration", self.duration(), format_duration),
+                 line("  Disk usage", self.size(), format_size),
+                 f"  Per page: {format_duration(statistics.mean(self.seconds))}, "
+                 f"{format_size(statistics.mean(self.sizes))}"]
+        if self.workers > 1:
+            lines.append(f"  Duration assumes {self.workers} workers scale linearly")
+        return "\n".join(lines)
+
+
+class ExportEstimateWorker(QThread):
+    """Exports and times a random sample of pages off the GUI thread
+
+    :param helper: AtlasExportWorker on a clone of the layout, with the
+        export settings to estimate; only its export methods are used
+    :param pages: list of 0-based pages the export writes
+    :param settings_digest: optional hash of the export settings, kept for the caller
+    """
+
+    estimated = pyqtSignal(object)
+
+    def __init__(self, helper, pages, sample_size=SAMPLE_PAGES, settings_digest=None):
+        super().__init__()
+        self.helper = helper
+        self.pages = list(pages)
+        self.sample_size = sample_size
+        self.settings_digest = settings_digest
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        settings = self.helper.settings
+        estimate = ExportEstimate(len(self.pages), settings.parallel_workers)
+        estimate.pages = sorted(random.sample(self.pages, min(self.sample_size, len(self.pages))))
+        try:
+            with tempfile.TemporaryDirectory(prefix='atlas_estimate_') as folder:
+                self._export_sample(estimate, folder)
+        except Exception as e:
+            estimate.error = str(e)
+        estimate.cancelled = self.cancelled
+        self.estimated.emit(estimate)
+
+    def _export_sample(self, estimate, folder):
+        settings = self.helper.settings
+        layout = self.helper.layout
+        atlas = layout.atlas() if settings.is_atlas_layout else None
+        export_settings = self.helper._create_export_settings()
+        exporter = QgsLayoutExporter(layout)
+        if atlas is not None and not atlas.beginRender():
+            estimate.error = "Failed to begin atlas rendering"
+            return
+        try:
+            for page_index in estimate.pages:
+                if self.cancelled:
+                    return
+                if atlas is not None and not atlas.seekTo(page_index):
+                    estimate.error = f"Failed to seek to page {page_index + 1}"
+                    return
+                # Own folder per page: image exports of multi-page layouts write several files
+                page_folder = os.path.join(folder, str(page_index + 1))
+                os.makedirs(page_folder)
+                filepath = os.path.join(page_folder, f"page.{settings.export_format.value}")
+                start = time.perf_counter()
+                result = self.helper._export_page(exporter, filepath, export_settings)
+                elapsed = time.perf_counter() - start
+                if result != QgsLayoutExporter.Success:
+                    estimate.error = (f"Page {page_index + 1}: "
+                                      f"{self.helper._get_export_error(result)}")
+                    return
+                estimate.seconds.append(elapsed)
+                estimate.sizes.append(sum(os.path.getsize(os.path.join(page_folder, name))
+                                          for name in os.listdir(page_folder)))
+        finally:
+            if atlas is not None:
+                atlas.endRender()
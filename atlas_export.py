@@ -2,6 +2,7 @@
 
 import os
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Optional, List
 from dataclasses import dataclass
@@ -14,18 +15,32 @@ from qgis.PyQt.QtWidgets import (
     QTextEdit, QSplitter, QFrame, QSlider, QScrollArea
 )
 from qgis.PyQt.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
-from qgis.PyQt.QtGui import QFont, QPalette, QPixmap, QIcon, QPainter
+from qgis.PyQt.QtGui import QFont, QPalette, QPixmap, QIcon, QPainter, QImage
 
 from qgis.core import (
     QgsProject, QgsLayoutManager, QgsPrintLayout, QgsLayoutExporter,
     QgsLayoutItemMap, QgsRectangle, QgsCoordinateReferenceSystem,
     QgsLayoutSize, QgsUnitTypes, QgsApplication, Qgis, QgsVectorLayer,
-    QgsLayoutRenderContext, QgsMapSettings, QgsFeatureRequest
+    QgsLayoutRenderContext, QgsMapSettings, QgsFeatureRequest, QgsFeedback,
+    QgsVectorLayerFeatureSource
 )
 from qgis.PyQt.QtWidgets import *
-from qgis.gui import QgsMessageBar
+from qgis.gui import QgsMessageBar, QgsCheckableComboBox
 from qgis.utils import iface
 
+from .atlas_estimate import ExportEstimateWorker
+from .atlas_filenames import (
+    SYNC_CHECK_LIMIT, FilenameCheckWorker, check_filenames, resolve_filename
+)
+from .atlas_index import atlas_index
+from .atlas_manifest import (
+    MANIFEST_FILE, ExportManifest, feature_hash, feature_key, page_content_hash, settings_hash
+)
+from .atlas_parallel import ParallelAtlasExport
+from .atlas_pdf import merge_pdfs
+from .atlas_preview import AtlasPreviewManager
+from .atlas_render_cache import StaticLayerCache, set_static, static_layer_ids
+
 
 class ExportFormat(Enum):
     PDF = "pdf"
@@ -39,6 +54,8 @@ class ExportMode(Enum):
     ALL = "all"
     CUSTOM = "custom"
     SINGLE = "single"
+    # All pages, rendering only those whose content changed since the last export
+    CHANGED = "changed"
 
 
 @dataclass
@@ -64,6 +81,16 @@ class ExportSettings:
     pdf_image_compression: str = "Lossy (JPEG)"
     pdf_jpeg_quality: int = 90
     png_tiff_compression: int = 6
+    # Atlas pages are split across this many worker processes when > 1
+    parallel_workers: int = 1
+    # Skip pages whose output in the export manifest is still valid
+    resume: bool = False
+    # Store each page's content hash so a later changed-only export can skip it
+    record_page_content: bool = False
+    # PDF only: write the pages into one <layout name>.pdf
+    combined_pdf: bool = False
+    # Ids of layers drawn from a pre-rendered cache instead of on every page
+    static_layers: Optional[List[str]] = None
 
 
 class SimplePreviewGenerator:
@@ -107,7 +134,7 @@ class SimplePreviewGenerator:
 
             # FIXED: Safe feature retrieval
             feature = SimplePreviewGenerator._get_safe_feature_at_index(
-                coverage_layer, page_index)
+                coverage_layer, page_index, atlas)
 
             info = f"ATLAS PAGE {page_index + 1} of {total_pages}\n"
             info += f"Layout: {layout.name()}\n"
@@ -168,9 +195,9 @@ class SimplePreviewGenerator:
             pass
 
         try:
-            # Method 3: Manual count
-            features = list(coverage_layer.getFeatures())
-            return len(features)
+            # Method 3: Cached atlas page index (filtered, id-only)
+            if atlas:
+                return atlas_index(atlas.layout()).count()
         except Exception:
             pass
 
@@ -186,8 +213,8 @@ class SimplePreviewGenerator:
         return 0
 
     @staticmethod
-    def _get_safe_feature_at_index(coverage_layer, index: int):
-        """Safely get feature at specific index with better error handling"""
+    def _get_safe_feature_at_index(coverage_layer, index: int, atlas=None):
+        """Safely get the feature of a page, through the atlas page index when available"""
         if not coverage_layer or not coverage_layer.isValid():
             return None
 
@@ -195,19 +222,18 @@ class SimplePreviewGenerator:
             return None
 
         try:
-            # Method 1: Get all features and index
-            features = list(coverage_layer.getFeatures())
-            if index < len(features):
-                return features[index]
+            if atlas:
+                return atlas_index(atlas.layout()).feature(index)
         except Exception:
             pass
 
         try:
-            # Method 2: Use feature request with limit
-            request = QgsFeatureRequest()
-            features = list(coverage_layer.getFeatures(request))
-            if index < len(features):
-                return features[index]
+            # Without an atlas, the index-th feature in provider order
+            request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+            request.setNoAttributes()
+            for position, feature in enumerate(coverage_layer.getFeatures(request)):
+                if position == index:
+                    return coverage_layer.getFeature(feature.id())
         except Exception:
             pass
 
@@ -216,25 +242,29 @@ class SimplePreviewGenerator:
     @staticmethod
     def generate_simple_preview_image(layout: QgsPrintLayout, page_index: int = 0, is_atlas: bool = True) -> QPixmap:
         """Render an actual preview image of the layout/atlas page"""
-        try:
-            from qgis.PyQt.QtGui import QImage, QPainter
-            from qgis.PyQt.QtCore import QSize, QRectF
+        return QPixmap.fromImage(SimplePreviewGenerator.render_preview_image(
+            layout, page_index, is_atlas))
 
+    @staticmethod
+    def render_preview_image(layout: QgsPrintLayout, page_index: int = 0, is_atlas: bool = True,
+                             size: Optional[QSize] = None) -> QImage:
+        """Render a layout/atlas page into a QImage; safe to call off the GUI thread"""
+        from qgis.PyQt.QtCore import QRectF
+
+        size = size or QSize(800, 600)
+        try:
             exporter = QgsLayoutExporter(layout)
-            size = QSize(800, 600)
             image = QImage(size, QImage.Format_ARGB32)
             image.fill(Qt.white)
 
             if is_atlas:
                 atlas = layout.atlas()
                 if not atlas.enabled() or not atlas.coverageLayer():
-                    pm = QPixmap(size)
-                    pm.fill(Qt.white)
-                    painter = QPainter(pm)
+                    painter = QPainter(image)
                     painter.drawText(QRectF(0, 0, size.width(), size.height(
                     )), Qt.AlignCenter, "Atlas not configured")
                     painter.end()
-                    return pm
+                    return image
 
                 if not atlas.beginRender():
                     raise Exception("Could not begin atlas rendering")
@@ -259,17 +289,20 @@ class SimplePreviewGenerator:
                 if result not in (None, QgsLayoutExporter.Success):
                     raise Exception(f"Render error code {result}")
 
-            return QPixmap.fromImage(image)
+            return image
 
         except Exception as e:
-            pm = QPixmap(800, 600)
-            pm.fill(Qt.white)
-            painter = QPainter(pm)
-            from qgis.PyQt.QtCore import QRectF
-            painter.drawText(QRectF(0, 0, 800, 600),
+            image = QImage(size, QImage.Format_ARGB32)
+            image.fill(Qt.white)
+            painter = QPainter(image)
+            painter.drawText(QRectF(0, 0, size.width(), size.height()),
                              Qt.AlignCenter, f"Preview Error:\n{str(e)}")
             painter.end()
-            return pm
+            return image
+
+
+class AtlasPageError(Exception):
+    """An atlas page could not be seeked to or exported"""
 
 
 class AtlasExportWorker(QThread):
@@ -278,12 +311,20 @@ class AtlasExportWorker(QThread):
     progress_updated = pyqtSignal(int, str)
     export_finished = pyqtSignal(bool, str)
     page_exported = pyqtSignal(int, str)
+    page_skipped = pyqtSignal(int, str)
 
     def __init__(self, layout: QgsPrintLayout, settings: ExportSettings):
         super().__init__()
         self.layout = layout
         self.settings = settings
         self.cancelled = False
+        # Parallel workers read the layout from the saved project file
+        self.project_path = QgsProject.instance().fileName()
+        self._settings_digest = None
+        # Feedback of a streamed combined PDF export, for cancel()
+        self._feedback = None
+        # Static layer cache in use while pages are exported
+        self._static_cache = None
 
     def run(self):
         """Execute the export process"""
@@ -311,59 +352,214 @@ class AtlasExportWorker(QThread):
 
             os.makedirs(self.settings.output_dir, exist_ok=True)
 
+            static_cache = self._build_static_cache(atlas, pages_to_export)
+            if self.cancelled:
+                self.export_finished.emit(False, "Export cancelled")
+                return
+
+            if self.settings.parallel_workers > 1 and total_pages > 1:
+                if self._export_parallel(pages_to_export):
+                    return
+                self.progress_updated.emit(
+                    0, "No Python interpreter found for worker processes; exporting in one thread")
+
+            if self._streams_combined_pdf():
+                with self._static_cache_applied(static_cache):
+                    self._export_combined_pdf(atlas, export_settings)
+                return
+
             exported_files = []
+            page_files = []
+            skipped = 0
             exporter = QgsLayoutExporter(self.layout)
+            manifest = self._open_manifest()
 
             # Begin atlas rendering once
             if not atlas.beginRender():
+                manifest.close()
                 self.export_finished.emit(
                     False, "Failed to begin atlas rendering")
                 return
 
             try:
-                for i, page_index in enumerate(pages_to_export):
-                    if self.cancelled:
-                        break
-
-                    # Seek to the specific feature/page
-                    if not atlas.seekTo(page_index):
-                        self.export_finished.emit(
-                            False, f"Failed to seek to page {page_index + 1}")
-                        return
-
-                    # Generate filename
-                    filename = self._generate_filename(page_index, atlas)
-                    filepath = os.path.join(self.settings.output_dir, filename)
-
-                    # Export page
-                    result = self._export_page(
-                        exporter, filepath, export_settings)
-
-                    if result == QgsLayoutExporter.Success:
-                        exported_files.append(filepath)
-                        self.page_exported.emit(page_index + 1, filename)
-                    else:
-                        self.export_finished.emit(
-                            False, f"Failed to export page {page_index + 1}: {self._get_export_error(result)}"
-                        )
-                        return
-
-                    progress = int((i + 1) * 100 / total_pages)
-                    self.progress_updated.emit(
-                        progress, f"Exported {i + 1}/{total_pages} pages")
+                with self._static_cache_applied(static_cache):
+                    for i, page_index in enumerate(pages_to_export):
+                        if self.cancelled:
+                            break
+
+                        try:
+                            filename, up_to_date = self._export_atlas_page(
+                                exporter, export_settings, atlas, page_index, manifest)
+                        except AtlasPageError as e:
+                            self.export_finished.emit(False, str(e))
+                            return
+
+                        page_files.append(filename)
+                        if up_to_date:
+                            skipped += 1
+                            self.page_skipped.emit(page_index + 1, filename)
+                        else:
+                            exported_files.append(filename)
+                            self.page_exported.emit(page_index + 1, filename)
+
+                        progress = int((i + 1) * 100 / total_pages)
+                        self.progress_updated.emit(
+                            progress, f"Exported {i + 1}/{total_pages} pages")
             finally:
                 atlas.endRender()
+                manifest.close()
 
-            if not self.cancelled:
-                self.export_finished.emit(
-                    True, f"Successfully exported {len(exported_files)} pages")
-            else:
-                self.export_finished.emit(
-                    False, f"Export cancelled. {len(exported_files)} pages were exported before cancellation.")
+            self._finish_atlas_export(page_files, len(exported_files), skipped)
 
         except Exception as e:
             self.export_finished.emit(False, f"Export failed: {str(e)}")
 
+    def _static_layer_cache(self) -> Optional[StaticLayerCache]:
+        if not self.settings.static_layers:
+            return None
+        return StaticLayerCache(self.layout, self.settings.static_layers,
+                                self.settings.dpi, self.settings.output_dir)
+
+    def _build_static_cache(self, atlas, pages_to_export) -> Optional[StaticLayerCache]:
+        """Render the static layers once for all pages; None if they are not cached"""
+        cache = self._static_layer_cache()
+        if cache is None:
+            return None
+        if not atlas.beginRender():
+            return None
+        try:
+            built = cache.build(atlas, pages_to_export, self.progress_updated.emit,
+                                lambda: self.cancelled)
+        finally:
+            atlas.endRender()
+        if not built or not cache.load():
+            return None
+        return cache
+
+    def _static_cache_applied(self, cache: Optional[StaticLayerCache]):
+        self._static_cache = cache
+        return cache.applied() if cache is not None else nullcontext()
+
+    def _open_manifest(self) -> ExportManifest:
+        """Open the output folder's export manifest for this layout and settings"""
+        self._settings_digest = settings_hash(self.layout.name(), self.settings)
+        return ExportManifest(self.settings.output_dir)
+
+    def _export_atlas_page(self, exporter, export_settings, atlas, page_index: int,
+                           manifest: ExportManifest):
+        """Seek to, name and export one atlas page and record it in the manifest
+
+        :returns: (filename, True if the existing output was up to date and kept)
+        :raises AtlasPageError: if the page cannot be seeked to or exported
+        """
+        if not atlas.seekTo(page_index):
+            raise AtlasPageError(f"Failed to seek to page {page_index + 1}")
+
+        filename = self._generate_filename(page_index, atlas)
+        filepath = os.path.join(self.settings.output_dir, filename)
+
+        feature = atlas.layout().reportContext().feature()
+        key, digest = feature_key(feature), feature_hash(feature)
+        content = None
+        # Reads every feature drawn on the page, so only when a changed-only export needs it
+        if self.settings.export_mode == ExportMode.CHANGED or self.settings.record_page_content:
+            content = page_content_hash(
+                atlas.layout(), feature,
+                self._static_cache.layers_for if self._static_cache is not None else None)
+        if self.settings.export_mode == ExportMode.CHANGED:
+            if manifest.is_current(key, self._settings_digest, digest, filepath, content):
+                return filename, True
+        elif self.settings.resume and manifest.is_current(
+                key, self._settings_digest, digest, filepath):
+            return filename, True
+
+        result = self._export_page(exporter, filepath, export_settings)
+        if result != QgsLayoutExporter.Success:
+            raise AtlasPageError(
+                f"Failed to export page {page_index + 1}: {self._get_export_error(result)}")
+        manifest.record(key, page_index + 1, self._settings_digest, digest, filepath, content)
+        return filename, False
+
+    def _export_parallel(self, pages_to_export) -> bool:
+        """Export the pages on worker processes; False if they cannot be started"""
+        if not self.project_path:
+            self.export_finished.emit(
+                False, "Save the project before exporting with several worker processes")
+            return True
+
+        parallel = ParallelAtlasExport(
+            self, self.project_path, self.layout.name())
+        if not parallel.run(pages_to_export):
+            return False
+
+        page_files = [parallel.files[page_index + 1] for page_index in pages_to_export
+                      if page_index + 1 in parallel.files]
+        self._finish_atlas_export(
+            page_files, parallel.exported, parallel.skipped, parallel.error)
+        return True
+
+    def _finish_atlas_export(self, page_files, exported: int, skipped: int, error=None):
+        """Combine the page PDFs if requested and report the outcome"""
+        skipped_text = f", {skipped} up to date pages skipped" if skipped else ""
+        if error:
+            self.export_finished.emit(
+                False, f"{error}. {exported} pages were exported{skipped_text}.")
+            return
+        if self.cancelled:
+            self.export_finished.emit(
+                False, f"Export cancelled. {exported} pages were exported before cancellation{skipped_text}.")
+            return
+
+        message = f"Successfully exported {exported} pages{skipped_text}"
+        if self.settings.combined_pdf and self.settings.export_format == ExportFormat.PDF:
+            self.progress_updated.emit(100, "Combining pages into one PDF")
+            output_dir = self.settings.output_dir
+            try:
+                combined = merge_pdfs([os.path.join(output_dir, filename) for filename in page_files],
+                                      self._combined_pdf_path())
+            except Exception as e:
+                self.export_finished.emit(
+                    False, f"{message}, but combining them failed: {str(e)}")
+                return
+            message += f" and combined them into {os.path.basename(combined)}"
+        self.export_finished.emit(True, message)
+
+    def _combined_pdf_path(self) -> str:
+        name = "".join(c for c in self.layout.name() if c.isalnum() or c in "._- ")
+        return os.path.join(self.settings.output_dir, f"{name or 'atlas'}.pdf")
+
+    def _streams_combined_pdf(self) -> bool:
+        """True if the combined PDF can be rendered directly, without page files"""
+        return (self.settings.combined_pdf
+                and self.settings.export_format == ExportFormat.PDF
+                and self.settings.export_mode == ExportMode.ALL
+                and not self.settings.resume)
+
+    def _export_combined_pdf(self, atlas, export_settings):
+        """Render every atlas page straight into one PDF, a page at a time"""
+        filepath = self._combined_pdf_path()
+        filename = os.path.basename(filepath)
+        total_pages = atlas.count()
+        self._feedback = QgsFeedback()
+        self._feedback.progressChanged.connect(
+            lambda progress: self.progress_updated.emit(
+                int(progress), f"Rendered {int(progress * total_pages / 100)}/{total_pages} pages"))
+        try:
+            result, error = QgsLayoutExporter.exportToPdf(
+                atlas, filepath, export_settings, self._feedback)
+        finally:
+            self._feedback = None
+
+        if result == QgsLayoutExporter.Success:
+            self.page_exported.emit(total_pages, filename)
+            self.export_finished.emit(
+                True, f"Successfully exported {total_pages} pages into {filename}")
+        elif self.cancelled or result == QgsLayoutExporter.Canceled:
+            self.export_finished.emit(False, "Export cancelled")
+        else:
+            self.export_finished.emit(
+                False, f"Failed to export {filename}: {error or self._get_export_error(result)}")
+
     def _export_single_layout(self):
         """Export a single non-atlas layout"""
         try:
@@ -403,6 +599,8 @@ class AtlasExportWorker(QThread):
     def cancel(self):
         """Cancel the export process"""
         self.cancelled = True
+        if self._feedback is not None:
+            self._feedback.cancel()
 
     def _create_export_settings(self):
         """Create appropriate export settings based on format"""
@@ -498,7 +696,7 @@ class AtlasExportWorker(QThread):
         if total_pages <= 0:
             return []
 
-        if self.settings.export_mode == ExportMode.ALL:
+        if self.settings.export_mode in (ExportMode.ALL, ExportMode.CHANGED):
             return list(range(total_pages))
         elif self.settings.export_mode == ExportMode.CUSTOM:
             # custom_pages are 1-based from UI; convert and clamp
@@ -511,32 +709,32 @@ class AtlasExportWorker(QThread):
 
         return []
 
+    def _placeholder_fields(self, coverage_layer) -> List[str]:
+        """Coverage layer fields used as placeholders in the filename pattern"""
+        pattern = self.settings.filename_pattern
+        return [field.name() for field in coverage_layer.fields()
+                if "{" + field.name() + "}" in pattern]
+
+    def _page_values(self, atlas, field_names) -> Optional[dict]:
+        """Placeholder values of the current atlas feature; the atlas must be on the page"""
+        # After seekTo() the layout's report context holds the page's feature
+        feature = atlas.layout().reportContext().feature()
+        if not feature.isValid():
+            return None
+        if all(feature.fieldNameIndex(name) >= 0 for name in field_names):
+            return {name: feature[name] for name in field_names}
+        return atlas_index(atlas.layout()).values(feature.id(), field_names)
+
     def _generate_filename(self, page_index: int, atlas=None) -> str:
         """Generate filename for the current page"""
-        filename = self.settings.filename_pattern
-        filename = filename.replace("{page}", str(page_index + 1).zfill(3))
-        filename = filename.replace("{index}", str(page_index))
-
+        values = None
         if atlas and self.settings.is_atlas_layout:
             coverage_layer = atlas.coverageLayer()
-            feature = None
+            field_names = self._placeholder_fields(coverage_layer) if coverage_layer else []
+            values = self._page_values(atlas, field_names) if field_names else None
 
-            if coverage_layer:
-                features = list(coverage_layer.getFeatures())
-                if page_index < len(features):
-                    feature = features[page_index]
-
-            if feature and feature.isValid() and coverage_layer:
-                for field in coverage_layer.fields():
-                    placeholder = "{" + field.name() + "}"
-                    if placeholder in filename:
-                        value = str(feature[field.name()])
-                        value = "".join(
-                            c for c in value if c.isalnum() or c in "._- ")
-                        filename = filename.replace(placeholder, value)
-
-        filename += f".{self.settings.export_format.value}"
-        return filename
+        return resolve_filename(self.settings.filename_pattern, page_index, values,
+                                self.settings.export_format.value)
 
     def _export_page(self, exporter, filepath, export_settings):
         """Export a single page"""
@@ -572,12 +770,21 @@ class EnhancedAtlasExportDialog(QDialog):
         super().__init__(parent)
         self.current_layout = None
         self.export_worker = None
+        self.filename_check = None
+        self.estimate_worker = None
+        # settings hash -> (mean bytes, pages) of the sample pages of the last estimate
+        self.sample_page_sizes = {}
         self.is_atlas_layout = False
         self.setWindowTitle("Enhanced Atlas Export Tool")
 
         self.setMinimumSize(800, 600)
         self.resize(900, 700)
 
+        # Preview images are rendered on a worker thread and cached
+        self.preview_manager = AtlasPreviewManager(
+            SimplePreviewGenerator.render_preview_image, self)
+        self.preview_manager.preview_ready.connect(self.show_preview_pixmap)
+
         self.setup_ui()
         self.load_layouts()
 
@@ -694,15 +901,21 @@ class EnhancedAtlasExportDialog(QDialog):
         self.single_radio = QRadioButton("Export Single Layout")
         self.all_radio = QRadioButton("Export All Pages")
         self.custom_radio = QRadioButton("Export Custom Pages")
+        self.changed_radio = QRadioButton("Export Changed Pages Only")
+        self.changed_radio.setToolTip(
+            "Render only pages whose plot, or the features drawn around it,\n"
+            "changed since the last export to this folder.")
         self.all_radio.setChecked(True)
 
         self.mode_group.addButton(self.all_radio, 0)
         self.mode_group.addButton(self.custom_radio, 1)
         self.mode_group.addButton(self.single_radio, 2)
+        self.mode_group.addButton(self.changed_radio, 3)
 
         mode_layout.addWidget(self.single_radio)
         mode_layout.addWidget(self.all_radio)
         mode_layout.addWidget(self.custom_radio)
+        mode_layout.addWidget(self.changed_radio)
 
         self.custom_radio.toggled.connect(
             lambda checked: self.custom_pages_edit.setEnabled(checked and self.is_atlas_layout))
@@ -859,11 +1072,55 @@ class EnhancedAtlasExportDialog(QDialog):
         )
         advanced_layout.addWidget(self.pdf_jpeg_quality_value, 4, 2)
 
+        # Atlas pages can be rendered by several processes at once
+        advanced_layout.addWidget(QLabel("Worker processes:"), 5, 0)
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, os.cpu_count() or 1)
+        self.workers_spin.setValue(1)
+        self.workers_spin.setMaximumWidth(80)
+        self.workers_spin.setToolTip(
+            "Split atlas pages across this many processes.\n"
+            "Each process reads the saved project, so save it first.")
+        advanced_layout.addWidget(self.workers_spin, 5, 1)
+
+        self.resume_check = QCheckBox("Resume previous export")
+        self.resume_check.setToolTip(
+            "Skip pages already exported to this folder with the same settings\n"
+            "whose coverage feature has not changed since.")
+        advanced_layout.addWidget(self.resume_check, 6, 0, 1, 2)
+
+        self.record_content_check = QCheckBox("Record page contents")
+        self.record_content_check.setToolTip(
+            "Store what every page shows in the export manifest, so a later\n"
+            "\"Export Changed Pages Only\" can skip the pages that did not change.\n"
+            "Changed-only exports always record it; other exports read every\n"
+            "feature drawn on each page to do so.")
+        advanced_layout.addWidget(self.record_content_check, 6, 2)
+
+        self.combined_pdf_check = QCheckBox("Combine pages into one PDF")
+        self.combined_pdf_check.setToolTip(
+            "Write the pages into a single PDF named after the layout.\n"
+            "Custom, resumed, changed-only and multi-process exports keep the\n"
+            "per-page PDFs as well and merge them (needs the pypdf module).")
+        advanced_layout.addWidget(self.combined_pdf_check, 7, 0, 1, 2)
+
+        # Layers that look the same on every page are rendered once and cached
+        advanced_layout.addWidget(QLabel("Static layers:"), 8, 0)
+        self.static_layers_combo = QgsCheckableComboBox()
+        self.static_layers_combo.setToolTip(
+            "Layers drawn identically on every page (boundary, all plots, plinths).\n"
+            "They are rendered once at the export DPI and reused on each page.\n"
+            "Their labels are not drawn.")
+        self.static_layers_combo.checkedItemsChanged.connect(
+            lambda _: self.on_static_layers_changed())
+        advanced_layout.addWidget(self.static_layers_combo, 8, 1, 1, 2)
+
         # Toggle visibility based on format and settings
         def update_pdf_controls():
             is_pdf = self.format_combo.currentText().upper() == "PDF"
             self.pdf_compress_label.setVisible(is_pdf)
             self.pdf_compress_combo.setVisible(is_pdf)
+            self.combined_pdf_check.setVisible(is_pdf)
             lossy = (self.pdf_compress_combo.currentText(
             ).lower().startswith("lossy"))
             self.pdf_jpeg_quality_label.setVisible(is_pdf and lossy)
@@ -935,7 +1192,7 @@ class EnhancedAtlasExportDialog(QDialog):
         preview_controls.addWidget(self.preview_page_spin)
 
         self.refresh_preview_btn = QPushButton("Refresh")
-        self.refresh_preview_btn.clicked.connect(self.update_preview_info)
+        self.refresh_preview_btn.clicked.connect(self.refresh_preview)
         self.refresh_preview_btn.setMaximumWidth(70)
         self.refresh_preview_btn.setMaximumHeight(28)
         preview_controls.addWidget(self.refresh_preview_btn)
@@ -965,6 +1222,23 @@ class EnhancedAtlasExportDialog(QDialog):
         self.preview_info.setPlainText("Select a layout")
         preview_layout.addWidget(self.preview_info)
 
+        # Duration and disk usage estimate from a few sample pages
+        estimate_row = QHBoxLayout()
+        estimate_row.setSpacing(4)
+        self.estimate_btn = QPushButton("Estimate Export")
+        self.estimate_btn.setToolTip(
+            "Export a few random pages with the current settings to a temporary folder\n"
+            "and extrapolate the duration and disk usage of the whole export")
+        self.estimate_btn.clicked.connect(self.estimate_export)
+        estimate_row.addWidget(self.estimate_btn)
+        estimate_row.addStretch()
+        preview_layout.addLayout(estimate_row)
+
+        self.estimate_label = QLabel("")
+        self.estimate_label.setWordWrap(True)
+        self.estimate_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        preview_layout.addWidget(self.estimate_label)
+
         # Show/hide container based on checkbox
         self.preview_checkbox.toggled.connect(
             self.preview_container.setVisible)
@@ -995,8 +1269,28 @@ class EnhancedAtlasExportDialog(QDialog):
 
         return panel
 
+    def load_static_layers(self):
+        """List the project's map layers, checking those marked static"""
+        project = QgsProject.instance()
+        static_ids = static_layer_ids(project)
+        self.static_layers_combo.blockSignals(True)
+        self.static_layers_combo.clear()
+        for layer in project.mapLayers().values():
+            self.static_layers_combo.addItem(layer.name(), layer.id())
+            self.static_layers_combo.setItemCheckState(
+                self.static_layers_combo.count() - 1,
+                Qt.Checked if layer.id() in static_ids else Qt.Unchecked)
+        self.static_layers_combo.blockSignals(False)
+
+    def on_static_layers_changed(self):
+        """Store the static mark on the layers so it is saved with the project"""
+        checked = set(self.static_layers_combo.checkedItemsData())
+        for layer in QgsProject.instance().mapLayers().values():
+            set_static(layer, layer.id() in checked)
+
     def load_layouts(self):
         """Load available print layouts with proper initialization"""
+        self.load_static_layers()
         self.layout_combo.clear()
         project = QgsProject.instance()
         layout_manager = project.layoutManager()
@@ -1083,8 +1377,8 @@ class EnhancedAtlasExportDialog(QDialog):
                 "Atlas configured but not enabled.\nClick 'Enable Atlas' to activate.")
 
         elif is_enabled and has_coverage_layer:
-            # Atlas is enabled and has coverage layer
-            count = self._get_safe_feature_count_from_layer(coverage_layer)
+            # Atlas is enabled and has coverage layer; count pages after the atlas filter
+            count = atlas_index(layout).count()
             layer_name = coverage_layer.name()
 
             self.atlas_info_label.setText(
@@ -1152,9 +1446,10 @@ class EnhancedAtlasExportDialog(QDialog):
             pass
 
         try:
-            # Method 2: Count features manually
-            count = len(list(layer.getFeatures()))
-            return count
+            # Method 2: Count feature ids, without geometry or attributes
+            request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+            request.setNoAttributes()
+            return sum(1 for _ in layer.getFeatures(request))
         except Exception:
             pass
 
@@ -1201,6 +1496,7 @@ class EnhancedAtlasExportDialog(QDialog):
             self.single_radio.setEnabled(False)
             self.all_radio.setEnabled(True)
             self.custom_radio.setEnabled(True)
+            self.changed_radio.setEnabled(True)
 
             # If single page was selected, switch to "All Pages"
             if self.single_radio.isChecked():
@@ -1219,6 +1515,7 @@ class EnhancedAtlasExportDialog(QDialog):
             self.single_radio.setEnabled(True)
             self.all_radio.setEnabled(False)
             self.custom_radio.setEnabled(False)
+            self.changed_radio.setEnabled(False)
 
             # Force single page selection for regular layouts
             self.single_radio.setChecked(True)
@@ -1343,9 +1640,17 @@ class EnhancedAtlasExportDialog(QDialog):
             return
 
         page_index = self.preview_page_spin.value() - 1
-        pixmap = SimplePreviewGenerator.generate_simple_preview_image(
-            self.current_layout, page_index, self.is_atlas_layout
-        )
+        target_size = self.preview_label.size() - QSize(20, 20)
+        pixmap = self.preview_manager.request(
+            self.current_layout, page_index, self.is_atlas_layout, target_size,
+            self.preview_page_spin.maximum())
+        if pixmap is not None:
+            self.show_preview_pixmap(pixmap)
+        else:
+            self.preview_label.setText(f"Rendering page {page_index + 1}...")
+
+    def show_preview_pixmap(self, pixmap: QPixmap):
+        """Show a rendered preview image"""
         if not pixmap.isNull():
             target_size = self.preview_label.size() - QSize(20, 20)
             scaled_pixmap = pixmap.scaled(
@@ -1358,6 +1663,22 @@ class EnhancedAtlasExportDialog(QDialog):
         else:
             self.preview_label.setText("Could not generate preview image")
 
+    def refresh_preview(self):
+        """Re-render the preview, discarding cached pages"""
+        self.preview_manager.invalidate()
+        self.update_preview_info()
+
+    def done(self, result):
+        """Stop the preview, filename check and estimate threads with the dialog"""
+        self.preview_manager.shutdown()
+        if self.filename_check is not None:
+            self.filename_check.cancel()
+            self.filename_check.wait()
+        if self.estimate_worker is not None:
+            self.estimate_worker.cancel()
+            self.estimate_worker.wait()
+        super().done(result)
+
     def on_format_changed(self, format_name: str):
         """Handle format change"""
         is_raster = format_name in ["PNG", "JPG", "TIFF"]
@@ -1449,32 +1770,16 @@ Output Settings:
             preview_text += "Sample filenames (first 3 pages):"
             try:
                 atlas = self.current_layout.atlas()
-                coverage_layer = atlas.coverageLayer()
-                # FIXED: Use safe feature retrieval
-                for i, page_idx in enumerate(pages[:3]):
-                    filename = settings.filename_pattern
-                    filename = filename.replace(
-                        "{page}", str(page_idx + 1).zfill(3))
-                    filename = filename.replace("{index}", str(page_idx))
-
-                    feature = SimplePreviewGenerator._get_safe_feature_at_index(
-                        coverage_layer, page_idx)
-                    if feature and feature.isValid() and coverage_layer:
-                        for field in coverage_layer.fields():
-                            placeholder = "{" + field.name() + "}"
-                            if placeholder in filename:
-                                try:
-                                    value = str(feature[field.name()])
-                                    value = "".join(
-                                        c for c in value if c.isalnum() or c in "._- ")
-                                    filename = filename.replace(
-                                        placeholder, value)
-                                except Exception:
-                                    filename = filename.replace(
-                                        placeholder, "error")
-
-                    filename += f".{settings.export_format.value}"
-                    preview_text += f"\n  Page {page_idx + 1}: {filename}"
+                # Resolved from the atlas feature of each page, like the export itself
+                if atlas.beginRender():
+                    try:
+                        for page_idx in pages[:3]:
+                            if not atlas.seekTo(page_idx):
+                                continue
+                            filename = worker._generate_filename(page_idx, atlas)
+                            preview_text += f"\n  Page {page_idx + 1}: {filename}"
+                    finally:
+                        atlas.endRender()
             except Exception as e:
                 preview_text += f"\n  Error generating sample filenames: {str(e)}"
         else:
@@ -1488,6 +1793,53 @@ Output Settings:
 
         self.log_text.setPlainText(preview_text)
 
+        if settings.is_atlas_layout:
+            self.check_export_filenames(settings, self.log_filename_report)
+
+    def estimate_export(self):
+        """Time a random sample of pages with the current settings in the background"""
+        if not self.current_layout:
+            QMessageBox.warning(self, "Warning", "Please select a layout")
+            return
+        if self.estimate_worker is not None:
+            self.estimate_worker.cancel()
+            return
+
+        settings = self.get_export_settings()
+        if not settings:
+            return
+
+        # Rendered off the GUI thread, so never the layout an export may be using
+        helper = AtlasExportWorker(self.current_layout.clone(), settings)
+        if settings.is_atlas_layout:
+            atlas = helper.layout.atlas()
+            if not atlas.enabled():
+                QMessageBox.warning(
+                    self, "Warning", "Atlas is not enabled. Enable it first to estimate the export.")
+                return
+            pages = helper._get_pages_to_export(atlas)
+        else:
+            pages = [0]
+
+        self.estimate_label.setText("Exporting sample pages...")
+        self.estimate_btn.setText("Cancel Estimate")
+        self.estimate_worker = ExportEstimateWorker(
+            helper, pages, settings_digest=settings_hash(self.current_layout.name(), settings))
+        self.estimate_worker.estimated.connect(self.on_export_estimated)
+        self.estimate_worker.start()
+
+    def on_export_estimated(self, estimate):
+        """Show the result of a finished estimate in the preview panel"""
+        self.estimate_label.setText(estimate.as_text())
+        self.estimate_btn.setText("Estimate Export")
+        page_size = estimate.page_size()
+        if page_size is not None and self.estimate_worker is not None:
+            self.sample_page_sizes[self.estimate_worker.settings_digest] = page_size
+        if self.estimate_worker is not None:
+            self.estimate_worker.wait()
+            self.estimate_worker.deleteLater()
+        self.estimate_worker = None
+
     def get_export_settings(self) -> Optional[ExportSettings]:
         """Get current export settings"""
         output_dir = self.output_dir_edit.text().strip()
@@ -1510,6 +1862,9 @@ Output Settings:
         elif mode_id == 0:
             export_mode = ExportMode.ALL
             custom_pages = []
+        elif mode_id == 3:
+            export_mode = ExportMode.CHANGED
+            custom_pages = []
         else:
             export_mode = ExportMode.CUSTOM
             try:
@@ -1551,7 +1906,12 @@ Output Settings:
             text_render=self.text_export_combo.currentText(),
             pdf_image_compression=self.pdf_compress_combo.currentText(),
             pdf_jpeg_quality=self.pdf_jpeg_quality.value(),
-            png_tiff_compression=self.png_tiff_comp.value()
+            png_tiff_compression=self.png_tiff_comp.value(),
+            parallel_workers=self.workers_spin.value(),
+            resume=self.resume_check.isChecked(),
+            record_page_content=self.record_content_check.isChecked(),
+            combined_pdf=self.combined_pdf_check.isChecked(),
+            static_layers=self.static_layers_combo.checkedItemsData()
         )
         return settings
 
@@ -1572,20 +1932,111 @@ Output Settings:
                     self, "Warning", "Atlas is not enabled in the selected layout")
                 return
 
+            if settings.parallel_workers > 1 and not QgsProject.instance().fileName():
+                QMessageBox.warning(
+                    self, "Warning", "Save the project before exporting with several worker processes")
+                return
+
+            self.export_btn.setEnabled(False)
+            self.check_export_filenames(
+                settings, lambda report: self._confirm_filenames(settings, report))
+            return
+
+        self._start_export_worker(settings)
+
+    def _confirm_filenames(self, settings: ExportSettings, report):
+        """Start the export unless the user stops it over clashing or empty filenames"""
+        self.export_btn.setEnabled(True)
+        if report.cancelled:
+            return
+        if report.has_conflicts():
+            self.log_filename_report(report)
+            reply = QMessageBox.question(
+                self, "Filename Problems",
+                report.as_text() + "\n\nExport anyway?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        self._start_export_worker(settings)
+
+    def _start_export_worker(self, settings: ExportSettings):
+        """Run the export of the current layout on a worker thread"""
         self.reset_export_ui_state(True)
 
         self.log_text.clear()
         if settings.is_atlas_layout:
             self.log_text.append("Starting atlas export...")
+            if settings.parallel_workers > 1 and QgsProject.instance().isDirty():
+                self.log_text.append(
+                    "Worker processes use the saved project; unsaved changes are not exported.")
         else:
             self.log_text.append("Starting layout export...")
 
         self.export_worker = AtlasExportWorker(self.current_layout, settings)
         self.export_worker.progress_updated.connect(self.on_progress_updated)
         self.export_worker.page_exported.connect(self.on_page_exported)
+        self.export_worker.page_skipped.connect(self.on_page_skipped)
         self.export_worker.export_finished.connect(self.on_export_finished)
         self.export_worker.start()
 
+    def check_export_filenames(self, settings: ExportSettings, on_checked):
+        """Resolve and check the filename of every page to export
+
+        Coverage layers with more than SYNC_CHECK_LIMIT features are checked
+        on a worker thread, and on_checked(report) is called when it is done.
+        """
+        atlas = self.current_layout.atlas()
+        layer = atlas.coverageLayer()
+        worker = AtlasExportWorker(self.current_layout, settings)
+        field_names = worker._placeholder_fields(layer)
+        pages = None
+        if settings.export_mode == ExportMode.CUSTOM:
+            pages = {page - 1 for page in settings.custom_pages}
+        request = atlas_index(self.current_layout).request(layer, field_names)
+        args = (settings.filename_pattern, field_names, settings.export_format.value, pages)
+
+        page_size = self._estimated_page_size(settings)
+
+        def finished(report):
+            report.page_size = page_size
+            on_checked(report)
+
+        if layer.featureCount() <= SYNC_CHECK_LIMIT:
+            finished(check_filenames(layer.getFeatures(request), *args))
+            return
+
+        if self.filename_check is not None:
+            self.filename_check.cancel()
+            self.filename_check.wait()
+        self.log_text.append(f"Checking filenames of {layer.featureCount()} features...")
+        # The feature source is a snapshot the worker thread can read safely
+        self.filename_check = FilenameCheckWorker(
+            QgsVectorLayerFeatureSource(layer), request, *args)
+        self.filename_check.checked.connect(finished)
+        self.filename_check.start()
+
+    def _estimated_page_size(self, settings: ExportSettings) -> Optional[tuple]:
+        """(mean bytes per page, pages measured) with these settings
+
+        Measured on the pages of earlier exports when the manifest has any,
+        otherwise on the sample pages of the last estimate.
+        """
+        digest = settings_hash(self.current_layout.name(), settings)
+        if os.path.exists(os.path.join(settings.output_dir, MANIFEST_FILE)):
+            manifest = ExportManifest(settings.output_dir)
+            try:
+                size, count = manifest.average_size(digest)
+            finally:
+                manifest.close()
+            if count:
+                return size, count
+        return self.sample_page_sizes.get(digest)
+
+    def log_filename_report(self, report):
+        """Append a filename check report to the log"""
+        if not report.cancelled:
+            self.log_text.append(report.as_text())
+
     def reset_export_ui_state(self, exporting: bool):
         """Reset UI state for export operations"""
         if exporting:
@@ -1619,6 +2070,10 @@ Output Settings:
         """Handle page export completion"""
         self.log_text.append(f"Exported page {page_num}: {filename}")
 
+    def on_page_skipped(self, page_num: int, filename: str):
+        """Handle a page whose previous export is still up to date"""
+        self.log_text.append(f"Skipped page {page_num}: {filename} (up to date)")
+
     def on_export_finished(self, success: bool, message: str):
         """Handle export completion"""
         self.reset_export_ui_state(False)
@@ -0,0 +1,140 @@
+"""
+Atlas export file names and their validation.
+
+Every page's file name is resolved from the filename pattern in one scan of
+the coverage layer, in atlas page order, reading only the placeholder
+fields and what the atlas filter and sort need.  Names are compared in a
+set, case-insensitively because Windows and macOS file systems are, so
+pages that would overwrite each other are reported before the export
+starts, as are empty (NULL) placeholder values and values that lose
+characters not allowed in file names.
+
+Large coverage layers are checked on a worker thread through a
+QgsVectorLayerFeatureSource.
+"""
+
+from qgis.PyQt.QtCore import QThread, QVariant, pyqtSignal
+
+# Coverage layers with more pages are checked in the background
+SYNC_CHECK_LIMIT = 2000
+
+# Problems of each kind listed in the report text
+REPORT_LIMIT = 10
+
+
+def clean_value(value):
+    """A placeholder value with the characters file names may not hold removed"""
+    return "".join(c for c in str(value) if c.isalnum() or c in "._- ")
+
+
+def _is_empty(value):
+    if isinstance(value, QVariant):
+        return value.isNull()
+    return value is None or str(value).strip() == ''
+
+
+def resolve_filename(pattern, page_index, values, extension):
+    """File name of a 0-based page, ``values`` holding its placeholder fields"""
+    filename = pattern.replace("{page}", str(page_index + 1).zfill(3))
+    filename = filename.replace("{index}", str(page_index))
+    for name, value in (values or {}).items():
+        filename = filename.replace("{" + name + "}", clean_value(value))
+    return f"{filename}.{extension}"
+
+
+class FilenameReport:
+    """Outcome of a file name check"""
+
+    def __init__(self):
+        self.pages = 0
+        self.names = {}
+        self.duplicates = {}
+        self.empty = []
+        self.altered = []
+        self.cancelled = False
+        # (mean bytes, pages measured) of pages exported with the same settings,
+        # by an estimate or an earlier export
+        self.page_size = None
+
+    def has_conflicts(self):
+        return bool(self.duplicates or self.empty)
+
+    def as_text(self):
+        lines = [f"Checked {self.pages} file names"]
+        if self.duplicates:
+            clashing = sum(len(pages) for pages in self.duplicates.values())
+            lines.append(f"✗ {len(self.duplicates)} file names are shared by {clashing} pages "
+                         f"(later pages overwrite earlier ones):")
+            for name, pages in list(self.duplicates.items())[:REPORT_LIMIT]:
+                lines.append(f"    {name}: pages {', '.join(map(str, pages))}")
+        if self.empty:
+            lines.append(f"✗ {len(self.empty)} pages have empty placeholder values:")
+            for page, field in self.empty[:REPORT_LIMIT]:
+                lines.append(f"    page {page}: {{{field}}} is empty")
+        if self.altered:
+            lines.append(f"! {len(self.altered)} values had characters removed:")
+            for page, field, value in self.altered[:REPORT_LIMIT]:
+                lines.append(f"    page {page}: {{{field}}} '{value}' -> '{clean_value(value)}'")
+        if not (self.duplicates or self.empty or self.altered):
+            lines.append("✓ All file names are unique and valid")
+        if self.page_size:
+            size, count = self.page_size
+            lines.append(f"Estimated output size: {size * self.pages / (1024 * 1024):.1f} MB "
+                         f"({size / 1024:.0f} KB per page, measured on {count} exported pages)")
+        else:
+            lines.append("Estimated output size: unknown until sample pages are exported "
+                         "with these settings (Estimate Export)")
+        return "\n".join(lines)
+
+
+def check_filenames(features, pattern, field_names, extension, pages=None, is_cancelled=None):
+    """Resolve and check the file names of atlas pages
+
+    :param features: coverage features in atlas page order
+    :param pages: set of 0-based pages to check, None for all
+    :param is_cancelled: optional callable returning True to stop
+    """
+    report = FilenameReport()
+    seen = {}
+    for page_index, feature in enumerate(features):
+        if is_cancelled is not None and is_cancelled():
+            report.cancelled = True
+            break
+        if pages is not None and page_index not in pages:
+            continue
+        values = {name: feature[name] for name in field_names}
+        page = page_index + 1
+        for name, value in values.items():
+            if _is_empty(value):
+                report.empty.append((page, name))
+            elif clean_value(value) != str(value):
+                report.altered.append((page, name, str(value)))
+        filename = resolve_filename(pattern, page_index, values, extension)
+        report.names[page] = filename
+        seen.setdefault(filename.casefold(), []).append(page)
+        report.pages += 1
+
+    report.duplicates = {report.names[pages_[0]]: pages_
+                         for pages_ in seen.values() if len(pages_) > 1}
+    return report
+
+
+class FilenameCheckWorker(QThread):
+    """Runs check_filenames on a feature source off the GUI thread"""
+
+    checked = pyqtSignal(object)
+
+    def __init__(self, source, request, pattern, field_names, extension, pages=None):
+        super().__init__()
+        self.source = source
+        self.request = request
+        self.args = (pattern, field_names, extension, pages)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        report = check_filenames(self.source.getFeatures(self.request), *self.args,
+                                 is_cancelled=lambda: self.cancelled)
+        self.checked.emit(report)
@@ -0,0 +1,154 @@
+"""
+Page index of an atlas.
+
+Holds the coverage feature ids in atlas page order, after the atlas filter
+and sort, read once with an id-only request that skips geometry and every
+attribute the filter and sort do not need.  Page counts, page -> feature
+lookups and the attribute values used in export file names then take
+constant time per page instead of a scan of the coverage layer.
+
+The index is rebuilt lazily after features are added or deleted, attribute
+values change, the layer's subset string changes or the atlas settings
+change.  One index is kept per layout; use atlas_index(layout).
+"""
+
+import threading
+import weakref
+
+from qgis.core import (
+    QgsExpression, QgsExpressionContextUtils, QgsFeatureRequest
+)
+
+_indexes = weakref.WeakKeyDictionary()
+
+
+def atlas_index(layout):
+    """The cached AtlasIndex of a layout"""
+    index = _indexes.get(layout)
+    if index is None:
+        index = AtlasIndex(layout)
+        _indexes[layout] = index
+    return index
+
+
+class AtlasIndex:
+    """Coverage feature ids of a layout's atlas, in page order
+
+    :param layout: QgsPrintLayout with an atlas
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.atlas = layout.atlas()
+        self._lock = threading.RLock()
+        self._ids = None
+        self._pages = None
+        self._values = {}
+        self._layer = None
+        self.atlas.changed.connect(self.invalidate)
+        self.atlas.coverageLayerChanged.connect(self._watch_layer)
+        self._watch_layer(self.atlas.coverageLayer())
+
+    def _watch_layer(self, layer):
+        with self._lock:
+            if self._layer is not None:
+                for signal in self._signals(self._layer):
+                    try:
+                        signal.disconnect(self.invalidate)
+                    except (TypeError, RuntimeError):
+                        pass
+            self._layer = layer
+            if layer is not None:
+                for signal in self._signals(layer):
+                    signal.connect(self.invalidate)
+            self.invalidate()
+
+    @staticmethod
+    def _signals(layer):
+        return (layer.featureAdded, layer.featureDeleted,
+                layer.attributeValueChanged, layer.subsetStringChanged)
+
+    def invalidate(self, *args):
+        with self._lock:
+            self._ids = None
+            self._pages = None
+            self._values = {}
+
+    def request(self, layer, field_names=()):
+        """Request for the coverage features in page order, with only ``field_names``
+        and the attributes the atlas filter and sort need"""
+        request = QgsFeatureRequest()
+        context = self.layout.createExpressionContext()
+        context.appendScope(QgsExpressionContextUtils.layerScope(layer))
+        request.setExpressionContext(context)
+
+        columns = set(field_names)
+        needs_geometry = False
+        if self.atlas.filterFeatures() and self.atlas.filterExpression():
+            expression = QgsExpression(self.atlas.filterExpression())
+            request.setFilterExpression(self.atlas.filterExpression())
+            columns |= expression.referencedColumns()
+            needs_geometry |= expression.needsGeometry()
+        if self.atlas.sortFeatures() and self.atlas.sortExpression():
+            expression = QgsExpression(self.atlas.sortExpression())
+            request.setOrderBy(QgsFeatureRequest.OrderBy([
+                QgsFeatureRequest.OrderByClause(self.atlas.sortExpression(),
+                                                self.atlas.sortAscending())]))
+            columns |= expression.referencedColumns()
+            needs_geometry |= expression.needsGeometry()
+
+        if not needs_geometry:
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+        if QgsFeatureRequest.ALL_ATTRIBUTES not in columns:
+            request.setSubsetOfAttributes(sorted(columns), layer.fields())
+        return request
+
+    def ids(self):
+        """Coverage feature ids in page order"""
+        with self._lock:
+            if self._ids is None:
+                layer = self.atlas.coverageLayer()
+                if layer is None or not layer.isValid():
+                    self._ids = []
+                else:
+                    self._ids = [feature.id() for feature in layer.getFeatures(self.request(layer))]
+                self._pages = {fid: page for page, fid in enumerate(self._ids)}
+            return self._ids
+
+    def count(self):
+        return len(self.ids())
+
+    def feature_id(self, page_index):
+        """Coverage feature id of a 0-based page, or None"""
+        ids = self.ids()
+        return ids[page_index] if 0 <= page_index < len(ids) else None
+
+    def page_of(self, fid):
+        """0-based page of a coverage feature, or None"""
+        self.ids()
+        return self._pages.get(fid)
+
+    def feature(self, page_index):
+        """Coverage feature of a 0-based page, or None"""
+        fid = self.feature_id(page_index)
+        if fid is None:
+            return None
+        feature = self.atlas.coverageLayer().getFeature(fid)
+        return feature if feature.isValid() else None
+
+    def values(self, fid, field_names):
+        """{field: value} of a coverage feature, from a table read once per set of fields"""
+        key = tuple(field_names)
+        with self._lock:
+            table = self._values.get(key)
+            if table is None:
+                layer = self.atlas.coverageLayer()
+                fields = layer.fields()
+                indices = [fields.lookupField(name) for name in field_names]
+                request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+                request.setSubsetOfAttributes(indices)
+                table = {feature.id(): {name: feature.attributes()[idx]
+                                        for name, idx in zip(field_names, indices)}
+                         for feature in layer.getFeatures(request)}
+                self._values[key] = table
+            return table.get(fid)
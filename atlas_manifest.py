@@ -0,0 +1,198 @@
+"""
+Per-page manifest of an atlas export.
+
+Every exported page is recorded in a SQLite file in the output folder with
+the key of its coverage feature, a hash of the export settings, a
+fingerprint of the feature, the output file, its size and its checksum.  A
+resumed export skips the pages whose record still matches: same settings,
+unchanged feature and an output file with the recorded size and checksum.
+Everything else is rendered again.
+
+Records written by a "changed pages only" export, or by any export with
+"Record page contents" on, also hold a content hash of the page: the
+coverage feature plus every feature of the vector layers drawn in the page's
+map items, within their extents.  A "changed pages only" export renders just
+the pages whose content hash differs from the one stored at the last export,
+so edits to plinths or exploded lines also bring their pages up to date.
+Pages recorded without a content hash are always rendered again.
+
+Pages are committed one by one, so the manifest stays valid when an export
+crashes or is cancelled part way.  Parallel export workers write to the same
+file through their own connections.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import asdict
+from datetime import datetime
+from enum import Enum
+
+from qgis.core import (
+    QgsCoordinateTransform, QgsFeatureRequest, QgsLayoutItemMap, QgsProject,
+    QgsVectorLayer
+)
+
+from .fingerprints import fingerprint
+
+MANIFEST_FILE = 'atlas_export_manifest.sqlite'
+
+# Settings that decide which pages are exported or how, not what a page looks like
+PAGE_NEUTRAL_SETTINGS = ('output_dir', 'export_mode', 'custom_pages', 'create_subdirs',
+                         'parallel_workers', 'resume', 'combined_pdf', 'record_page_content')
+
+# Seconds a connection waits for another worker's write to finish
+LOCK_TIMEOUT = 60
+
+CHECKSUM_CHUNK = 1 << 20
+
+
+def settings_hash(layout_name, settings):
+    """sha1 of the layout name and every setting that changes the rendered page"""
+    values = {key: value.value if isinstance(value, Enum) else value
+              for key, value in asdict(settings).items()
+              if key not in PAGE_NEUTRAL_SETTINGS}
+    values['layout'] = layout_name
+    return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def feature_key(feature):
+    """Stable key of a coverage feature"""
+    return str(feature.id())
+
+
+def feature_hash(feature):
+    """Fingerprint of a coverage feature's geometry and attributes"""
+    return fingerprint(feature.geometry(), feature.attributes())
+
+
+def _map_layers(map_item):
+    if hasattr(map_item, 'layersToRender'):
+        return map_item.layersToRender()
+    layers = map_item.layers()
+    if layers:
+        return layers
+    root = QgsProject.instance().layerTreeRoot()
+    return root.checkedLayers()
+
+
+def page_content_hash(layout, feature, map_layers=None):
+    """sha1 of the coverage feature and the vector features drawn in the page's maps
+
+    Call after the atlas has been moved to the page, so map extents are set.
+
+    :param map_layers: callable(map item) returning its layers, when they are
+        temporarily replaced (see StaticLayerCache.layers_for)
+    """
+    map_layers = map_layers or _map_layers
+    digest = hashlib.sha1(feature_hash(feature).encode('ascii'))
+    project = layout.project() or QgsProject.instance()
+    for item in sorted((item for item in layout.items() if isinstance(item, QgsLayoutItemMap)),
+                       key=lambda item: item.uuid()):
+        extent = item.visibleExtentPolygon().boundingBox()
+        for layer in map_layers(item):
+            digest.update(b'\x1e' + layer.id().encode('utf-8'))
+            if not isinstance(layer, QgsVectorLayer):
+                continue
+            rect = extent
+            if layer.crs() != item.crs():
+                rect = QgsCoordinateTransform(item.crs(), layer.crs(), project) \
+                    .transformBoundingBox(extent)
+            prints = sorted(
+                (found.id(), fingerprint(found.geometry(), found.attributes()))
+                for found in layer.getFeatures(QgsFeatureRequest().setFilterRect(rect)))
+            for fid, value in prints:
+                digest.update(f'{fid}:{value};'.encode('ascii'))
+    return digest.hexdigest()
+
+
+def file_checksum(path):
+    """sha1 of a file, read in chunks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHECKSUM_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExportManifest:
+    """SQLite manifest of the pages exported into one output folder
+
+    :param output_dir: str - export output folder holding the manifest
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_FILE)
+        self.connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' feature_key TEXT PRIMARY KEY,'
+            ' page INTEGER,'
+            ' settings_hash TEXT,'
+            ' feature_hash TEXT,'
+            ' output TEXT,'
+            ' size INTEGER,'
+            ' checksum TEXT,'
+            ' exported TEXT,'
+            ' content_hash TEXT)')
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(pages)')]
+        if 'content_hash' not in columns:
+            self.connection.execute('ALTER TABLE pages ADD COLUMN content_hash TEXT')
+        self.connection.commit()
+
+    def entry(self, key):
+        """Stored record of a feature as a dict, or None"""
+        row = self.connection.execute(
+            'SELECT page, settings_hash, feature_hash, output, size, checksum, content_hash'
+            ' FROM pages WHERE feature_key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('page', 'settings_hash', 'feature_hash', 'output', 'size',
+                         'checksum', 'content_hash'), row))
+
+    def is_current(self, key, settings_digest, feature_digest, filepath, content_digest=None):
+        """True if filepath is the valid output of this feature with these settings
+
+        With ``content_digest`` the page content must be unchanged as well.
+        """
+        entry = self.entry(key)
+        if entry is None:
+            return False
+        if (entry['settings_hash'] != settings_digest
+                or entry['feature_hash'] != feature_digest
+                or entry['output'] != os.path.relpath(filepath, self.output_dir)):
+            return False
+        if content_digest is not None and entry['content_hash'] != content_digest:
+            return False
+        try:
+            if os.path.getsize(filepath) != entry['size']:
+                return False
+            return file_checksum(filepath) == entry['checksum']
+        except OSError:
+            return False
+
+    def record(self, key, page, settings_digest, feature_digest, filepath, content_digest=None):
+        """Store the page just written to filepath"""
+        self.connection.execute(
+            'INSERT OR REPLACE INTO pages (feature_key, page, settings_hash, feature_hash,'
+            ' output, size, checksum, exported, content_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, page, settings_digest, feature_digest,
+             os.path.relpath(filepath, self.output_dir), os.path.getsize(filepath),
+             file_checksum(filepath), datetime.now().isoformat(timespec='seconds'),
+             content_digest))
+        self.connection.commit()
+
+    def average_size(self, settings_digest):
+        """(mean size in bytes, page count) of the pages exported with these settings"""
+        row = self.connection.execute(
+            'SELECT AVG(size), COUNT(*) FROM pages WHERE settings_hash = ?',
+            (settings_digest,)).fetchone()
+        return (row[0] or 0), row[1]
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
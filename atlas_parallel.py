@@ -0,0 +1,188 @@
+"""
+Multi-process atlas export.
+
+The pages of an atlas are dealt round-robin to worker processes.  Every
+worker starts its own headless QGIS, reads the saved project, looks the
+layout up by name and exports its pages with the same settings, file names
+and exporter calls as AtlasExportWorker.  Each exported page is reported
+back over a queue so the dialog's progress bar and log keep updating while
+the workers run.
+
+Workers read the project file from disk, so unsaved changes to the project
+or the layout are not part of a parallel export.
+"""
+
+import os
+import queue
+import traceback
+
+from .process_pool import spawn_context, worker_count
+
+# How long the relay waits on the queue before checking cancel and workers
+POLL_SECONDS = 0.25
+
+# One QgsApplication per worker process
+_qgis_app = None
+
+
+def _init_qgis():
+    global _qgis_app
+    if _qgis_app is not None:
+        return
+    # Layout rendering needs a QPA platform but no display
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from qgis.core import QgsApplication
+    _qgis_app = QgsApplication([], False)
+    _qgis_app.initQgis()
+
+
+def export_atlas_pages(worker_id, project_path, layout_name, settings, pages,
+                       messages, stop):
+    """Worker entry point: export ``pages`` (0-based) of one atlas layout
+
+    :param worker_id: int - reported back with the final 'done' message
+    :param project_path: str - saved project holding the layout
+    :param layout_name: str - print layout name
+    :param settings: ExportSettings of the dialog
+    :param pages: list of 0-based atlas page indices
+    :param messages: queue receiving ('page', number, filename),
+        ('skipped', number, filename), ('failed', message) and finally
+        ('done', worker_id)
+    :param stop: event set by the parent to cancel the export
+    """
+    try:
+        _init_qgis()
+        from qgis.core import QgsLayoutExporter, QgsProject
+        from .atlas_export import AtlasExportWorker, AtlasPageError
+
+        project = QgsProject.instance()
+        if not project.read(project_path):
+            messages.put(('failed', f"Could not read {project_path}: {project.error()}"))
+            return
+        layout = project.layoutManager().layoutByName(layout_name)
+        if layout is None:
+            messages.put(('failed', f"Layout '{layout_name}' not found in {project_path}"))
+            return
+
+        # Reuse the export settings, file naming and manifest of the dialog worker
+        helper = AtlasExportWorker(layout, settings)
+        export_settings = helper._create_export_settings()
+        exporter = QgsLayoutExporter(layout)
+        manifest = helper._open_manifest()
+        # The parent built the static layer cache before starting the workers
+        static_cache = helper._static_layer_cache()
+        if static_cache is not None and not static_cache.load():
+            static_cache = None
+        atlas = layout.atlas()
+        if not atlas.beginRender():
+            manifest.close()
+            messages.put(('failed', "Failed to begin atlas rendering"))
+            return
+        try:
+            with helper._static_cache_applied(static_cache):
+                for page_index in pages:
+                    if stop.is_set():
+                        break
+                    try:
+                        filename, up_to_date = helper._export_atlas_page(
+                            exporter, export_settings, atlas, page_index, manifest)
+                    except AtlasPageError as e:
+                        messages.put(('failed', str(e)))
+                        return
+                    messages.put(('skipped' if up_to_date else 'page', page_index + 1, filename))
+        finally:
+            atlas.endRender()
+            manifest.close()
+    except Exception as e:
+        traceback.print_exc()
+        messages.put(('failed', f"Worker {worker_id} failed: {e}"))
+    finally:
+        messages.put(('done', worker_id))
+
+
+class ParallelAtlasExport:
+    """Runs an atlas export on worker processes for an AtlasExportWorker
+
+    Page events are re-emitted through the worker's ``page_exported`` and
+    ``progress_updated`` signals.
+
+    :param worker: AtlasExportWorker whose settings and signals are used
+    :param project_path: str - saved project file the workers read
+    :param layout_name: str - name of the layout in that project
+    """
+
+    def __init__(self, worker, project_path, layout_name):
+        self.worker = worker
+        self.project_path = project_path
+        self.layout_name = layout_name
+        self.exported = 0
+        self.skipped = 0
+        # Page number -> file name of every exported or skipped page
+        self.files = {}
+        self.error = None
+
+    def run(self, pages):
+        """Export ``pages``; returns False when worker processes cannot be started"""
+        context = spawn_context()
+        if context is None:
+            return False
+
+        settings = self.worker.settings
+        workers = min(worker_count(settings.parallel_workers), len(pages))
+        messages = context.Queue()
+        stop = context.Event()
+        processes = [
+            context.Process(target=export_atlas_pages,
+                            args=(worker_id, self.project_path, self.layout_name,
+                                  settings, pages[worker_id::workers], messages, stop),
+                            daemon=True)
+            for worker_id in range(workers)]
+        self.worker.progress_updated.emit(
+            0, f"Exporting {len(pages)} pages on {workers} worker processes")
+        for process in processes:
+            process.start()
+
+        try:
+            self._relay(messages, stop, processes, len(pages))
+        finally:
+            stop.set()
+            for process in processes:
+                process.join(5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+        return True
+
+    def _relay(self, messages, stop, processes, total):
+        finished = set()
+        while len(finished) < len(processes):
+            if self.worker.cancelled or self.error:
+                stop.set()
+            try:
+                message = messages.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                # A worker that crashed without reporting 'done'
+                for worker_id, process in enumerate(processes):
+                    if worker_id not in finished and process.exitcode:
+                        finished.add(worker_id)
+                        if self.error is None:
+                            self.error = f"Worker process exited with code {process.exitcode}"
+                continue
+
+            kind = message[0]
+            if kind in ('page', 'skipped'):
+                self.files[message[1]] = message[2]
+                if kind == 'page':
+                    self.exported += 1
+                    self.worker.page_exported.emit(message[1], message[2])
+                else:
+                    self.skipped += 1
+                    self.worker.page_skipped.emit(message[1], message[2])
+                done = self.exported + self.skipped
+                self.worker.progress_updated.emit(
+                    int(done * 100 / total), f"Exported {done}/{total} pages")
+            elif kind == 'failed':
+                if self.error is None:
+                    self.error = message[1]
+            elif kind == 'done':
+                finished.add(message[1])
@@ -0,0 +1,49 @@
+"""
+Single combined PDF output of an atlas export.
+
+A plain export of every page streams the atlas straight into one PDF with
+QgsLayoutExporter, page by page, so only the page being rendered is held in
+memory.  Exports that already write one PDF per page (custom pages, resume,
+changed pages only, worker processes) merge those files afterwards.  The
+merge copies each page's content streams and images as they are, without
+re-encoding anything.
+
+Merging needs the pypdf module (or its predecessor PyPDF2), which is not
+part of every QGIS install; streaming does not.
+"""
+
+import os
+
+try:
+    from pypdf import PdfWriter
+    PdfMerger = None
+except ImportError:
+    PdfWriter = None
+    try:
+        from PyPDF2 import PdfMerger
+    except ImportError:
+        PdfMerger = None
+
+
+def merge_available():
+    return PdfWriter is not None or PdfMerger is not None
+
+
+def merge_pdfs(paths, output):
+    """Append the pages of every PDF in ``paths``, in order, into ``output``
+
+    :raises ImportError: if neither pypdf nor PyPDF2 is installed
+    """
+    if not merge_available():
+        raise ImportError("Combining PDFs needs the pypdf Python module")
+    writer = PdfWriter() if PdfWriter is not None else PdfMerger()
+    tmp_path = output + '.part'
+    try:
+        for path in paths:
+            writer.append(path)
+        with open(tmp_path, 'wb') as f:
+            writer.write(f)
+    finally:
+        writer.close()
+    os.replace(tmp_path, output)
+    return output
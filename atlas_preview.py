@@ -0,0 +1,158 @@
+"""
+Background preview rendering for the atlas export dialog.
+
+Previews are rendered on a worker thread from a clone of the print layout,
+so the dialog stays responsive and an export running on the live layout is
+not disturbed.  Only the latest request is kept: when the page spinner moves
+on, requests still waiting are dropped and a render already in progress is
+discarded when it finishes.  Rendered pages go into an LRU cache keyed by
+layout, page and preview size, and the neighbouring pages are rendered ahead
+once the requested one is shown.
+
+The clone and the cache are dropped whenever the layout changes.
+"""
+
+import threading
+from collections import OrderedDict
+
+from qgis.PyQt.QtCore import QObject, QSize, QThread, QTimer, pyqtSignal
+from qgis.PyQt.QtGui import QImage, QPixmap
+
+# Rendered previews kept in memory
+CACHE_SIZE = 24
+
+# Pages rendered ahead on each side of the requested one
+PREFETCH_PAGES = 1
+
+# Spinner changes within this many milliseconds are coalesced into one request
+DEBOUNCE_MS = 150
+
+
+class PreviewRenderThread(QThread):
+    """Renders queued preview requests one at a time"""
+
+    rendered = pyqtSignal(object, QImage)
+
+    def __init__(self, render):
+        super().__init__()
+        self._render = render
+        self._condition = threading.Condition()
+        self._queue = []
+        self._stopping = False
+
+    def submit(self, requests):
+        """Replace every waiting request with ``requests`` (key, layout, page, is_atlas, size)"""
+        with self._condition:
+            self._queue = list(requests)
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._queue = []
+            self._stopping = True
+            self._condition.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                key, layout, page_index, is_atlas, size = self._queue.pop(0)
+            self.rendered.emit(key, self._render(layout, page_index, is_atlas, size))
+
+
+class AtlasPreviewManager(QObject):
+    """Asynchronous, cached preview pixmaps for one dialog
+
+    :param render: callable(layout, page_index, is_atlas, QSize) -> QImage,
+        called on the worker thread
+    """
+
+    preview_ready = pyqtSignal(QPixmap)
+
+    def __init__(self, render, parent=None):
+        super().__init__(parent)
+        self._cache = OrderedDict()
+        self._layout = None
+        self._clone = None
+        self._generation = 0
+        self._wanted = None
+        self._pending = None
+        self._thread = PreviewRenderThread(render)
+        self._thread.rendered.connect(self._on_rendered)
+        self._thread.start()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_MS)
+        self._timer.timeout.connect(self._submit)
+
+    def _set_layout(self, layout):
+        if layout is self._layout:
+            return
+        if self._layout is not None:
+            try:
+                self._layout.changed.disconnect(self.invalidate)
+            except (TypeError, RuntimeError):
+                pass
+        self._layout = layout
+        if layout is not None:
+            layout.changed.connect(self.invalidate)
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget the clone and every cached preview"""
+        self._generation += 1
+        self._clone = None
+        self._cache.clear()
+
+    def _key(self, page_index, size):
+        return (self._layout.name(), self._generation, page_index, size.width(), size.height())
+
+    def request(self, layout, page_index, is_atlas, size, page_count):
+        """Show ``page_index``: returns the cached pixmap, or None and emits preview_ready later"""
+        self._set_layout(layout)
+        key = self._key(page_index, size)
+        self._wanted = key
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self._pending = (page_index, is_atlas, size, page_count, False)
+            self._timer.start()
+            return self._cache[key]
+        self._pending = (page_index, is_atlas, size, page_count, True)
+        self._timer.start()
+        return None
+
+    def _submit(self):
+        if self._pending is None or self._layout is None:
+            return
+        page_index, is_atlas, size, page_count, needed = self._pending
+        self._pending = None
+        if self._clone is None:
+            # Rendered off the GUI thread, so never the layout an export may be using
+            self._clone = self._layout.clone()
+        pages = [page_index] if needed else []
+        if is_atlas:
+            for step in range(1, PREFETCH_PAGES + 1):
+                pages.extend(page for page in (page_index + step, page_index - step)
+                             if 0 <= page < page_count)
+        requests = [(self._key(page, size), self._clone, page, is_atlas, QSize(size))
+                    for page in pages if self._key(page, size) not in self._cache]
+        self._thread.submit(requests)
+
+    def _on_rendered(self, key, image):
+        if key[1] != self._generation:
+            return
+        self._cache[key] = QPixmap.fromImage(image)
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        if key == self._wanted:
+            self.preview_ready.emit(self._cache[key])
+
+    def shutdown(self):
+        self._timer.stop()
+        self._set_layout(None)
+        self._thread.stop()
@@ -0,0 +1,292 @@
+"""
+Render cache for static layers of an atlas export.
+
+Layers marked static (the village boundary, all plots, all plinths, ...)
+look the same on every atlas page, yet every page renders them again.  The
+cache renders them once, tile by tile, at the export DPI into a tiled RGBA
+GeoTIFF in the output folder, one raster per map scale shared by at least
+MIN_PAGES_PER_SCALE pages.  Symbol sizes, line widths and hatch patterns
+depend on the scale, so a page is only drawn from a raster rendered at its
+own scale.  During the export, each time the atlas moves to a page, the
+atlas-driven map items at a cached scale draw that raster under their
+remaining dynamic layers instead of the static vector layers, so the page
+only reads the raster window it shows; map items at any other scale render
+every layer as usual.
+
+Only tiles that some page shows are rendered.  Labels of static layers are
+not cached; keep a layer dynamic when its labels must appear on the pages.
+The static layers are drawn as an image, also in vector PDF and SVG output.
+"""
+
+import glob
+import hashlib
+import math
+import os
+from contextlib import contextmanager
+
+from osgeo import gdal
+from qgis.PyQt.QtCore import QSize, Qt
+from qgis.PyQt.QtGui import QColor, QImage, QPainter
+from qgis.core import (
+    QgsLayoutItemMap, QgsMapRendererCustomPainterJob, QgsMapSettings,
+    QgsRasterLayer, QgsRectangle
+)
+
+STATIC_PROPERTY = 'gruhanaksha/static_layer'
+CACHE_FOLDER = '.atlas_cache'
+
+TILE_SIZE = 1024
+
+# Larger caches are not built (about 6 GB of uncompressed RGBA)
+MAX_CACHE_PIXELS = 1_500_000_000
+
+# Map scales used by fewer pages are rendered live
+MIN_PAGES_PER_SCALE = 2
+
+
+def scale_key(units_per_pixel):
+    """Map units per output pixel, rounded so the pages of one scale share a key"""
+    return float(f'{units_per_pixel:.6g}')
+
+
+def is_static(layer):
+    return str(layer.customProperty(STATIC_PROPERTY, False)).lower() in ('true', '1')
+
+
+def set_static(layer, static):
+    """Mark or unmark a layer as static; stored in the project file"""
+    if static:
+        layer.setCustomProperty(STATIC_PROPERTY, True)
+    else:
+        layer.removeCustomProperty(STATIC_PROPERTY)
+
+
+def static_layer_ids(project):
+    return [layer.id() for layer in project.mapLayers().values() if is_static(layer)]
+
+
+def _atlas_maps(layout):
+    return [item for item in layout.items()
+            if isinstance(item, QgsLayoutItemMap) and item.atlasDriven()]
+
+
+class StaticLayerCache:
+    """Tiled rasters of the static layers of one layout's atlas maps, one per scale
+
+    :param layout: QgsPrintLayout being exported
+    :param layer_ids: ids of the static layers
+    :param dpi: int - export resolution
+    :param output_dir: str - export folder; the cache goes in a subfolder
+    """
+
+    def __init__(self, layout, layer_ids, dpi, output_dir):
+        self.layout = layout
+        self.layer_ids = list(layer_ids)
+        self.dpi = dpi
+        key = hashlib.sha1('|'.join([layout.name(), str(dpi)] + sorted(self.layer_ids))
+                           .encode('utf-8')).hexdigest()[:16]
+        self.folder = os.path.join(output_dir, CACHE_FOLDER)
+        self.prefix = f'static_{key}_'
+        # scale_key -> QgsRasterLayer
+        self.rasters = {}
+        # Map item uuid -> layers it rendered before the cache was applied
+        self._original = {}
+        self._saved = []
+
+    def _raster_path(self, resolution):
+        return os.path.join(self.folder, f'{self.prefix}{resolution:.6g}.tif')
+
+    def _raster_paths(self):
+        return glob.glob(os.path.join(glob.escape(self.folder), glob.escape(self.prefix) + '*.tif'))
+
+    def _static_layers(self, map_item):
+        return [layer for layer in map_item.layersToRender() if layer.id() in self.layer_ids]
+
+    def _resolution(self, map_item):
+        """Map units per output pixel of a map item, None if it has no size"""
+        extent = map_item.visibleExtentPolygon().boundingBox()
+        width_px = map_item.rect().width() / 25.4 * self.dpi
+        if width_px <= 0 or extent.isEmpty():
+            return None
+        return extent.width() / width_px
+
+    def _page_extents(self, atlas, pages, is_cancelled):
+        """Extent and map units per output pixel of every atlas map on every page"""
+        extents = []
+        for page_index in pages:
+            if is_cancelled():
+                return None
+            if not atlas.seekTo(page_index):
+                continue
+            for item in _atlas_maps(self.layout):
+                resolution = self._resolution(item)
+                if resolution is not None:
+                    extents.append((item.visibleExtentPolygon().boundingBox(), resolution))
+        return extents
+
+    def build(self, atlas, pages, progress, is_cancelled):
+        """Render the caches for ``pages``; returns False when there is nothing to cache
+
+        :param atlas: the layout's atlas, between beginRender() and endRender()
+        :param progress: callable(percent, message)
+        :param is_cancelled: callable returning True to stop
+        """
+        # Caches left from an earlier export must not be used if this one is not built
+        for path in self._raster_paths():
+            os.remove(path)
+        maps = _atlas_maps(self.layout)
+        layers = []
+        for item in maps:
+            layers.extend(layer for layer in self._static_layers(item) if layer not in layers)
+        if not layers:
+            return False
+
+        progress(0, "Measuring atlas pages for the static layer cache")
+        extents = self._page_extents(atlas, pages, is_cancelled)
+        if not extents:
+            return False
+        by_scale = {}
+        for extent, resolution in extents:
+            by_scale.setdefault(scale_key(resolution), []).append(extent)
+
+        plans = []
+        for resolution, group in sorted(by_scale.items()):
+            if len(group) < MIN_PAGES_PER_SCALE:
+                continue
+            full = QgsRectangle(group[0])
+            for extent in group[1:]:
+                full.combineExtentWith(extent)
+            cols = max(1, math.ceil(full.width() / resolution / TILE_SIZE))
+            rows = max(1, math.ceil(full.height() / resolution / TILE_SIZE))
+            tiles = set()
+            for extent in group:
+                c0 = int((extent.xMinimum() - full.xMinimum()) / resolution // TILE_SIZE)
+                c1 = int((extent.xMaximum() - full.xMinimum()) / resolution // TILE_SIZE)
+                r0 = int((full.yMaximum() - extent.yMaximum()) / resolution // TILE_SIZE)
+                r1 = int((full.yMaximum() - extent.yMinimum()) / resolution // TILE_SIZE)
+                tiles.update((c, r) for c in range(c0, min(c1, cols - 1) + 1)
+                             for r in range(r0, min(r1, rows - 1) + 1))
+            plans.append((resolution, full, cols, rows, sorted(tiles)))
+        if not plans:
+            progress(0, "No map scale is shared by several pages; rendering every layer per page")
+            return False
+        if sum(cols * rows for _, _, cols, rows, _ in plans) * TILE_SIZE * TILE_SIZE > MAX_CACHE_PIXELS:
+            progress(0, "Static layer cache would be too large; rendering every layer per page")
+            return False
+
+        os.makedirs(self.folder, exist_ok=True)
+        settings = QgsMapSettings()
+        settings.setLayers(layers)
+        settings.setDestinationCrs(maps[0].crs())
+        settings.setOutputSize(QSize(TILE_SIZE, TILE_SIZE))
+        settings.setOutputDpi(self.dpi)
+        settings.setBackgroundColor(QColor(Qt.transparent))
+        settings.setFlag(QgsMapSettings.DrawLabeling, False)
+        settings.setFlag(QgsMapSettings.Antialiasing, True)
+
+        total = sum(len(tiles) for *_, tiles in plans)
+        done = 0
+        for resolution, full, cols, rows, tiles in plans:
+            dataset = gdal.GetDriverByName('GTiff').Create(
+                self._raster_path(resolution), cols * TILE_SIZE, rows * TILE_SIZE, 4,
+                gdal.GDT_Byte,
+                ['TILED=YES', 'BLOCKXSIZE=512', 'BLOCKYSIZE=512', 'COMPRESS=DEFLATE',
+                 'BIGTIFF=IF_SAFER', 'ALPHA=YES'])
+            if dataset is None:
+                raise OSError(f"Could not create {self._raster_path(resolution)}")
+            dataset.SetGeoTransform([full.xMinimum(), resolution, 0,
+                                     full.yMaximum(), 0, -resolution])
+            dataset.SetProjection(maps[0].crs().toWkt())
+            for band, interpretation in zip(range(1, 5), (gdal.GCI_RedBand, gdal.GCI_GreenBand,
+                                                           gdal.GCI_BlueBand, gdal.GCI_AlphaBand)):
+                dataset.GetRasterBand(band).SetColorInterpretation(interpretation)
+
+            span = TILE_SIZE * resolution
+            try:
+                for c, r in tiles:
+                    if is_cancelled():
+                        return False
+                    x0 = full.xMinimum() + c * span
+                    y1 = full.yMaximum() - r * span
+                    settings.setExtent(QgsRectangle(x0, y1 - span, x0 + span, y1))
+                    image = QImage(TILE_SIZE, TILE_SIZE, QImage.Format_ARGB32)
+                    image.fill(Qt.transparent)
+                    painter = QPainter(image)
+                    job = QgsMapRendererCustomPainterJob(settings, painter)
+                    job.renderSynchronously()
+                    painter.end()
+                    # ARGB32 is stored as B, G, R, A bytes on little-endian machines
+                    dataset.WriteRaster(
+                        c * TILE_SIZE, r * TILE_SIZE, TILE_SIZE, TILE_SIZE,
+                        bytes(image.constBits().asstring(image.bytesPerLine() * TILE_SIZE)),
+                        buf_type=gdal.GDT_Byte, band_list=[3, 2, 1, 4],
+                        buf_pixel_space=4, buf_line_space=image.bytesPerLine(), buf_band_space=1)
+                    done += 1
+                    progress(int(done * 100 / total),
+                             f"Cached static layers: {done}/{total} tiles")
+            finally:
+                dataset.FlushCache()
+                dataset = None
+        return True
+
+    def load(self):
+        """Open the cache rasters; False if none was built"""
+        self.rasters = {}
+        for path in self._raster_paths():
+            raster = QgsRasterLayer(path, 'Static layers', 'gdal')
+            if raster.isValid():
+                self.rasters[scale_key(raster.rasterUnitsPerPixelX())] = raster
+        return bool(self.rasters)
+
+    @contextmanager
+    def applied(self):
+        """Draw the cache instead of the static layers in atlas maps at a cached scale
+
+        The map items are switched every time the atlas moves to a page.
+        """
+        if not self.rasters:
+            yield
+            return
+        atlas = self.layout.atlas()
+        self._saved = []
+        for item in _atlas_maps(self.layout):
+            self._saved.append((item, item.layers(), item.keepLayerSet(),
+                                item.followVisibilityPreset()))
+            self._original[item.uuid()] = item.layersToRender()
+        atlas.featureChanged.connect(self._apply_to_page)
+        try:
+            yield
+        finally:
+            try:
+                atlas.featureChanged.disconnect(self._apply_to_page)
+            except (TypeError, RuntimeError):
+                pass
+            self._restore()
+            self._saved = []
+            self._original = {}
+
+    def _restore(self):
+        for item, layers, keep, follow in self._saved:
+            item.setLayers(layers)
+            item.setKeepLayerSet(keep)
+            item.setFollowVisibilityPreset(follow)
+
+    def _apply_to_page(self, *args):
+        """Use the raster of each atlas map's scale on the current page, or the live layers"""
+        self._restore()
+        for item, _, _, _ in self._saved:
+            rendered = item.layersToRender()
+            self._original[item.uuid()] = rendered
+            resolution = self._resolution(item)
+            raster = self.rasters.get(scale_key(resolution)) if resolution is not None else None
+            if raster is None:
+                continue
+            dynamic = [layer for layer in rendered if layer.id() not in self.layer_ids]
+            item.setFollowVisibilityPreset(False)
+            item.setLayers(dynamic + [raster])
+            item.setKeepLayerSet(True)
+
+    def layers_for(self, map_item):
+        """Layers a map item drew before applied(), so page hashes ignore the cache"""
+        layers = self._original.get(map_item.uuid())
+        return layers if layers is not None else map_item.layersToRender()
@@ -0,0 +1,297 @@
+"""
+Headless batch runner for PPM generation.
+
+Runs the PPM pipeline for every village listed in a manifest, each village in
+its own worker process, without the QGIS desktop.  Every village gets its own
+project file and deliverables in its output folder, and a summary of timings
+and failures is written to batch_summary.csv.
+
+Run it with the Python interpreter shipped with QGIS, with the QGIS plugins
+folder (for ``processing``) and the folder holding this plugin on PYTHONPATH::
+
+    python -m Gruhanaksha.batch_runner villages.csv --output-dir /data/ppm --workers 4
+
+The manifest is a CSV file with a header row, or a JSON list of objects, with
+these keys:
+
+    plot, plinth            plot area and builtup (plinth) layers
+    district                district name in English, or its index in the list
+    mandal, panchayat       mandal and grama panchayat names
+    panchayat_code          grama panchayat code
+    lgd_code                village LGD code
+    name                    optional; defaults to the plot file name
+    output                  optional; defaults to <output-dir>/<name>
+    parcel_field, sq_yards_field, sq_metres_field
+                            optional; override the command line field names
+    intersection_workers    optional; overrides --intersection-workers
+
+Relative paths are resolved against the manifest folder.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import as_completed
+
+from qgis.core import QgsProcessingFeedback
+
+from .process_pool import create_process_pool, worker_count
+
+REQUIRED_KEYS = ('plot', 'plinth', 'district', 'mandal', 'panchayat',
+                 'panchayat_code', 'lgd_code')
+SUMMARY_FILE = 'batch_summary.csv'
+SUMMARY_FIELDS = ['name', 'status', 'seconds', 'project', 'error']
+
+OUTPUT_FORMATS = {'shp': 0, 'gpkg': 1}
+
+# One QgsApplication per worker process, created on its first village
+_qgis_app = None
+
+
+class BatchFeedback(QgsProcessingFeedback):
+    """Feedback that keeps reported errors so a run can be marked as failed"""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    def reportError(self, error, fatalError=False):
+        self.errors.append(error)
+        super().reportError(error, fatalError)
+
+
+def load_manifest(path, output_dir):
+    """Read a CSV or JSON manifest into a list of village jobs (dicts)"""
+    with open(path, encoding='utf-8-sig') as f:
+        if path.lower().endswith('.json'):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for number, row in enumerate(rows, start=1):
+        row = {key.strip(): str(value).strip() for key, value in row.items()
+               if key and value is not None}
+        missing = [key for key in REQUIRED_KEYS if not row.get(key)]
+        if missing:
+            raise ValueError(
+                f"Manifest entry {number} is missing: {', '.join(missing)}")
+        for key in ('plot', 'plinth'):
+            row[key] = os.path.join(base, row[key])
+        row.setdefault('name', os.path.splitext(os.path.basename(row['plot']))[0])
+        if row.get('output'):
+            row['output'] = os.path.join(base, row['output'])
+        else:
+            row['output'] = os.path.join(output_dir, row['name'])
+        jobs.append(row)
+
+    names = [job['output'] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Manifest entries must have distinct names or output folders")
+    return jobs
+
+
+def _init_qgis():
+    global _qgis_app
+    if _qgis_app is not None:
+        return
+    from qgis.core import QgsApplication
+    from qgis.analysis import QgsNativeAlgorithms
+    _qgis_app = QgsApplication([], False)
+    _qgis_app.initQgis()
+    from processing.core.Processing import Processing
+    Processing.initialize()
+    QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
+
+
+def _district_index(value):
+    from .addon_functions import districttuple
+    districts = [name.lower() for name in districttuple()]
+    if value.isdigit() and int(value) < len(districts):
+        return int(value)
+    try:
+        return districts.index(value.lower())
+    except ValueError:
+        raise ValueError(f"Unknown district '{value}'")
+
+
+def _intersection_workers(job, settings):
+    value = job.get('intersection_workers')
+    if not value:
+        return settings['intersection_workers']
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"intersection_workers must be a whole number, not '{value}'")
+
+
+def _run_pipeline(job, settings):
+    """Run SvamitvaPPMAlgorithm for one village; returns the project file path"""
+    from qgis.core import QgsProcessingContext, QgsProject, QgsVectorLayer
+    from .svamitvappm_algorithm import SvamitvaPPMAlgorithm
+
+    os.makedirs(job['output'], exist_ok=True)
+    project = QgsProject.instance()
+    project.clear()
+
+    layers = []
+    for key in ('plot', 'plinth'):
+        name = os.path.splitext(os.path.basename(job[key]))[0]
+        layer = QgsVectorLayer(job[key], name, 'ogr')
+        if not layer.isValid():
+            raise ValueError(f"Could not open {key} layer {job[key]}")
+        layers.append(layer)
+    plot_layer, plinth_layer = layers
+
+    project.setCrs(plot_layer.crs())
+    project.addMapLayers(layers)
+    project_path = os.path.join(job['output'], f"{job['name']}.qgz")
+    project.setFileName(project_path)
+    # Deliverables are written next to the project file, so it must exist first
+    if not project.write():
+        raise OSError(f"Could not write {project_path}: {project.error()}")
+
+    context = QgsProcessingContext()
+    context.setProject(project)
+    feedback = BatchFeedback()
+    parameters = {
+        'choose_plot_shapefile': plot_layer.id(),
+        'property_parcel_number': job.get('parcel_field') or settings['parcel_field'],
+        'plot_area_in_square_yards': job.get('sq_yards_field') or settings['sq_yards_field'],
+        'plot_area_in_square_metres': job.get('sq_metres_field') or settings['sq_metres_field'],
+        'choose_plinth_shapefile': plinth_layer.id(),
+        'district_name_eng': _district_index(job['district']),
+        'name_of_the_mandal': job['mandal'],
+        'name_of_the_grama_panchayat': job['panchayat'],
+        'gram_panchayat_code': job['panchayat_code'],
+        'village_code_lgd_code': job['lgd_code'],
+        'execution_mode': settings['execution_mode'],
+        'intersection_workers': _intersection_workers(job, settings),
+        'output_format': settings['output_format'],
+        'incremental': settings['incremental'],
+        'dedup_shared_edges': settings['dedup_shared_edges'],
+    }
+    algorithm = SvamitvaPPMAlgorithm().create()
+    _, ok = algorithm.run(parameters, context, feedback)
+    if not ok or feedback.errors:
+        raise RuntimeError('; '.join(feedback.errors) or "PPM generation failed")
+    return project_path
+
+
+def run_village(job, settings):
+    """Worker entry point: run one village and report its outcome as a dict"""
+    start = time.perf_counter()
+    result = {'name': job['name'], 'status': 'failed', 'seconds': 0,
+              'project': '', 'error': ''}
+    try:
+        _init_qgis()
+        result['project'] = _run_pipeline(job, settings)
+        result['status'] = 'ok'
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    result['seconds'] = round(time.perf_counter() - start, 2)
+    return result
+
+
+def run_batch(jobs, settings, workers=0):
+    """Run every job on a bounded process pool; returns results in manifest order"""
+    workers = min(worker_count(workers), max(len(jobs), 1))
+    results = [None] * len(jobs)
+    pool = create_process_pool(workers)
+    if pool is None:
+        print("No Python interpreter found for worker processes; running villages one by one")
+        for position, job in enumerate(jobs):
+            results[position] = run_village(job, settings)
+            _report(results[position], position, len(jobs))
+        return results
+
+    with pool:
+        futures = {pool.submit(run_village, job, settings): position
+                   for position, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures)):
+            position = futures[future]
+            try:
+                results[position] = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. a crash inside GDAL)
+                results[position] = {'name': jobs[position]['name'], 'status': 'failed',
+                                     'seconds': 0, 'project': '',
+                                     'error': f"Worker process failed: {e}"}
+            _report(results[position], done, len(jobs))
+    return results
+
+
+def _report(result, done, total):
+    print(f"[{done + 1}/{total}] {result['name']}: {result['status']} "
+          f"in {result['seconds']}s {result['error']}".rstrip())
+
+
+def write_summary(results, output_dir):
+    """Write batch_summary.csv and return its path"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, SUMMARY_FILE)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run PPM generation for every village in a manifest")
+    parser.add_argument('manifest', help="CSV or JSON manifest of villages")
+    parser.add_argument('--output-dir', default=os.getcwd(),
+                        help="folder for the village outputs and the summary")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--parcel-field', default='prop_id',
+                        help="property parcel number field")
+    parser.add_argument('--sq-yards-field', default='AREA_SQYRD',
+                        help="plot area in square yards field")
+    parser.add_argument('--sq-metres-field', default='SHAPE_Area',
+                        help="plot area in square metres field")
+    parser.add_argument('--format', choices=sorted(OUTPUT_FORMATS), default='shp',
+                        help="deliverable format")
+    parser.add_argument('--parallel-branches', action='store_true',
+                        help="run the plot and plinth branches concurrently")
+    parser.add_argument('--intersection-workers', type=int, default=1,
+                        help="processes for the plinth/plot intersection of each village "
+                             "(1 = in-process, 0 = one per CPU)")
+    parser.add_argument('--dedup-shared-edges', action='store_true',
+                        help="write edges shared by two plots once in Plot_ExplodeLines")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only reprocess parcels changed since the last run")
+    args = parser.parse_args(argv)
+
+    output_dir = os.path.abspath(args.output_dir)
+    jobs = load_manifest(args.manifest, output_dir)
+    settings = {
+        'parcel_field': args.parcel_field,
+        'sq_yards_field': args.sq_yards_field,
+        'sq_metres_field': args.sq_metres_field,
+        'execution_mode': 1 if args.parallel_branches else 0,
+        'intersection_workers': args.intersection_workers,
+        'output_format': OUTPUT_FORMATS[args.format],
+        'incremental': args.incremental,
+        'dedup_shared_edges': args.dedup_shared_edges,
+    }
+
+    start = time.perf_counter()
+    results = run_batch(jobs, settings, args.workers)
+    summary = write_summary(results, output_dir)
+
+    failed = [result for result in results if result['status'] != 'ok']
+    print(f"{len(results) - len(failed)} of {len(results)} villages completed in "
+          f"{time.perf_counter() - start:.1f}s; summary written to {summary}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
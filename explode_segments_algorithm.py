@@ -0,0 +1,130 @@
+"""
+Explode polygon boundaries into two point segments carrying Ref_Col and Length.
+
+Produces the same features as native:boundary, native:explodelines and the
+length3D($geometry) refactor used for the ExplodeLines deliverables, in one
+pass over the input and without evaluating expressions.
+"""
+
+import inspect
+import os
+
+from qgis.core import (
+    QgsFeature, QgsFeatureSink, QgsProcessing, QgsProcessingAlgorithm,
+    QgsProcessingException, QgsProcessingParameterBoolean, QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource, QgsProcessingParameterField, QgsWkbTypes
+)
+from qgis.PyQt.QtGui import QIcon
+
+from .ppm_engine import (
+    SharedEdgeBuilder, exploded_line_fields, exploded_segments, fix_geometry,
+    shared_edge_fields, to_int
+)
+
+
+class ExplodeSegmentsAlgorithm(QgsProcessingAlgorithm):
+
+    INPUT = 'INPUT'
+    REF_FIELD = 'REF_FIELD'
+    DEDUPLICATE = 'DEDUPLICATE'
+    OUTPUT = 'OUTPUT'
+
+    def icon(self):
+        cmd_folder = os.path.split(inspect.getfile(inspect.currentframe()))[0]
+        return QIcon(os.path.join(cmd_folder, 'images/ppm.svg'))
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterFeatureSource(
+            self.INPUT, 'Polygon layer', types=[QgsProcessing.TypeVectorPolygon]))
+        self.addParameter(QgsProcessingParameterField(
+            self.REF_FIELD, 'Field copied into <b>Ref_Col</b>', parentLayerParameterName=self.INPUT,
+            type=QgsProcessingParameterField.Any, allowMultiple=False, optional=True))
+        self.addParameter(QgsProcessingParameterBoolean(
+            self.DEDUPLICATE, 'Write edges shared by two polygons once (adds Ref_Col_2)',
+            defaultValue=False))
+        self.addParameter(QgsProcessingParameterFeatureSink(
+            self.OUTPUT, 'Exploded lines', type=QgsProcessing.TypeVectorLine))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.INPUT))
+
+        ref_field = self.parameterAsString(parameters, self.REF_FIELD, context)
+        ref_idx = source.fields().lookupField(ref_field) if ref_field else -1
+
+        wkb_type = QgsWkbTypes.LineString
+        if QgsWkbTypes.hasZ(source.wkbType()):
+            wkb_type = QgsWkbTypes.addZ(wkb_type)
+        if QgsWkbTypes.hasM(source.wkbType()):
+            wkb_type = QgsWkbTypes.addM(wkb_type)
+        edges = None
+        if self.parameterAsBoolean(parameters, self.DEDUPLICATE, context):
+            edges = SharedEdgeBuilder()
+        fields = exploded_line_fields() if edges is None else shared_edge_fields()
+        sink, dest_id = self.parameterAsSink(
+            parameters, self.OUTPUT, context, fields, wkb_type, source.sourceCrs())
+        if sink is None:
+            raise QgsProcessingException(
+                self.invalidSinkError(parameters, self.OUTPUT))
+
+        def write(segment, attributes):
+            out = QgsFeature(fields)
+            out.setGeometry(segment)
+            out.setAttributes(attributes)
+            sink.addFeature(out, QgsFeatureSink.FastInsert)
+
+        total = 100.0 / source.featureCount() if source.featureCount() else 0
+        repaired = skipped = 0
+        for current, feature in enumerate(source.getFeatures()):
+            if feedback.isCanceled():
+                break
+            geometry = feature.geometry()
+            geom = fix_geometry(geometry)
+            if geom is None:
+                skipped += 1
+                continue
+            if not geometry.isGeosValid():
+                repaired += 1
+            ref_col = to_int(feature.attributes()[ref_idx]) if ref_idx >= 0 else None
+            if edges is not None:
+                edges.add(geom, ref_col)
+            else:
+                for segment, attributes in exploded_segments(geom, ref_col):
+                    write(segment, attributes)
+            feedback.setProgress(int(current * total))
+
+        if repaired:
+            feedback.pushWarning(
+                f"{repaired} invalid geometries were repaired before exploding them")
+        if skipped:
+            feedback.pushWarning(
+                f"{skipped} features without a usable geometry were skipped")
+
+        # Shared edges are only complete once every polygon has been walked
+        if edges is not None and not feedback.isCanceled():
+            for segment, attributes in edges.features():
+                write(segment, attributes)
+
+        return {self.OUTPUT: dest_id}
+
+    def name(self):
+        return 'explode_segments'
+
+    def displayName(self):
+        return 'Explode Lines with Length'
+
+    def group(self):
+        return ''
+
+    def groupId(self):
+        return ''
+
+    def shortHelpString(self):
+        return """<html><p>Splits every polygon boundary into two point segments with
+        <b>Ref_Col</b> (from the chosen field) and <b>Length</b>, as used for the
+        Plot_ExplodeLines and Builtup_ExplodeLines layers.</p></html>"""
+
+    def createInstance(self):
+        return ExplodeSegmentsAlgorithm()
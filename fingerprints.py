@@ -0,0 +1,28 @@
+"""
+Fingerprints of features.
+
+A fingerprint is a hash of a feature's geometry and attribute values, used
+to tell whether a feature changed since an earlier run: by the incremental
+PPM regeneration for plots and plinths, and by the atlas export manifest for
+coverage features.  Kept free of other plugin imports so both can use it.
+"""
+
+import hashlib
+
+from qgis.PyQt.QtCore import QVariant
+
+
+def _attribute_token(value):
+    # NULL attributes come through as null QVariants, whose repr is not stable
+    if isinstance(value, QVariant):
+        value = None if value.isNull() else value.value()
+    return repr(value)
+
+
+def fingerprint(geometry, attributes):
+    """sha1 of the geometry WKB and the attribute values"""
+    digest = hashlib.sha1(bytes(geometry.asWkb()))
+    for value in attributes:
+        digest.update(b'\x1f')
+        digest.update(_attribute_token(value).encode('utf-8'))
+    return digest.hexdigest()
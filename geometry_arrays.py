@@ -0,0 +1,125 @@
+"""
+Bulk polygon areas on contiguous coordinate arrays.
+
+Geometries are read as WKB and their vertices copied into a single (N, 2)
+float array, with the start offset, owning geometry and orientation of every
+ring kept alongside.  The shoelace area of every geometry is then computed at
+once with NumPy instead of one GEOS call per geometry.
+
+NumPy ships with QGIS; when it is missing the areas fall back to
+QgsGeometry.area() per geometry.
+"""
+
+import struct
+
+from qgis.core import QgsGeometry, QgsWkbTypes
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WKB_POINT = 1
+WKB_LINESTRING = 2
+WKB_POLYGON = 3
+
+# EWKB dimension flags, ISO types use +1000 (Z), +2000 (M), +3000 (ZM)
+EWKB_Z = 0x80000000
+EWKB_M = 0x40000000
+
+
+class WkbRings:
+    """Collects the polygon rings of WKB geometries into coordinate blocks"""
+
+    def __init__(self):
+        self.blocks = []
+        self.owners = []
+        self.signs = []
+
+    def add(self, owner, wkb):
+        self._read(memoryview(bytes(wkb)), 0, owner)
+
+    def _read(self, data, pos, owner):
+        endian = '<' if data[pos] == 1 else '>'
+        (wkb_type,) = struct.unpack_from(endian + 'I', data, pos + 1)
+        pos += 5
+        has_z = bool(wkb_type & EWKB_Z)
+        has_m = bool(wkb_type & EWKB_M)
+        wkb_type &= 0x0FFFFFFF
+        iso_dims = wkb_type // 1000
+        has_z = has_z or iso_dims in (1, 3)
+        has_m = has_m or iso_dims in (2, 3)
+        base = wkb_type % 1000
+        dims = 2 + has_z + has_m
+
+        if base == WKB_POINT:
+            return pos + dims * 8
+        if base == WKB_LINESTRING:
+            # Lines have no area; skip their coordinates
+            (count,) = struct.unpack_from(endian + 'I', data, pos)
+            return pos + 4 + count * dims * 8
+        if base == WKB_POLYGON:
+            (count,) = struct.unpack_from(endian + 'I', data, pos)
+            pos += 4
+            for ring in range(count):
+                pos = self._ring(data, pos, endian, dims, owner, 1 if ring == 0 else -1)
+            return pos
+        if base in (4, 5, 6, 7):
+            (count,) = struct.unpack_from(endian + 'I', data, pos)
+            pos += 4
+            for _ in range(count):
+                pos = self._read(data, pos, owner)
+            return pos
+        raise ValueError(f"Unsupported WKB type {wkb_type}")
+
+    def _ring(self, data, pos, endian, dims, owner, sign):
+        (count,) = struct.unpack_from(endian + 'I', data, pos)
+        pos += 4
+        if count:
+            coords = np.frombuffer(data, dtype=endian + 'f8', count=count * dims, offset=pos)
+            self.blocks.append(coords.reshape(count, dims)[:, :2])
+            self.owners.append(owner)
+            self.signs.append(sign)
+        return pos + count * dims * 8
+
+
+def _shoelace(geometries):
+    rings = WkbRings()
+    present = np.zeros(len(geometries), dtype=bool)
+    for owner, geom in enumerate(geometries):
+        if geom is None or geom.isNull():
+            continue
+        present[owner] = True
+        if QgsWkbTypes.isCurvedType(geom.wkbType()):
+            geom = QgsGeometry(geom.constGet().segmentize())
+        rings.add(owner, geom.asWkb())
+
+    areas = np.zeros(len(geometries))
+    if rings.blocks:
+        sizes = np.fromiter((len(block) for block in rings.blocks), dtype=np.int64,
+                            count=len(rings.blocks))
+        starts = np.zeros(len(sizes), dtype=np.int64)
+        np.cumsum(sizes[:-1], out=starts[1:])
+        coords = np.concatenate(rings.blocks).astype(np.float64, copy=False)
+        x, y = coords[:, 0], coords[:, 1]
+        # Vertex pairs spanning two rings are zeroed before summing per ring
+        cross = np.append(x[:-1] * y[1:] - x[1:] * y[:-1], 0.0)
+        cross[starts[1:] - 1] = 0.0
+        ring_areas = 0.5 * np.abs(np.add.reduceat(cross, starts)) * np.asarray(rings.signs)
+        areas = np.bincount(np.asarray(rings.owners, dtype=np.int64), weights=ring_areas,
+                            minlength=len(geometries))
+    areas[~present] = np.nan
+    return areas
+
+
+def polygon_areas(geometries):
+    """Planar area of every geometry (holes subtracted), NaN for null geometries
+
+    :param geometries: sequence of QgsGeometry
+    :returns: list of float
+    """
+    geometries = list(geometries)
+    if np is None:
+        return [geom.area() if geom is not None and not geom.isNull() else float('nan')
+                for geom in geometries]
+    return _shoelace(geometries).tolist()
@@ -7,15 +7,21 @@ from PyQt5.QtWidgets import (
 
 from qgis.utils import iface
 from PyQt5.QtGui import QColor, QCursor
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QRectF, QTimer
 from qgis.core import (
-    QgsProject, QgsVectorLayer, QgsWkbTypes, QgsPointXY, QgsUnitTypes
+    QgsProject, QgsVectorLayer, QgsWkbTypes, QgsPointXY, QgsUnitTypes,
+    QgsFeature, QgsFeatureRequest, QgsGeometry, QgsRectangle, QgsSpatialIndex
 )
 from qgis.gui import (
     QgsMapTool, QgsRubberBand, QgsVertexMarker
 )
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class UnitConverter:
     """Handles unit conversions for the geometry editing tool"""
@@ -262,6 +268,304 @@ class BufferedTextItem(QGraphicsTextItem):
         painter.restore()
 
 
+# Vertex grid cells along the longer side of a layer's extent
+VERTEX_GRID_CELLS = 4096
+
+
+class DimensionLabelManager:
+    """Segment length labels on a map canvas, drawn from a pool of text items
+
+    Only labels whose segment midpoint lies in the visible extent are shown,
+    longest segments first, and a label that would overlap one already
+    placed is skipped at that scale.  Text items are reused between updates
+    instead of being created and removed, and any number of extent changes
+    within one frame lead to a single update.
+
+    :param canvas: QgsMapCanvas
+    """
+
+    # Milliseconds between updates while the canvas pans or zooms
+    FRAME_MS = 16
+
+    # Screen cells, in pixels, for the label overlap test
+    CELL_PX = 64
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.items = []
+        # (midpoint, text, length) of every segment
+        self.segments = []
+        self.connected = False
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.FRAME_MS)
+        self.timer.timeout.connect(self.update)
+
+    def set_segments(self, segments):
+        """Label these segments, (midpoint QgsPointXY, text, length) each"""
+        self.segments = sorted(segments, key=lambda segment: -segment[2])
+        if self.segments and not self.connected:
+            self.canvas.extentsChanged.connect(self.schedule)
+            self.connected = True
+        self.update()
+
+    def clear(self):
+        self.segments = []
+        self.timer.stop()
+        if self.connected:
+            try:
+                self.canvas.extentsChanged.disconnect(self.schedule)
+            except (TypeError, RuntimeError):
+                pass
+            self.connected = False
+        for item in self.items:
+            item.hide()
+
+    def remove(self):
+        """Clear and take the pooled items off the canvas"""
+        self.clear()
+        for item in self.items:
+            self.canvas.scene().removeItem(item)
+        self.items = []
+
+    def schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def _item(self, number):
+        if number == len(self.items):
+            item = BufferedTextItem(
+                "",
+                main_color=QColor(255, 255, 255),
+                buffer_color=QColor('black'),
+                buffer_width=3
+            )
+            self.canvas.scene().addItem(item)
+            self.items.append(item)
+        return self.items[number]
+
+    def update(self):
+        extent = self.canvas.extent()
+        transform = self.canvas.getCoordinateTransform()
+        occupied = {}
+        shown = 0
+        for midpoint, text, _ in self.segments:
+            if not extent.contains(midpoint):
+                continue
+            item = self._item(shown)
+            if item.toPlainText() != text:
+                item.setPlainText(text)
+            scene_pt = transform.transform(midpoint)
+            rect = item.boundingRect().translated(scene_pt.x() - 25, scene_pt.y() - 10)
+            cells = [(col, row)
+                     for col in range(int(rect.left() // self.CELL_PX),
+                                      int(rect.right() // self.CELL_PX) + 1)
+                     for row in range(int(rect.top() // self.CELL_PX),
+                                      int(rect.bottom() // self.CELL_PX) + 1)]
+            if any(rect.intersects(other) for cell in cells for other in occupied.get(cell, ())):
+                continue
+            for cell in cells:
+                occupied.setdefault(cell, []).append(QRectF(rect))
+            item.setPos(rect.topLeft())
+            item.show()
+            shown += 1
+        for item in self.items[shown:]:
+            item.hide()
+
+
+class LayerGeometryIndex:
+    """Spatial and vertex indexes of a line or polygon layer that follow its edits
+
+    The spatial index finds the features near a point; the vertex grid is a
+    hash of square cells holding (fid, vertex index, x, y) of every vertex,
+    so the vertices within a small tolerance of a point are found by probing
+    the few cells the tolerance covers.  Each is built on first use and then
+    updated feature by feature from the featureAdded, featureDeleted and
+    geometryChanged signals.  Both are rebuilt when feature ids may change
+    (after committing or rolling back edits) and after the subset string
+    changes.
+    """
+
+    def __init__(self, layer):
+        self.layer = layer
+        self._index = None
+        self._grid = None
+        self._cell_size = None
+        # fid -> grid cells holding its vertices
+        self._feature_cells = {}
+        layer.featureAdded.connect(self._feature_added)
+        layer.featureDeleted.connect(self._feature_deleted)
+        layer.geometryChanged.connect(self._geometry_changed)
+        layer.afterCommitChanges.connect(self.invalidate)
+        layer.afterRollBack.connect(self.invalidate)
+        layer.subsetStringChanged.connect(self.invalidate)
+
+    def invalidate(self):
+        self._index = None
+        self._grid = None
+        self._feature_cells = {}
+
+    def index(self):
+        if self._index is None:
+            request = QgsFeatureRequest().setNoAttributes()
+            self._index = QgsSpatialIndex(
+                self.layer.getFeatures(request), None, QgsSpatialIndex.FlagStoreFeatureGeometries)
+        return self._index
+
+    def vertex_grid(self):
+        if self._grid is None:
+            extent = self.layer.extent()
+            self._cell_size = max(extent.width(), extent.height()) / VERTEX_GRID_CELLS or 1.0
+            self._grid = {}
+            for feature in self.layer.getFeatures(QgsFeatureRequest().setNoAttributes()):
+                self._grid_add(feature.id(), feature.geometry())
+        return self._grid
+
+    def _cell(self, x, y):
+        return math.floor(x / self._cell_size), math.floor(y / self._cell_size)
+
+    def _add(self, fid, geometry):
+        if geometry is not None and not geometry.isNull():
+            feature = QgsFeature(fid)
+            feature.setGeometry(geometry)
+            self._index.addFeature(feature)
+
+    def _remove(self, fid):
+        geometry = self._index.geometry(fid)
+        if not geometry.isNull():
+            feature = QgsFeature(fid)
+            feature.setGeometry(geometry)
+            self._index.deleteFeature(feature)
+
+    def _grid_add(self, fid, geometry):
+        if geometry is None or geometry.isNull():
+            return
+        cells = set()
+        for vertex_index, vertex in enumerate(geometry.vertices()):
+            cell = self._cell(vertex.x(), vertex.y())
+            self._grid.setdefault(cell, []).append((fid, vertex_index, vertex.x(), vertex.y()))
+            cells.add(cell)
+        self._feature_cells[fid] = cells
+
+    def _grid_remove(self, fid):
+        for cell in self._feature_cells.pop(fid, ()):
+            remaining = [entry for entry in self._grid[cell] if entry[0] != fid]
+            if remaining:
+                self._grid[cell] = remaining
+            else:
+                del self._grid[cell]
+
+    def _feature_added(self, fid):
+        if self._index is None and self._grid is None:
+            return
+        geometry = self.layer.getFeature(fid).geometry()
+        if self._index is not None:
+            self._add(fid, geometry)
+        if self._grid is not None:
+            self._grid_add(fid, geometry)
+
+    def _feature_deleted(self, fid):
+        if self._index is not None:
+            self._remove(fid)
+        if self._grid is not None:
+            self._grid_remove(fid)
+
+    def _geometry_changed(self, fid, geometry):
+        if self._index is not None:
+            self._remove(fid)
+            self._add(fid, geometry)
+        if self._grid is not None:
+            self._grid_remove(fid)
+            self._grid_add(fid, geometry)
+
+    def candidates(self, rect):
+        """(fid, geometry) of the features whose bounding box intersects rect"""
+        index = self.index()
+        return [(fid, index.geometry(fid)) for fid in index.intersects(rect)]
+
+    def vertices_near(self, point, tolerance):
+        """(fid, vertex index, QgsPointXY) of every vertex within tolerance of point"""
+        grid = self.vertex_grid()
+        col0, row0 = self._cell(point.x() - tolerance, point.y() - tolerance)
+        col1, row1 = self._cell(point.x() + tolerance, point.y() + tolerance)
+        if (col1 - col0 + 1) * (row1 - row0 + 1) <= len(grid):
+            cells = [(col, row) for col in range(col0, col1 + 1) for row in range(row0, row1 + 1)]
+        else:
+            # Zoomed far out: fewer occupied cells than cells in range
+            cells = [(col, row) for col, row in grid
+                     if col0 <= col <= col1 and row0 <= row <= row1]
+        found = []
+        for cell in cells:
+            for fid, vertex_index, x, y in grid.get(cell, ()):
+                if math.hypot(x - point.x(), y - point.y()) <= tolerance:
+                    found.append((fid, vertex_index, QgsPointXY(x, y)))
+        return found
+
+
+_geometry_indexes = {}
+
+
+def geometry_index(layer):
+    """The LayerGeometryIndex of a layer, created on first use"""
+    index = _geometry_indexes.get(layer.id())
+    if index is None:
+        index = LayerGeometryIndex(layer)
+        _geometry_indexes[layer.id()] = index
+        layer.willBeDeleted.connect(
+            lambda layer_id=layer.id(): _geometry_indexes.pop(layer_id, None))
+    return index
+
+
+class VertexCache:
+    """Vertices of one geometry, with a nearest-vertex lookup
+
+    The coordinates are held in an (N, 2) NumPy array together with the
+    vertex order sorted by x, so a lookup takes the vertices within the
+    search distance in x with a binary search and measures only those, in
+    one vectorised step.  Without NumPy every vertex is measured in Python.
+
+    :param geometry: QgsGeometry
+    """
+
+    def __init__(self, geometry):
+        self.points = [QgsPointXY(pt) for pt in geometry.vertices()]
+        if np is not None:
+            self.coords = np.array([(pt.x(), pt.y()) for pt in self.points],
+                                   dtype=float).reshape(-1, 2)
+            # Stable, so coincident vertices keep their order and the lowest index wins
+            self._order = np.argsort(self.coords[:, 0], kind='stable')
+            self._xs = self.coords[self._order, 0]
+
+    def ring_points(self, is_polygon):
+        """The vertices, without the closing one of a closed polygon ring"""
+        if is_polygon and self.points and self.points[0] == self.points[-1]:
+            return self.points[:-1]
+        return self.points
+
+    def nearest(self, point, max_distance):
+        """(vertex index, QgsPointXY) of the vertex nearest to point within max_distance, or None"""
+        if np is None:
+            best = None
+            for i, v in enumerate(self.points):
+                d = math.hypot(point.x() - v.x(), point.y() - v.y())
+                if d <= max_distance and (best is None or d < best[0]):
+                    best = (d, i)
+            return (best[1], self.points[best[1]]) if best else None
+
+        lo = np.searchsorted(self._xs, point.x() - max_distance, side='left')
+        hi = np.searchsorted(self._xs, point.x() + max_distance, side='right')
+        if lo == hi:
+            return None
+        candidates = self._order[lo:hi]
+        distances = np.hypot(self.coords[candidates, 0] - point.x(),
+                             self.coords[candidates, 1] - point.y())
+        best = int(np.argmin(distances))
+        if distances[best] > max_distance:
+            return None
+        index = int(candidates[best])
+        return index, self.points[index]
+
+
 class UnifiedGeometryEditTool(QgsMapTool):
     def __init__(self, canvas):
         super().__init__(canvas)
@@ -270,7 +574,7 @@ class UnifiedGeometryEditTool(QgsMapTool):
         self.snappingUtils = self.canvas.snappingUtils()
         self.setupVisuals()
 
-        self.dimension_labels = []
+        self.dimension_labels = DimensionLabelManager(self.canvas)
         self.resetTool(first=True)
 
     def setupVisuals(self):
@@ -345,46 +649,43 @@ class UnifiedGeometryEditTool(QgsMapTool):
 
         found = False
         tolerance = self.canvas.mapUnitsPerPixel() * 5  # Tolerance for line selection
+        point_geom = QgsGeometry.fromPointXY(point)
+        search_rect = QgsRectangle(point.x() - tolerance, point.y() - tolerance,
+                                   point.x() + tolerance, point.y() + tolerance)
 
         for layer in layers:
-            for f in layer.getFeatures():
-                if not f.geometry():
-                    continue
-
-                # For polygons, check contains
-                if QgsWkbTypes.geometryType(layer.wkbType()) == QgsWkbTypes.PolygonGeometry:
-                    if f.geometry().contains(point):
-                        if not layer.isEditable():
-                            iface.messageBar().pushMessage(
-                                "Layer Not Editable",
-                                "Selected layer is not in editing mode. Please toggle editing first.",
-                                duration=2
-                            )
-                            return
-                        self.selectedFeature, self.selectedLayer = f, layer
-                        self.geometryType = "polygon"
-                        found = True
-                        break
-
-                # For lines, check distance
-                elif QgsWkbTypes.geometryType(layer.wkbType()) == QgsWkbTypes.LineGeometry:
-                    from qgis.core import QgsGeometry
-                    point_geom = QgsGeometry.fromPointXY(point)
-                    distance = f.geometry().distance(point_geom)
-                    if distance <= tolerance:
-                        if not layer.isEditable():
-                            iface.messageBar().pushMessage(
-                                "Layer Not Editable",
-                                "Selected layer is not in editing mode. Please toggle editing first.",
-                                duration=2
-                            )
-                            return
-                        self.selectedFeature, self.selectedLayer = f, layer
-                        self.geometryType = "line"
-                        found = True
-                        break
-            if found:
-                break
+            # Only the features whose bounding box is near the click are tested
+            candidates = geometry_index(layer).candidates(search_rect)
+            hit = None
+
+            # For polygons, check contains
+            if QgsWkbTypes.geometryType(layer.wkbType()) == QgsWkbTypes.PolygonGeometry:
+                hit = next((fid for fid, geom in candidates if geom.contains(point)), None)
+                geometry_type = "polygon"
+
+            # For lines, take the nearest within tolerance
+            elif QgsWkbTypes.geometryType(layer.wkbType()) == QgsWkbTypes.LineGeometry:
+                distances = [(geom.distance(point_geom), fid) for fid, geom in candidates]
+                distances = [(d, fid) for d, fid in distances if d <= tolerance]
+                hit = min(distances)[1] if distances else None
+                geometry_type = "line"
+
+            if hit is None:
+                continue
+            if not layer.isEditable():
+                iface.messageBar().pushMessage(
+                    "Layer Not Editable",
+                    "Selected layer is not in editing mode. Please toggle editing first.",
+                    duration=2
+                )
+                return
+            # Only the selected layer may drive the vertex cache; never connect twice
+            self.disconnectSelectedLayer()
+            self.selectedFeature, self.selectedLayer = layer.getFeature(hit), layer
+            layer.geometryChanged.connect(self.onSelectedGeometryChanged)
+            self.geometryType = geometry_type
+            found = True
+            break
 
         if found:
             # Display the selected feature
@@ -417,19 +718,10 @@ class UnifiedGeometryEditTool(QgsMapTool):
 
     def handleVertexSelection(self, event):
         point = self.toMapCoordinates(event.pos())
-        geom = self.selectedFeature.geometry()
-        min_dist, closest_vertex, closest_index = None, None, None
-        vertices = [QgsPointXY(pt) for pt in geom.vertices()]
-
-        for i, v in enumerate(vertices):
-            d = math.hypot(point.x() - v.x(), point.y() - v.y())
-            if (min_dist is None) or (d < min_dist):
-                min_dist = d
-                closest_vertex = v
-                closest_index = i
-
         threshold = self.canvas.mapUnitsPerPixel() * 8
-        if min_dist is not None and min_dist <= threshold:
+        nearest = self.selectedVertices().nearest(point, threshold)
+        if nearest is not None:
+            closest_index, closest_vertex = nearest
             self.selectedVertex = closest_vertex
             self.vertexIndex = closest_index
             self.vertexMarker.setCenter(closest_vertex)
@@ -440,6 +732,17 @@ class UnifiedGeometryEditTool(QgsMapTool):
             iface.messageBar().pushMessage(
                 "Info", "No vertex found at clicked location.", duration=2)
 
+    def selectedVertices(self):
+        """VertexCache of the selected feature, built once per geometry"""
+        if self._vertexCache is None:
+            self._vertexCache = VertexCache(self.selectedFeature.geometry())
+        return self._vertexCache
+
+    def onSelectedGeometryChanged(self, fid, geometry):
+        if self.selectedFeature is not None and fid == self.selectedFeature.id():
+            self.selectedFeature.setGeometry(geometry)
+            self._vertexCache = None
+
     def showLengthPanel(self):
         dlg = LengthInputDialog()
         if dlg.exec_():
@@ -547,26 +850,68 @@ class UnifiedGeometryEditTool(QgsMapTool):
         ]
 
         for layer in layers:
-            for feature in layer.getFeatures():
-                if not feature.geometry():
-                    continue
-
-                vertices = [QgsPointXY(pt)
-                            for pt in feature.geometry().vertices()]
-
-                for vertex_index, vertex in enumerate(vertices):
-                    distance = math.hypot(
-                        vertex.x() - point.x(), vertex.y() - point.y())
-                    if distance <= tolerance:
-                        coincident_vertices.append({
-                            'layer': layer,
-                            'feature': feature,
-                            'vertex_index': vertex_index,
-                            'vertex': vertex
-                        })
+            features = {}
+            for fid, vertex_index, vertex in geometry_index(layer).vertices_near(point, tolerance):
+                if fid not in features:
+                    features[fid] = layer.getFeature(fid)
+                coincident_vertices.append({
+                    'layer': layer,
+                    'feature': features[fid],
+                    'vertex_index': vertex_index,
+                    'vertex': vertex
+                })
 
         return coincident_vertices
 
+    def moveVertices(self, vertices, new_point, description):
+        """Move vertices to new_point as one undoable edit command per layer
+
+        All vertices of a feature are moved in one geometry change, and each
+        edited layer is repainted once; the other layers are redrawn from the
+        canvas render cache.  If any layer cannot be changed, the layers
+        already changed are undone and the error is raised.
+
+        :param vertices: list of {'layer', 'feature', 'vertex_index'} dicts
+        :param description: str - undo stack text of the edit
+        """
+        # layer id -> (layer, {fid: (geometry, [vertex indices])})
+        edits = {}
+        for vertex_info in vertices:
+            layer, feature = vertex_info['layer'], vertex_info['feature']
+            features = edits.setdefault(layer.id(), (layer, {}))[1]
+            if feature.id() not in features:
+                features[feature.id()] = (feature.geometry(), [])
+            features[feature.id()][1].append(vertex_info['vertex_index'])
+
+        # Every new geometry is computed before any layer is changed
+        for layer, features in edits.values():
+            for fid, (geom, vertex_indices) in features.items():
+                for vertex_index in vertex_indices:
+                    if not geom.moveVertex(new_point.x(), new_point.y(), vertex_index):
+                        raise RuntimeError(
+                            f"Feature {fid} of {layer.name()} has no vertex {vertex_index}")
+
+        applied = []
+        try:
+            for layer, features in edits.values():
+                layer.beginEditCommand(description)
+                try:
+                    for fid, (geom, _) in features.items():
+                        if not layer.changeGeometry(fid, geom):
+                            raise RuntimeError(f"Could not change feature {fid} of {layer.name()}")
+                except Exception:
+                    layer.destroyEditCommand()
+                    raise
+                layer.endEditCommand()
+                applied.append(layer)
+        except Exception:
+            # All or nothing: take back the commands of the layers already changed
+            for layer in reversed(applied):
+                layer.undoStack().undo()
+            raise
+        for layer in applied:
+            layer.triggerRepaint()
+
     def moveVertexTopologically(self, new_point):
         """Move vertex considering topological editing"""
         try:
@@ -587,22 +932,15 @@ class UnifiedGeometryEditTool(QgsMapTool):
                     )
 
                 # Move all coincident vertices
-                for vertex_info in coincident_vertices:
-                    layer = vertex_info['layer']
-                    feature = vertex_info['feature']
-                    vertex_index = vertex_info['vertex_index']
-
-                    geom = feature.geometry()
-                    geom.moveVertex(new_point.x(), new_point.y(), vertex_index)
-                    layer.changeGeometry(feature.id(), geom)
+                self.moveVertices(coincident_vertices, new_point, "Move vertex")
             else:
                 # Just move the selected vertex
-                geom = self.selectedFeature.geometry()
-                geom.moveVertex(new_point.x(), new_point.y(), self.vertexIndex)
-                self.selectedLayer.changeGeometry(
-                    self.selectedFeature.id(), geom)
+                self.moveVertices([{
+                    'layer': self.selectedLayer,
+                    'feature': self.selectedFeature,
+                    'vertex_index': self.vertexIndex
+                }], new_point, "Move vertex")
 
-            self.canvas.refresh()
             self.update_dimension_labels()
             unit_display = UnitConverter.UNIT_NAMES.get(
                 self.selectedUnit, self.selectedUnit)
@@ -619,12 +957,8 @@ class UnifiedGeometryEditTool(QgsMapTool):
             self.resetTool()
 
     def handleDirectionSelection_segment(self, direction_point):
-        geom = self.selectedFeature.geometry()
-        vertices = [QgsPointXY(pt) for pt in geom.vertices()]
-
         # For polygons, remove closing duplicate if polygon is closed
-        if self.geometryType == "polygon" and vertices[0] == vertices[-1]:
-            vertices = vertices[:-1]
+        vertices = self.selectedVertices().ring_points(self.geometryType == "polygon")
 
         n = len(vertices)
 
@@ -679,12 +1013,8 @@ class UnifiedGeometryEditTool(QgsMapTool):
         self.adjustSegmentLength(fixed_index, moving_index, self.targetLength)
 
     def adjustSegmentLength(self, fixed_vertex_index, moving_vertex_index, target_length):
-        geom = self.selectedFeature.geometry()
-        vertices = [QgsPointXY(pt) for pt in geom.vertices()]
-
         # For polygons, remove closing duplicate if polygon closed
-        if self.geometryType == "polygon" and vertices[0] == vertices[-1]:
-            vertices = vertices[:-1]
+        vertices = self.selectedVertices().ring_points(self.geometryType == "polygon")
 
         fixed_pt = vertices[fixed_vertex_index]
         moving_pt = vertices[moving_vertex_index]
@@ -749,10 +1079,7 @@ class UnifiedGeometryEditTool(QgsMapTool):
         """Move segment vertex considering topological editing"""
         try:
             # Get the vertex position to check for coincident vertices
-            geom = self.selectedFeature.geometry()
-            vertices = [QgsPointXY(pt) for pt in geom.vertices()]
-            if self.geometryType == "polygon" and vertices[0] == vertices[-1]:
-                vertices = vertices[:-1]
+            vertices = self.selectedVertices().ring_points(self.geometryType == "polygon")
 
             old_vertex_point = vertices[vertex_index]
 
@@ -773,22 +1100,15 @@ class UnifiedGeometryEditTool(QgsMapTool):
                     )
 
                 # Move all coincident vertices
-                for vertex_info in coincident_vertices:
-                    layer = vertex_info['layer']
-                    feature = vertex_info['feature']
-                    vertex_idx = vertex_info['vertex_index']
-
-                    geom = feature.geometry()
-                    geom.moveVertex(new_point.x(), new_point.y(), vertex_idx)
-                    layer.changeGeometry(feature.id(), geom)
+                self.moveVertices(coincident_vertices, new_point, "Set segment length")
             else:
                 # Just move the selected vertex
-                geom = self.selectedFeature.geometry()
-                geom.moveVertex(new_point.x(), new_point.y(), vertex_index)
-                self.selectedLayer.changeGeometry(
-                    self.selectedFeature.id(), geom)
+                self.moveVertices([{
+                    'layer': self.selectedLayer,
+                    'feature': self.selectedFeature,
+                    'vertex_index': vertex_index
+                }], new_point, "Set segment length")
 
-            self.canvas.refresh()
             self.update_dimension_labels()
             segment_text = "side" if self.geometryType == "polygon" else "segment"
             unit_display = UnitConverter.UNIT_NAMES.get(
@@ -824,30 +1144,15 @@ class UnifiedGeometryEditTool(QgsMapTool):
         return None
 
     def update_dimension_labels(self):
-        # Remove old labels and disconnect signal
-        if hasattr(self, 'dimension_labels'):
-            for item, _ in self.dimension_labels:
-                self.canvas.scene().removeItem(item)
-        self.dimension_labels = []
-
-        if hasattr(self, "labels_sync_conn"):
-            try:
-                self.canvas.extentsChanged.disconnect(
-                    self.refresh_dimension_labels)
-            except Exception:
-                pass  # Not connected
-
         if not getattr(self, "selectedFeature", None):
+            self.dimension_labels.clear()
             return
 
-        geom = self.selectedFeature.geometry()
-        vertices = [QgsPointXY(pt) for pt in geom.vertices()]
-
-        if self.geometryType == "polygon" and vertices[0] == vertices[-1]:
-            vertices = vertices[:-1]
+        vertices = self.selectedVertices().ring_points(self.geometryType == "polygon")
 
         n = len(vertices)
         if n < 2:
+            self.dimension_labels.clear()
             return
 
         # Get map units for display
@@ -861,6 +1166,7 @@ class UnifiedGeometryEditTool(QgsMapTool):
         # For lines, show segments between consecutive vertices (open)
         segment_count = n if self.geometryType == "polygon" else n - 1
 
+        segments = []
         for i in range(segment_count):
             start = vertices[i]
             if self.geometryType == "polygon":
@@ -874,22 +1180,12 @@ class UnifiedGeometryEditTool(QgsMapTool):
             mid_x = (start.x() + end.x()) / 2
             mid_y = (start.y() + end.y()) / 2
             length = math.hypot(end.x() - start.x(), end.y() - start.y())
-            scene_pt = self.canvas.getCoordinateTransform().transform(QgsPointXY(mid_x, mid_y))
 
             # Display length with units
-            txt_item = BufferedTextItem(
-                f"{length:.2f} {map_units_name}",
-                main_color=QColor(255, 255, 255),
-                buffer_color=QColor('black'),
-                buffer_width=3
-            )
-            txt_item.setPos(scene_pt.x() - 25, scene_pt.y() - 10)
-            self.canvas.scene().addItem(txt_item)
-            self.dimension_labels.append((txt_item, QgsPointXY(mid_x, mid_y)))
+            segments.append((QgsPointXY(mid_x, mid_y), f"{length:.2f} {map_units_name}", length))
 
-        # On every canvas move/zoom, update label positions
-        self.canvas.extentsChanged.connect(self.refresh_dimension_labels)
-        self.refresh_dimension_labels()
+        # Shown and placed again after every canvas move/zoom
+        self.dimension_labels.set_segments(segments)
 
     def canvasMoveEvent(self, event):
         point = self.toMapCoordinates(event.pos())
@@ -898,17 +1194,10 @@ class UnifiedGeometryEditTool(QgsMapTool):
             if not hasattr(self, 'selectedFeature') or not self.selectedFeature:
                 return
 
-            geom = self.selectedFeature.geometry()
-            vertices = [QgsPointXY(pt) for pt in geom.vertices()]
-            min_dist, closest_vertex = None, None
-            for v in vertices:
-                d = math.hypot(point.x() - v.x(), point.y() - v.y())
-                if (min_dist is None) or (d < min_dist):
-                    min_dist = d
-                    closest_vertex = v
             threshold = self.canvas.mapUnitsPerPixel() * 8
-            if min_dist is not None and min_dist <= threshold:
-                self.hoverMarker.setCenter(closest_vertex)
+            nearest = self.selectedVertices().nearest(point, threshold)
+            if nearest is not None:
+                self.hoverMarker.setCenter(nearest[1])
                 self.hoverMarker.show()
             else:
                 self.hoverMarker.hide()
@@ -929,12 +1218,12 @@ class UnifiedGeometryEditTool(QgsMapTool):
         elif self.state == "SELECT_FEATURE":
             pass
 
-    def refresh_dimension_labels(self):
-        if not hasattr(self, 'dimension_labels'):
-            return
-        for txt_item, map_pt in self.dimension_labels:
-            scene_pt = self.canvas.getCoordinateTransform().transform(map_pt)
-            txt_item.setPos(scene_pt.x() - 25, scene_pt.y() - 10)
+    def disconnectSelectedLayer(self):
+        if getattr(self, 'selectedLayer', None) is not None:
+            try:
+                self.selectedLayer.geometryChanged.disconnect(self.onSelectedGeometryChanged)
+            except (TypeError, RuntimeError):
+                pass
 
     def resetTool(self, first=False):
         if self.rubberBand:
@@ -952,9 +1241,11 @@ class UnifiedGeometryEditTool(QgsMapTool):
         if self.directionMarker:
             self.directionMarker.hide()
 
+        self.disconnectSelectedLayer()
         self.selectedVertex = None
         self.selectedFeature = None
         self.selectedLayer = None
+        self._vertexCache = None
         self.vertexIndex = None
         self.moveDistance = None
         self.targetLength = None
@@ -972,18 +1263,12 @@ class UnifiedGeometryEditTool(QgsMapTool):
                 duration=2
             )
 
-        # Remove dimension labels
-        for item, _ in getattr(self, "dimension_labels", []):
-            self.canvas.scene().removeItem(item)
-        self.dimension_labels = []
-        try:
-            self.canvas.extentsChanged.disconnect(
-                self.refresh_dimension_labels)
-        except Exception:
-            pass
+        # Hide dimension labels
+        self.dimension_labels.clear()
 
     def deactivate(self):
         self.resetTool()
+        self.dimension_labels.remove()
         QgsMapTool.deactivate(self)
         print("Unified Geometry Editing Tool deactivated")
 
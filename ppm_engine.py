@@ -0,0 +1,800 @@
+"""
+Fused single-pass engine for the PPM deliverables.
+
+The original model chained fixgeometries, fieldcalculator, savefeatures,
+boundary, explodelines, refactorfields, intersection and extractvertices,
+materialising a temporary layer after every step.  This module reads each
+input layer exactly once and writes every final deliverable directly:
+
+    Plot_Shapefile, Plot_Boundary, Plot_ExplodeLines, Plot_Vertices,
+    Builtup_Shapefile, Builtup_Boundary, Builtup_ExplodeLines
+"""
+
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import (
+    Qgis, QgsFeature, QgsFeatureRequest, QgsField, QgsFields, QgsGeometry,
+    QgsLineString, QgsProcessingException, QgsProcessingUtils,
+    QgsSpatialIndex, QgsVectorFileWriter, QgsVectorLayer, QgsVectorLayerFeatureSource,
+    QgsWkbTypes
+)
+
+from .geometry_arrays import polygon_areas
+from .ppm_intersection import PartitionedIntersection
+from .ppm_profiler import profile_step
+
+# Deliverable layer names, also used as file/layer names on disk
+PLOT_SHAPEFILE = 'Plot_Shapefile'
+PLOT_BOUNDARY = 'Plot_Boundary'
+PLOT_EXPLODELINES = 'Plot_ExplodeLines'
+PLOT_VERTICES = 'Plot_Vertices'
+BUILTUP_SHAPEFILE = 'Builtup_Shapefile'
+BUILTUP_BOUNDARY = 'Builtup_Boundary'
+BUILTUP_EXPLODELINES = 'Builtup_ExplodeLines'
+
+DELIVERABLES = [PLOT_SHAPEFILE, PLOT_BOUNDARY, PLOT_EXPLODELINES, PLOT_VERTICES,
+                BUILTUP_SHAPEFILE, BUILTUP_BOUNDARY, BUILTUP_EXPLODELINES]
+
+REF_COL = 'Ref_Col'
+REF_COL_2 = 'Ref_Col_2'
+LENGTH = 'Length'
+AREA = 'Area'
+
+# Builtup parts smaller than this (sq.m) are dropped, as delete_small_parcels did
+MIN_BUILTUP_AREA = 1
+
+# Builtup parts measured together by the small part filter
+AREA_BATCH_SIZE = 1000
+
+# Segment endpoints closer than this (map units) are treated as the same vertex
+SHARED_EDGE_TOLERANCE = 0.001
+
+
+def ref_col_field():
+    return QgsField(REF_COL, QVariant.Int, 'integer', 10, 0)
+
+
+def exploded_line_fields():
+    """Fields of the *_ExplodeLines deliverables (Ref_Col, Length)"""
+    fields = QgsFields()
+    fields.append(ref_col_field())
+    fields.append(QgsField(LENGTH, QVariant.Double, 'double precision', 10, 1))
+    return fields
+
+
+def shared_edge_fields():
+    """Exploded line fields plus Ref_Col_2, the second polygon of a shared edge"""
+    fields = exploded_line_fields()
+    field = ref_col_field()
+    field.setName(REF_COL_2)
+    fields.append(field)
+    return fields
+
+
+def vertex_fields(source_fields):
+    """Source fields plus the columns native:extractvertices adds for polygons"""
+    fields = QgsFields(source_fields)
+    fields.append(QgsField('vertex_index', QVariant.Int, 'integer', 10, 0))
+    fields.append(QgsField('vertex_part', QVariant.Int, 'integer', 10, 0))
+    fields.append(QgsField('vertex_part_ring', QVariant.Int, 'integer', 10, 0))
+    fields.append(QgsField('vertex_part_index', QVariant.Int, 'integer', 10, 0))
+    fields.append(QgsField('distance', QVariant.Double, 'double', 20, 14))
+    fields.append(QgsField('angle', QVariant.Double, 'double', 20, 14))
+    return fields
+
+
+def with_field(fields, field):
+    """Return a copy of fields with field appended, or replacing a same-named field"""
+    fields = QgsFields(fields)
+    idx = fields.lookupField(field.name())
+    if idx < 0:
+        fields.append(field)
+        return fields, fields.count() - 1
+    out = QgsFields()
+    for i, existing in enumerate(fields):
+        out.append(field if i == idx else existing)
+    return out, idx
+
+
+def set_attribute(attributes, idx, value):
+    attributes = list(attributes)
+    if idx < len(attributes):
+        attributes[idx] = value
+    else:
+        attributes.append(value)
+    return attributes
+
+
+def to_int(value):
+    """Cast a parcel number the way the field calculator did (NULL when not numeric)"""
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def fix_geometry(geom, geometry_type=QgsWkbTypes.PolygonGeometry):
+    """Repair a geometry with the Structure method, like native:fixgeometries METHOD=1.
+
+    Returns a multi-type geometry of the requested type, or None when nothing
+    usable survives the repair.
+    """
+    if geom is None or geom.isNull() or geom.isEmpty():
+        return None
+    try:
+        fixed = geom.makeValid(Qgis.MakeValidMethod.Structure)
+    except (AttributeError, TypeError):
+        # QGIS < 3.28 only offers the linework method
+        fixed = geom.makeValid()
+    if fixed is None or fixed.isNull() or fixed.isEmpty():
+        return None
+    if fixed.type() != geometry_type:
+        fixed.convertGeometryCollectionToSubclass(geometry_type)
+        if fixed.isEmpty() or fixed.type() != geometry_type:
+            return None
+    fixed.convertToMultiType()
+    return fixed
+
+
+def iter_rings(geom):
+    """Yield (part, ring, linestring) for every ring of a polygon or part of a line"""
+    for part_index, part in enumerate(geom.constParts()):
+        if hasattr(part, 'exteriorRing'):
+            exterior = part.exteriorRing()
+            if exterior is not None:
+                yield part_index, 0, exterior
+            for ring_index in range(part.numInteriorRings()):
+                yield part_index, ring_index + 1, part.interiorRing(ring_index)
+        else:
+            yield part_index, 0, part
+
+
+def iter_segments(geom):
+    """Yield (start, end) QgsPoint pairs walking each ring once, as boundary+explodelines did"""
+    for _, _, ring in iter_rings(geom):
+        points = ring.points()
+        for i in range(len(points) - 1):
+            yield points[i], points[i + 1]
+
+
+def _line_angle(start, end):
+    """QgsGeometryUtils::lineAngle: clockwise from north, in [0, 2 pi)"""
+    return (math.pi / 2 - math.atan2(end.y() - start.y(), end.x() - start.x())) % (2 * math.pi)
+
+
+def _average_angle(previous, current, following):
+    """QgsGeometryUtils::averageAngle of the two segments meeting at current"""
+    a1 = _line_angle(previous, current)
+    a2 = _line_angle(current, following)
+    clockwise = (a2 - a1) % (2 * math.pi)
+    if clockwise <= 2 * math.pi - clockwise:
+        return (a1 + clockwise / 2) % (2 * math.pi)
+    return (a1 - (2 * math.pi - clockwise) / 2) % (2 * math.pi)
+
+
+def ring_vertex_angles(points):
+    """Radians QgsGeometry.angleAtVertex gives each point of one ring or line part"""
+    n = len(points)
+    if n < 2:
+        return [0.0] * n
+    closed = points[0].x() == points[-1].x() and points[0].y() == points[-1].y()
+    angles = []
+    for i in range(n):
+        if 0 < i < n - 1:
+            angles.append(_average_angle(points[i - 1], points[i], points[i + 1]))
+        elif closed:
+            angles.append(_average_angle(points[n - 2], points[0], points[1]))
+        elif i == 0:
+            angles.append(_line_angle(points[0], points[1]))
+        else:
+            angles.append(_line_angle(points[n - 2], points[n - 1]))
+    return angles
+
+
+def segment_length(start, end):
+    """length3D() of a two point segment"""
+    if start.is3D() and end.is3D():
+        return start.distance3D(end)
+    return start.distance(end)
+
+
+def segment_geometry(start, end):
+    return QgsGeometry(QgsLineString([start, end]))
+
+
+def exploded_segments(geom, ref_col):
+    """Yield (segment, [Ref_Col, Length]) for every two point segment of the rings"""
+    for start, end in iter_segments(geom):
+        yield segment_geometry(start, end), [ref_col, segment_length(start, end)]
+
+
+class SharedEdgeBuilder:
+    """Collects exploded segments, keeping an edge shared by two polygons once.
+
+    Segments are keyed by their snapped endpoints in canonical order, so the
+    same edge walked in either direction by the neighbouring polygon maps to
+    one entry; the neighbour's Ref_Col is recorded in Ref_Col_2.  Context
+    polygons only contribute their Ref_Col to edges they share.
+    """
+
+    def __init__(self, tolerance=SHARED_EDGE_TOLERANCE):
+        self.tolerance = tolerance
+        self._edges = {}
+        self._extra = []
+        self._context = {}
+
+    def _key(self, start, end):
+        t = self.tolerance
+        a = (round(start.x() / t), round(start.y() / t))
+        b = (round(end.x() / t), round(end.y() / t))
+        return (a, b) if a <= b else (b, a)
+
+    def add_context(self, geom, ref_col):
+        for start, end in iter_segments(geom):
+            self._context.setdefault(self._key(start, end), ref_col)
+
+    def add(self, geom, ref_col):
+        for start, end in iter_segments(geom):
+            key = self._key(start, end)
+            edge = self._edges.get(key)
+            if edge is None:
+                self._edges[key] = [segment_geometry(start, end), ref_col,
+                                    segment_length(start, end), self._context.get(key)]
+            elif ref_col in (edge[1], edge[3]):
+                # The same polygon walking over one of its own edges again
+                continue
+            elif edge[3] is None:
+                edge[3] = ref_col
+            else:
+                # More than two polygons on one edge; keep the extra copy
+                self._extra.append([segment_geometry(start, end), ref_col,
+                                    segment_length(start, end), None])
+
+    def features(self):
+        """Yield (segment, [Ref_Col, Length, Ref_Col_2]) in first-seen order"""
+        for segment, ref_col, length, ref_col_2 in list(self._edges.values()) + self._extra:
+            yield segment, [ref_col, length, ref_col_2]
+
+
+def boundary_geometry(geom):
+    """native:boundary for a polygon geometry"""
+    boundary = geom.constGet().boundary()
+    if boundary is None:
+        return None
+    return QgsGeometry(boundary)
+
+
+class DeliverableSink:
+    """Append-only sink writing straight to a deliverable file"""
+
+    def __init__(self, name, writer, fields):
+        self.name = name
+        self.fields = fields
+        self.count = 0
+        self._writer = writer
+
+    def add(self, geometry, attributes):
+        feature = QgsFeature(self.fields)
+        feature.setGeometry(geometry)
+        feature.setAttributes(attributes)
+        if not self._writer.addFeature(feature):
+            raise QgsProcessingException(
+                f"Could not write feature to {self.name}: {self._writer.errorMessage()}")
+        self.count += 1
+
+    def close(self):
+        # Dropping the last reference flushes and closes the OGR dataset
+        self._writer = None
+
+
+class ShapefileDeliverableWriter:
+    """Creates one ESRI Shapefile per deliverable inside the output folder"""
+
+    driver_name = 'ESRI Shapefile'
+
+    def __init__(self, folder, crs, transform_context):
+        self.folder = folder
+        self.crs = crs
+        self.transform_context = transform_context
+
+    def path(self, name):
+        return os.path.join(self.folder, f"{name}.shp")
+
+    def layer_uri(self, name):
+        return self.path(name)
+
+    def create(self, name, fields, wkb_type):
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = self.driver_name
+        options.fileEncoding = 'UTF-8'
+        writer = QgsVectorFileWriter.create(
+            self.path(name), fields, wkb_type, self.crs, self.transform_context, options)
+        if writer.hasError() != QgsVectorFileWriter.NoError:
+            raise QgsProcessingException(
+                f"Could not create {self.path(name)}: {writer.errorMessage()}")
+        return DeliverableSink(name, writer, fields)
+
+    def finish(self):
+        # Builtup_Shapefile is queried spatially once loaded; build its .qix now
+        layer = QgsVectorLayer(self.layer_uri(BUILTUP_SHAPEFILE), BUILTUP_SHAPEFILE, 'ogr')
+        if layer.isValid():
+            layer.dataProvider().createSpatialIndex()
+
+
+class GeoPackageSink:
+    """Streams one deliverable into its GeoPackage layer in fixed-size batches"""
+
+    BATCH_SIZE = 10000
+
+    def __init__(self, name, writer, uri, fields):
+        self.name = name
+        self.fields = fields
+        self.count = 0
+        self._writer = writer
+        self._layer = QgsVectorLayer(uri, name, 'ogr')
+        if not self._layer.isValid():
+            raise QgsProcessingException(f"Could not open {uri}")
+        self._pending = []
+
+    def add(self, geometry, attributes):
+        feature = QgsFeature(self.fields)
+        feature.setGeometry(geometry)
+        feature.setAttributes(attributes)
+        self._pending.append(feature)
+        self.count += 1
+        if len(self._pending) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._writer.insert(self.name, self._layer.dataProvider(), self._pending)
+            self._pending = []
+
+    def close(self):
+        if self._layer is not None:
+            self._flush()
+            self._writer.index(self._layer.dataProvider())
+            self._layer = None
+
+
+class GeoPackageDeliverableWriter:
+    """Writes every deliverable as a layer of one GeoPackage in the output folder
+
+    Layers are created without an R-tree; features are inserted in batches of
+    GeoPackageSink.BATCH_SIZE, one transaction each, and the R-tree of a
+    layer is built once it is complete.  Database writes are serialised so
+    the parallel branches never contend for the SQLite lock.
+    """
+
+    driver_name = 'GPKG'
+    file_name = 'PPM_Deliverables.gpkg'
+
+    def __init__(self, folder, crs, transform_context):
+        self.folder = folder
+        self.crs = crs
+        self.transform_context = transform_context
+        self._lock = threading.Lock()
+        self._file_created = False
+
+    def path(self, name=None):
+        return os.path.join(self.folder, self.file_name)
+
+    def layer_uri(self, name):
+        return f"{self.path()}|layername={name}"
+
+    def create(self, name, fields, wkb_type):
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = self.driver_name
+        options.layerName = name
+        options.fileEncoding = 'UTF-8'
+        options.layerOptions = ['SPATIAL_INDEX=NO']
+        with self._lock:
+            # The first layer replaces the previous GeoPackage, the rest are added to it
+            options.actionOnExistingFile = (
+                QgsVectorFileWriter.CreateOrOverwriteLayer if self._file_created
+                else QgsVectorFileWriter.CreateOrOverwriteFile)
+            writer = QgsVectorFileWriter.create(
+                self.path(), fields, wkb_type, self.crs, self.transform_context, options)
+            if writer.hasError() != QgsVectorFileWriter.NoError:
+                raise QgsProcessingException(
+                    f"Could not create {name} in {self.path()}: {writer.errorMessage()}")
+            del writer
+            self._file_created = True
+            return GeoPackageSink(name, self, self.layer_uri(name), fields)
+
+    def insert(self, name, provider, features):
+        with self._lock:
+            # The OGR provider wraps a single addFeatures call in one transaction
+            if not provider.addFeatures(features)[0]:
+                raise QgsProcessingException(
+                    f"Could not write features to {name}: {'; '.join(provider.errors())}")
+
+    def index(self, provider):
+        with self._lock:
+            provider.createSpatialIndex()
+
+    def finish(self):
+        pass
+
+
+DELIVERABLE_WRITERS = [ShapefileDeliverableWriter, GeoPackageDeliverableWriter]
+
+
+class PlotRecord:
+    """A fixed plot polygon kept in memory for the plinth overlay"""
+
+    __slots__ = ('fid', 'geometry', 'attributes')
+
+    def __init__(self, fid, geometry, attributes):
+        self.fid = fid
+        self.geometry = geometry
+        self.attributes = attributes
+
+
+class PPMEngine:
+    """Builds all PPM deliverables in one streaming pass over each input.
+
+    :param plot_layer: QgsVectorLayer - plot area polygons
+    :param plinth_layer: QgsVectorLayer - builtup (plinth) polygons
+    :param parcel_field: str - property parcel number field copied into Ref_Col
+    :param writer: deliverable writer (see DELIVERABLE_WRITERS)
+    :param feedback: QgsProcessingFeedback used for progress and cancellation
+    """
+
+    def __init__(self, plot_layer, plinth_layer, parcel_field, writer, feedback,
+                 shared_edge_tolerance=None):
+        self.plot_source = QgsVectorLayerFeatureSource(plot_layer)
+        self.plinth_source = QgsVectorLayerFeatureSource(plinth_layer)
+        self.plot_total = max(plot_layer.featureCount(), 0)
+        self.plinth_total = max(plinth_layer.featureCount(), 0)
+        self.parcel_field = parcel_field
+        self.writer = writer
+        self.feedback = feedback
+        self.shared_edge_tolerance = shared_edge_tolerance
+        # Optional StepProfiler timing the read and write phases
+        self.profiler = None
+
+        self.plot_fields, self.plot_ref_idx = with_field(
+            plot_layer.fields(), ref_col_field())
+        self.parcel_idx = plot_layer.fields().lookupField(parcel_field)
+        if self.parcel_idx < 0:
+            raise QgsProcessingException(
+                f"Field '{parcel_field}' not found in the Plot Area layer")
+        self.plinth_fields = QgsFields(plinth_layer.fields())
+        self.plot_wkb = QgsWkbTypes.multiType(plot_layer.wkbType())
+        self.plinth_wkb = QgsWkbTypes.multiType(plinth_layer.wkbType())
+
+        self.builtup_fields, self.area_idx = with_field(
+            QgsProcessingUtils.combineFields(self.plinth_fields, self.plot_fields),
+            QgsField(AREA, QVariant.Double, 'double precision', 10, 2))
+        self.builtup_ref_idx = self.builtup_fields.lookupField(REF_COL)
+
+        self.counts = {}
+        # Builtup parts dropped by the small part filter
+        self.small_parts = 0
+        self._progress_done = 0
+        self._progress_total = max(2 * (self.plot_total + self.plinth_total), 1)
+        self._progress_lock = threading.Lock()
+
+    # -- helpers ---------------------------------------------------------
+
+    def _step(self):
+        # Both branches report here when running in parallel
+        with self._progress_lock:
+            self._progress_done += 1
+            done = self._progress_done
+        if done % 100 == 0:
+            self.feedback.setProgress(100.0 * done / self._progress_total)
+
+    def _line_wkb(self, polygon_wkb):
+        line = QgsWkbTypes.MultiLineString
+        if QgsWkbTypes.hasZ(polygon_wkb):
+            line = QgsWkbTypes.addZ(line)
+        if QgsWkbTypes.hasM(polygon_wkb):
+            line = QgsWkbTypes.addM(line)
+        return line
+
+    def _segment_wkb(self, polygon_wkb):
+        return QgsWkbTypes.singleType(self._line_wkb(polygon_wkb))
+
+    def _point_wkb(self, polygon_wkb):
+        point = QgsWkbTypes.Point
+        if QgsWkbTypes.hasZ(polygon_wkb):
+            point = QgsWkbTypes.addZ(point)
+        if QgsWkbTypes.hasM(polygon_wkb):
+            point = QgsWkbTypes.addM(point)
+        return point
+
+    def _close(self, *sinks):
+        for sink in sinks:
+            sink.close()
+            self.counts[sink.name] = sink.count
+
+    @staticmethod
+    def write_segments(sink, geom, ref_col):
+        for segment, attributes in exploded_segments(geom, ref_col):
+            sink.add(segment, attributes)
+
+    @staticmethod
+    def write_vertices(sink, geom, attributes):
+        """Write every vertex like native:extractvertices
+
+        The distance runs on across rings and parts, in 2D, as
+        QgsGeometry.distanceToVertex measures it; it and the angle are
+        computed from the ring points in one walk instead of per vertex.
+        """
+        vertex_index = 0
+        distance = 0.0
+        previous = None
+        for part_index, ring_index, ring in iter_rings(geom):
+            points = ring.points()
+            for part_vertex, (point, angle) in enumerate(zip(points, ring_vertex_angles(points))):
+                if previous is not None:
+                    distance += math.hypot(point.x() - previous.x(), point.y() - previous.y())
+                previous = point
+                sink.add(QgsGeometry(point.clone()), attributes + [
+                    vertex_index, part_index, ring_index, part_vertex,
+                    distance, math.degrees(angle)])
+                vertex_index += 1
+
+    # -- plot branch ------------------------------------------------------
+
+    def read_plots(self, request=None):
+        """Single pass over the plot layer.
+
+        Fixes each geometry and fills Ref_Col.  Returns the fixed plots, in
+        read order, and a spatial index over them for the plinth overlay, or
+        None when cancelled.
+        """
+        plots = {}
+        index = QgsSpatialIndex()
+        for feature in self.plot_source.getFeatures(request or QgsFeatureRequest()):
+            if self.feedback.isCanceled():
+                return None
+            self._step()
+            geom = fix_geometry(feature.geometry())
+            if geom is None:
+                continue
+            ref_col = to_int(feature.attributes()[self.parcel_idx])
+            attributes = set_attribute(
+                feature.attributes(), self.plot_ref_idx, ref_col)
+            plots[feature.id()] = PlotRecord(feature.id(), geom, attributes)
+            index.addFeature(feature.id(), geom.boundingBox())
+        return plots, index
+
+    def write_plots(self, plots, edge_context=None):
+        """Stream Plot_Shapefile, Plot_Boundary, Plot_ExplodeLines and Plot_Vertices
+
+        With shared edge deduplication Plot_ExplodeLines is written once every
+        plot has been walked; edge_context holds unchanged neighbouring plots
+        whose Ref_Col is still recorded on the edges they share.
+        """
+        writer = self.writer
+        edges = None
+        if self.shared_edge_tolerance is not None:
+            edges = SharedEdgeBuilder(self.shared_edge_tolerance)
+            for plot in (edge_context or {}).values():
+                edges.add_context(plot.geometry, plot.attributes[self.plot_ref_idx])
+        plot_sink = writer.create(PLOT_SHAPEFILE, self.plot_fields, self.plot_wkb)
+        boundary_sink = writer.create(
+            PLOT_BOUNDARY, self.plot_fields, self._line_wkb(self.plot_wkb))
+        explode_sink = writer.create(
+            PLOT_EXPLODELINES, exploded_line_fields() if edges is None else shared_edge_fields(),
+            self._segment_wkb(self.plot_wkb))
+        vertex_sink = writer.create(
+            PLOT_VERTICES, vertex_fields(self.plot_fields), self._point_wkb(self.plot_wkb))
+        try:
+            for plot in plots.values():
+                if self.feedback.isCanceled():
+                    return False
+                self._step()
+                geom = plot.geometry
+                plot_sink.add(geom, plot.attributes)
+                boundary = boundary_geometry(geom)
+                if boundary is not None:
+                    boundary_sink.add(boundary, plot.attributes)
+                ref_col = plot.attributes[self.plot_ref_idx]
+                if edges is None:
+                    self.write_segments(explode_sink, geom, ref_col)
+                else:
+                    edges.add(geom, ref_col)
+                self.write_vertices(vertex_sink, geom, plot.attributes)
+            if edges is not None:
+                for segment, attributes in edges.features():
+                    explode_sink.add(segment, attributes)
+        finally:
+            self._close(plot_sink, boundary_sink, explode_sink, vertex_sink)
+        return True
+
+    # -- plinth branch ----------------------------------------------------
+
+    def read_plinths(self, request=None):
+        """Single pass over the plinth layer returning (fid, geometry, attributes)"""
+        plinths = []
+        for feature in self.plinth_source.getFeatures(request or QgsFeatureRequest()):
+            if self.feedback.isCanceled():
+                return None
+            self._step()
+            geom = fix_geometry(feature.geometry())
+            if geom is None:
+                continue
+            plinths.append((feature.id(), geom, feature.attributes()))
+        return plinths
+
+    # -- overlay ------------------------------------------------------------
+
+    def intersect(self, plinths, plots, index):
+        """Yield (geometry, attributes) of every plinth/plot intersection.
+
+        Matches native:intersection: plinth attributes first, then plot
+        attributes; the Area is filled in by drop_small_parts().
+        """
+        for _, plinth_geom, plinth_attributes in plinths:
+            if self.feedback.isCanceled():
+                return
+            self._step()
+            candidates = sorted(index.intersects(plinth_geom.boundingBox()))
+            if not candidates:
+                continue
+            engine = QgsGeometry.createGeometryEngine(plinth_geom.constGet())
+            engine.prepareGeometry()
+            for plot_fid in candidates:
+                plot = plots[plot_fid]
+                if not engine.intersects(plot.geometry.constGet()):
+                    continue
+                part = plinth_geom.intersection(plot.geometry)
+                if part.isEmpty():
+                    continue
+                if part.type() != QgsWkbTypes.PolygonGeometry:
+                    part.convertGeometryCollectionToSubclass(
+                        QgsWkbTypes.PolygonGeometry)
+                    if part.isEmpty():
+                        continue
+                part.convertToMultiType()
+                yield part, list(plinth_attributes) + list(plot.attributes)
+
+    def partitioned_intersect(self, plinths, plots, workers):
+        """Same output as intersect(), computed tile by tile on worker processes"""
+        overlay = PartitionedIntersection(workers, self.feedback)
+        # Small parts are dropped with the serial ones in drop_small_parts()
+        results = overlay.run(plinths, plots, 0)
+        if results is None:
+            return
+        for _ in plinths:
+            self._step()
+        for order, plot_fid, part, _ in results:
+            if self.feedback.isCanceled():
+                return
+            yield part, list(plinths[order][2]) + list(plots[plot_fid].attributes)
+
+    def overlay(self, plinths, plots, index, intersection_workers=None):
+        if intersection_workers is None:
+            return self.intersect(plinths, plots, index)
+        return self.partitioned_intersect(plinths, plots, intersection_workers)
+
+    def drop_small_parts(self, parts):
+        """Drop builtup parts under MIN_BUILTUP_AREA and fill in the Area of the rest
+
+        Parts are measured AREA_BATCH_SIZE at a time on one coordinate array
+        (see geometry_arrays), so the stream stays bounded in memory.
+        """
+        batch = []
+        for part in parts:
+            batch.append(part)
+            if len(batch) >= AREA_BATCH_SIZE:
+                yield from self._measured(batch)
+                batch = []
+        yield from self._measured(batch)
+
+    def _measured(self, batch):
+        areas = polygon_areas([geom for geom, _ in batch])
+        for (geom, attributes), area in zip(batch, areas):
+            # NaN (no geometry) fails the comparison as well
+            if not area >= MIN_BUILTUP_AREA:
+                self.small_parts += 1
+                continue
+            yield geom, set_attribute(attributes, self.area_idx, area)
+
+    def write_builtup(self, parts):
+        """Stream Builtup_Shapefile, Builtup_Boundary and Builtup_ExplodeLines"""
+        writer = self.writer
+        builtup_sink = writer.create(
+            BUILTUP_SHAPEFILE, self.builtup_fields, self.plinth_wkb)
+        boundary_sink = writer.create(
+            BUILTUP_BOUNDARY, self.builtup_fields, self._line_wkb(self.plinth_wkb))
+        explode_sink = writer.create(
+            BUILTUP_EXPLODELINES, exploded_line_fields(), self._segment_wkb(self.plinth_wkb))
+        try:
+            for geom, attributes in self.drop_small_parts(parts):
+                builtup_sink.add(geom, attributes)
+                boundary = boundary_geometry(geom)
+                if boundary is not None:
+                    boundary_sink.add(boundary, attributes)
+                ref_col = attributes[self.builtup_ref_idx] if self.builtup_ref_idx >= 0 else None
+                self.write_segments(explode_sink, geom, ref_col)
+        finally:
+            self._close(builtup_sink, boundary_sink, explode_sink)
+        return not self.feedback.isCanceled()
+
+    # -- driver -------------------------------------------------------------
+
+    def read_inputs(self, pool=None):
+        """Read and fix both inputs; returns (plots, index, plinths) or None when cancelled"""
+        with profile_step(self.profiler, 'engine: read and fix inputs',
+                          self.plot_total + self.plinth_total) as step:
+            if pool is not None:
+                plot_job = pool.submit(self.read_plots)
+                plinth_job = pool.submit(self.read_plinths)
+                plot_result, plinths = plot_job.result(), plinth_job.result()
+            else:
+                plot_result = self.read_plots()
+                plinths = self.read_plinths() if plot_result is not None else None
+            if plot_result is None or plinths is None:
+                return None
+            plots, index = plot_result
+            step.features_out = len(plots) + len(plinths)
+        return plots, index, plinths
+
+    def write_outputs(self, plots, index, plinths, pool=None, intersection_workers=None,
+                      edge_context=None):
+        """Write the plot and builtup deliverables; returns False when cancelled"""
+        with profile_step(self.profiler, 'engine: overlay and write deliverables',
+                          len(plots) + len(plinths)) as step:
+            parts = self.overlay(plinths, plots, index, intersection_workers)
+            if pool is not None:
+                plot_job = pool.submit(self.write_plots, plots, edge_context)
+                builtup_job = pool.submit(self.write_builtup, parts)
+                done = plot_job.result() and builtup_job.result()
+            else:
+                done = self.write_plots(plots, edge_context) and self.write_builtup(parts)
+            step.features_out = sum(self.counts.values())
+        return done
+
+    def finish(self):
+        self.feedback.pushInfo(
+            f"{PLOT_SHAPEFILE}: {self.counts[PLOT_SHAPEFILE]} plots written")
+        self.feedback.pushInfo(
+            f"{BUILTUP_SHAPEFILE}: {self.counts[BUILTUP_SHAPEFILE]} builtup parts written")
+        if self.small_parts:
+            self.feedback.pushInfo(
+                f"{BUILTUP_SHAPEFILE}: {self.small_parts} parts smaller than "
+                f"{MIN_BUILTUP_AREA} sq.m dropped")
+        self.writer.finish()
+        self.feedback.setProgress(100)
+
+    def run(self, parallel=False, intersection_workers=None):
+        """Generate every deliverable; returns False when cancelled.
+
+        With parallel=True the plot and plinth branches, which only meet at
+        the overlay, run concurrently on a two thread pool: first reading and
+        fixing both inputs, then writing the plot deliverables while the
+        overlay streams the builtup ones.  Nothing here touches the project,
+        so the caller keeps every project change on the main thread.
+
+        intersection_workers switches the overlay to the grid-partitioned
+        process pool (0 = one worker per CPU); None keeps it in-process.
+        """
+        with thread_pool(parallel) as pool:
+            inputs = self.read_inputs(pool)
+            if inputs is None:
+                return False
+            if not self.write_outputs(*inputs, pool=pool,
+                                      intersection_workers=intersection_workers):
+                return False
+        self.finish()
+        return True
+
+
+@contextmanager
+def thread_pool(parallel):
+    """Two worker threads for the plot and plinth branches, or None when serial"""
+    if not parallel:
+        yield None
+        return
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='ppm') as pool:
+        yield pool
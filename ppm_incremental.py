@@ -0,0 +1,295 @@
+"""
+Incremental regeneration of the PPM deliverables.
+
+Every plot and plinth is fingerprinted by a hash of its geometry and
+attributes.  The fingerprints are stored next to the project after each run;
+on the next run only the parcels whose plot changed, or whose plinths
+changed, are regenerated together with their neighbouring parcels.  The
+derived features of those parcels are deleted from the existing deliverables
+by Ref_Col and written again, everything else is left untouched.
+
+Anything that would make a patch unsafe (no previous run, different inputs or
+schema, missing deliverables, empty or duplicate Ref_Col values) falls back to
+a full rebuild.
+"""
+
+import json
+import os
+import threading
+
+from qgis.core import (
+    QgsFeature, QgsFeatureRequest, QgsProcessingException, QgsRectangle,
+    QgsSpatialIndex, QgsVectorLayer
+)
+
+from .fingerprints import fingerprint
+from .ppm_engine import (
+    DELIVERABLES, MIN_BUILTUP_AREA, REF_COL, REF_COL_2, thread_pool, to_int
+)
+
+FINGERPRINT_FILE = 'ppm_fingerprints.json'
+FINGERPRINT_VERSION = 2
+
+# Neighbour search grows each changed bounding box by this much (map units),
+# so parcels that only touch a changed parcel are regenerated as well
+NEIGHBOUR_TOLERANCE = 1e-6
+
+
+def _bbox(geometry):
+    box = geometry.boundingBox()
+    return [box.xMinimum(), box.yMinimum(), box.xMaximum(), box.yMaximum()]
+
+
+def _rectangle(bbox):
+    rect = QgsRectangle(*bbox)
+    rect.grow(NEIGHBOUR_TOLERANCE)
+    return rect
+
+
+class FingerprintStore:
+    """JSON file holding the fingerprints of the last successful run
+
+    :param folder: str - project folder
+    """
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, FINGERPRINT_FILE)
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != FINGERPRINT_VERSION:
+            return None
+        return data
+
+    def save(self, signature, plots, plinths):
+        data = {'version': FINGERPRINT_VERSION, 'signature': signature,
+                'plots': plots, 'plinths': plinths}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class PatchSink:
+    """Replaces the features of the dirty parcels in an existing deliverable
+
+    The old features whose Ref_Col is in ``keys`` are deleted on creation; the
+    regenerated ones are added in batches and flushed on close().
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, name, uri, keys, lock):
+        self.name = name
+        self.count = 0
+        self._lock = lock
+        self.layer = QgsVectorLayer(uri, name, 'ogr')
+        if not self.layer.isValid():
+            raise QgsProcessingException(f"Could not open {uri}")
+        self.provider = self.layer.dataProvider()
+        self.fields = self.layer.fields()
+        self._pending = []
+        with self._lock:
+            self._delete(keys)
+
+    def _delete(self, keys):
+        # Shared plot edges also belong to the parcel in Ref_Col_2
+        key_idx = [idx for idx in (self.fields.lookupField(REF_COL),
+                                   self.fields.lookupField(REF_COL_2)) if idx >= 0]
+        request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(key_idx)
+        stale = [feature.id() for feature in self.provider.getFeatures(request)
+                 if any(to_int(feature.attributes()[idx]) in keys for idx in key_idx)]
+        if stale and not self.provider.deleteFeatures(stale):
+            raise QgsProcessingException(f"Could not update {self.name}")
+
+    def add(self, geometry, attributes):
+        feature = QgsFeature(self.fields)
+        feature.setGeometry(geometry)
+        feature.setAttributes(attributes)
+        self._pending.append(feature)
+        self.count += 1
+        if len(self._pending) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            with self._lock:
+                added = self.provider.addFeatures(self._pending)[0]
+            if not added:
+                raise QgsProcessingException(f"Could not write features to {self.name}")
+            self._pending = []
+
+    def close(self):
+        if self.layer is not None:
+            self._flush()
+            self.layer = None
+            self.provider = None
+
+
+class PatchingDeliverableWriter:
+    """Deliverable writer that patches the files of an existing writer in place
+
+    :param base: the writer that produced the deliverables (paths and finish)
+    :param keys: set of Ref_Col values to regenerate
+    """
+
+    def __init__(self, base, keys):
+        self.base = base
+        self.keys = keys
+        # Deliverables may share one GeoPackage; keep its writes serialised
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        return self.base.path(name)
+
+    def layer_uri(self, name):
+        return self.base.layer_uri(name)
+
+    def create(self, name, fields, wkb_type):
+        return PatchSink(name, self.layer_uri(name), self.keys, self._lock)
+
+    def finish(self):
+        self.base.finish()
+
+
+class IncrementalPPM:
+    """Runs a PPMEngine, patching only the parcels changed since the last run
+
+    :param engine: PPMEngine writing through ``engine.writer``
+    :param folder: str - project folder holding the fingerprints
+    :param signature: dict - inputs and settings; a mismatch forces a full rebuild
+    """
+
+    def __init__(self, engine, folder, signature):
+        self.engine = engine
+        self.feedback = engine.feedback
+        self.store = FingerprintStore(folder)
+        self.signature = dict(signature,
+                              plot_fields=engine.plot_fields.names(),
+                              plinth_fields=engine.plinth_fields.names(),
+                              min_builtup_area=MIN_BUILTUP_AREA)
+
+    def fingerprints(self, plots, plinths):
+        """Plot fingerprints by Ref_Col and plinth fingerprints by themselves
+
+        Feature ids are not used: deleting a feature from a shapefile
+        renumbers every later one.  Plinths have no key of their own, so a
+        plinth changes by its fingerprint appearing or disappearing; the count
+        covers identical copies.
+        """
+        plot_prints = {
+            str(plot.attributes[self.engine.plot_ref_idx]):
+                [fingerprint(plot.geometry, plot.attributes), _bbox(plot.geometry)]
+            for plot in plots.values()}
+        plinth_prints = {}
+        for _, geom, attributes in plinths:
+            entry = plinth_prints.setdefault(fingerprint(geom, attributes), [_bbox(geom), 0])
+            entry[1] += 1
+        return plot_prints, plinth_prints
+
+    def parcels_unique(self, plots):
+        """True if every plot has its own, non-empty Ref_Col"""
+        ref_cols = [plot.attributes[self.engine.plot_ref_idx] for plot in plots.values()]
+        return None not in ref_cols and len(set(ref_cols)) == len(ref_cols)
+
+    def can_patch(self, previous, plots):
+        """Reason a patch is not possible, or None"""
+        if previous is None:
+            return "no fingerprints from a previous run"
+        if previous['signature'] != self.signature:
+            return "the inputs or settings changed"
+        for name in DELIVERABLES:
+            if not os.path.exists(self.engine.writer.path(name)):
+                return f"{name} is missing"
+        # Builtup features must carry the plot's Ref_Col to be patched by it
+        engine = self.engine
+        if engine.builtup_ref_idx != engine.plinth_fields.count() + engine.plot_ref_idx:
+            return "the plinth layer has its own Ref_Col field"
+        if not self.parcels_unique(plots):
+            return "property parcel numbers are empty or not unique"
+        return None
+
+    def dirty_parcels(self, previous, plots, index, plot_prints, plinth_prints):
+        """Fids of the current plots to regenerate and the Ref_Col keys to replace"""
+        old_plots, old_plinths = previous['plots'], previous['plinths']
+        regions = []
+        keys = set()
+        for ref_col in set(old_plots) | set(plot_prints):
+            old, new = old_plots.get(ref_col), plot_prints.get(ref_col)
+            if old is not None and new is not None and old[0] == new[0]:
+                continue
+            keys.add(to_int(ref_col))
+            regions.extend(entry[1] for entry in (old, new) if entry is not None)
+        for print_ in set(old_plinths) | set(plinth_prints):
+            old, new = old_plinths.get(print_), plinth_prints.get(print_)
+            if old is not None and new is not None and old[1] == new[1]:
+                continue
+            regions.append((old or new)[0])
+
+        dirty = set()
+        for bbox in regions:
+            dirty.update(index.intersects(_rectangle(bbox)))
+        keys.update(plots[fid].attributes[self.engine.plot_ref_idx] for fid in dirty)
+        # An old parcel number reused by another plot must be rebuilt there too
+        dirty.update(fid for fid, plot in plots.items()
+                     if plot.attributes[self.engine.plot_ref_idx] in keys)
+        keys.discard(None)
+        return dirty, keys
+
+    def edge_context(self, plots, index, dirty):
+        """Unchanged plots touching a dirty one, for shared edge deduplication"""
+        if self.engine.shared_edge_tolerance is None:
+            return None
+        context = set()
+        for fid in dirty:
+            context.update(index.intersects(_rectangle(_bbox(plots[fid].geometry))))
+        return {fid: plots[fid] for fid in sorted(context - dirty)}
+
+    def run(self, parallel=False, intersection_workers=None):
+        """Generate or patch the deliverables; returns False when cancelled"""
+        engine = self.engine
+        previous = self.store.load()
+        # Until this run completes the deliverables may not match any fingerprint
+        self.store.clear()
+        with thread_pool(parallel) as pool:
+            inputs = engine.read_inputs(pool)
+            if inputs is None:
+                return False
+            plots, index, plinths = inputs
+            plot_prints, plinth_prints = self.fingerprints(plots, plinths)
+            # Fingerprints keyed by a duplicated Ref_Col would hide changes; rebuild next time
+            keep_prints = self.parcels_unique(plots)
+
+            reason = self.can_patch(previous, plots)
+            edge_context = None
+            if reason is not None:
+                self.feedback.pushInfo(f"Full rebuild: {reason}")
+            else:
+                dirty, keys = self.dirty_parcels(
+                    previous, plots, index, plot_prints, plinth_prints)
+                self.feedback.pushInfo(
+                    f"Incremental update: regenerating {len(keys)} of {len(plots)} parcels")
+                edge_context = self.edge_context(plots, index, dirty)
+                plots = {fid: plots[fid] for fid in sorted(dirty)}
+                index = QgsSpatialIndex()
+                for fid, plot in plots.items():
+                    index.addFeature(fid, plot.geometry.boundingBox())
+                engine.writer = PatchingDeliverableWriter(engine.writer, keys)
+
+            if not engine.write_outputs(plots, index, plinths, pool=pool,
+                                        intersection_workers=intersection_workers,
+                                        edge_context=edge_context):
+                return False
+        engine.finish()
+        if keep_prints:
+            self.store.save(self.signature, plot_prints, plinth_prints)
+        return True
@@ -0,0 +1,180 @@
+"""
+Grid-partitioned plinth/plot intersection.
+
+The village extent is split into tiles and each tile is intersected in a
+worker process.  A plinth/plot pair is only evaluated by the tile holding the
+lower-left corner of the overlap of their bounding boxes, so features that
+straddle tile edges are never emitted twice.  Results are merged back in the
+order the serial overlay produces them (plinth read order, then plot id), so
+Builtup_Shapefile is identical to the single process output.
+
+Geometries cross the process boundary as WKB; attributes never leave the
+main process.
+"""
+
+import math
+from concurrent.futures import as_completed
+
+from qgis.core import QgsGeometry, QgsRectangle, QgsSpatialIndex, QgsWkbTypes
+
+from .process_pool import create_process_pool, worker_count
+
+# Tiles per worker, so a dense tile does not leave the other workers idle
+TILES_PER_WORKER = 4
+
+
+def _geometry_from_wkb(wkb):
+    geom = QgsGeometry()
+    geom.fromWkb(wkb)
+    return geom
+
+
+def _tile_range(start, end, origin, size, count):
+    # Pad by one tile so rounding at tile edges never loses the owning tile
+    first = int(math.floor((start - origin) / size)) - 1
+    last = int(math.floor((end - origin) / size)) + 1
+    return max(first, 0), min(last, count - 1)
+
+
+def _owns(tile, x, y):
+    """Half-open tile membership; the last row/column also owns the far edge"""
+    xmin, ymin, xmax, ymax, last_col, last_row = tile
+    in_x = xmin <= x and (x < xmax or last_col)
+    in_y = ymin <= y and (y < ymax or last_row)
+    return in_x and in_y
+
+
+def intersect_tile(tile, plinths, plots, min_area):
+    """Intersect one tile; runs in a worker process.
+
+    :param tile: (xmin, ymin, xmax, ymax, last_col, last_row)
+    :param plinths: list of (order, wkb)
+    :param plots: list of (fid, wkb)
+    :param min_area: parts with a smaller area are dropped
+    :returns: list of (order, plot_fid, wkb, area)
+    """
+    index = QgsSpatialIndex()
+    plot_geoms = {}
+    for fid, wkb in plots:
+        geom = _geometry_from_wkb(wkb)
+        plot_geoms[fid] = geom
+        index.addFeature(fid, geom.boundingBox())
+
+    results = []
+    for order, wkb in plinths:
+        plinth_geom = _geometry_from_wkb(wkb)
+        plinth_box = plinth_geom.boundingBox()
+        candidates = sorted(index.intersects(plinth_box))
+        if not candidates:
+            continue
+        engine = QgsGeometry.createGeometryEngine(plinth_geom.constGet())
+        engine.prepareGeometry()
+        for plot_fid in candidates:
+            plot_geom = plot_geoms[plot_fid]
+            plot_box = plot_geom.boundingBox()
+            # Only the tile owning the overlap's lower-left corner reports the pair
+            if not _owns(tile, max(plinth_box.xMinimum(), plot_box.xMinimum()),
+                         max(plinth_box.yMinimum(), plot_box.yMinimum())):
+                continue
+            if not engine.intersects(plot_geom.constGet()):
+                continue
+            part = plinth_geom.intersection(plot_geom)
+            if part.isEmpty():
+                continue
+            if part.type() != QgsWkbTypes.PolygonGeometry:
+                part.convertGeometryCollectionToSubclass(QgsWkbTypes.PolygonGeometry)
+                if part.isEmpty():
+                    continue
+            area = part.area()
+            if area < min_area:
+                continue
+            part.convertToMultiType()
+            results.append((order, plot_fid, bytes(part.asWkb()), area))
+    return results
+
+
+class PartitionedIntersection:
+    """Splits the plinth/plot overlay into tiles and runs them on a process pool
+
+    :param workers: int - worker processes, 0 for one per CPU
+    """
+
+    def __init__(self, workers, feedback):
+        self.workers = worker_count(workers)
+        self.feedback = feedback
+
+    def build_tiles(self, extent):
+        count = self.workers * TILES_PER_WORKER
+        width = max(extent.width(), 1e-9)
+        height = max(extent.height(), 1e-9)
+        cols = max(1, int(round(math.sqrt(count * width / height))))
+        rows = max(1, int(math.ceil(count / cols)))
+        return cols, rows, width / cols, height / rows
+
+    def partition(self, plinths, plots):
+        """Distribute plinths and plots to every tile their bounding box touches"""
+        if not plots:
+            return []
+        extent = QgsRectangle()
+        extent.setMinimal()
+        for plot in plots.values():
+            extent.combineExtentWith(plot.geometry.boundingBox())
+        cols, rows, tile_w, tile_h = self.build_tiles(extent)
+        x0, y0 = extent.xMinimum(), extent.yMinimum()
+
+        tiles = {}
+
+        def assign(box, key, item):
+            c0, c1 = _tile_range(box.xMinimum(), box.xMaximum(), x0, tile_w, cols)
+            r0, r1 = _tile_range(box.yMinimum(), box.yMaximum(), y0, tile_h, rows)
+            for c in range(c0, c1 + 1):
+                for r in range(r0, r1 + 1):
+                    tiles.setdefault((c, r), ([], []))[key].append(item)
+
+        for plot in plots.values():
+            assign(plot.geometry.boundingBox(), 1,
+                   (plot.fid, bytes(plot.geometry.asWkb())))
+        for order, (_, geom, _) in enumerate(plinths):
+            box = geom.boundingBox()
+            if not box.intersects(extent):
+                continue
+            assign(box, 0, (order, bytes(geom.asWkb())))
+
+        jobs = []
+        for (c, r), (tile_plinths, tile_plots) in sorted(tiles.items()):
+            if not tile_plinths or not tile_plots:
+                continue
+            tile = (x0 + c * tile_w, y0 + r * tile_h,
+                    x0 + (c + 1) * tile_w, y0 + (r + 1) * tile_h,
+                    c == cols - 1, r == rows - 1)
+            jobs.append((tile, tile_plinths, tile_plots))
+        return jobs
+
+    def run(self, plinths, plots, min_area):
+        """Return [(order, plot_fid, geometry, area)] sorted like the serial overlay"""
+        jobs = self.partition(plinths, plots)
+        results = []
+        pool = create_process_pool(self.workers) if len(jobs) > 1 else None
+        if pool is None:
+            if len(jobs) > 1:
+                self.feedback.pushInfo(
+                    "No Python interpreter found for worker processes; intersecting tiles in-process")
+            for job in jobs:
+                if self.feedback.isCanceled():
+                    return None
+                results.extend(intersect_tile(*job, min_area))
+        else:
+            self.feedback.pushInfo(
+                f"Intersecting {len(jobs)} tiles on {self.workers} worker processes")
+            with pool:
+                futures = [pool.submit(intersect_tile, *job, min_area) for job in jobs]
+                for future in as_completed(futures):
+                    if self.feedback.isCanceled():
+                        for pending in futures:
+                            pending.cancel()
+                        return None
+                    results.extend(future.result())
+
+        results.sort(key=lambda item: (item[0], item[1]))
+        return [(order, plot_fid, _geometry_from_wkb(wkb), area)
+                for order, plot_fid, wkb, area in results]
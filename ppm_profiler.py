@@ -0,0 +1,170 @@
+"""
+Per-step timing and memory profile of a PPM run.
+
+Every profiled step records wall time, CPU time, the growth of the process
+peak RSS and, where known, feature counts in and out.  The steps are logged
+to the processing feedback and saved as JSON in the project folder, one file
+per plugin version, so runs can be diffed between releases.
+
+CPU time covers every thread of the QGIS process; worker processes used by
+the partitioned intersection are not included.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from qgis.core import Qgis
+
+PROFILE_FILE = 'ppm_profile_v{version}.json'
+
+
+def peak_rss_bytes():
+    """High-water mark of this process' resident memory, or None if unknown"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD),
+                        ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t),
+                        ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t),
+                        ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(
+                process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+def plugin_version():
+    """Version from metadata.txt, or 'unknown'"""
+    metadata = os.path.join(os.path.dirname(__file__), 'metadata.txt')
+    try:
+        with open(metadata, encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('version='):
+                    return line.split('=', 1)[1].strip()
+    except OSError:
+        pass
+    return 'unknown'
+
+
+class StepRecord:
+    """Measurements of one profiled step; set features_out inside the step"""
+
+    def __init__(self, name, features_in=None):
+        self.name = name
+        self.features_in = features_in
+        self.features_out = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss_delta = None
+
+    def as_dict(self):
+        delta = self.peak_rss_delta
+        return {
+            'step': self.name,
+            'wall_s': round(self.wall, 4),
+            'cpu_s': round(self.cpu, 4),
+            'peak_rss_delta_mb': None if delta is None else round(delta / 1048576, 2),
+            'features_in': self.features_in,
+            'features_out': self.features_out,
+        }
+
+
+class StepProfiler:
+    """Collects StepRecords for one algorithm run
+
+    :param feedback: QgsProcessingFeedback receiving one log line per step
+    :param algorithm: str - algorithm name stored in the profile
+    """
+
+    def __init__(self, feedback, algorithm):
+        self.feedback = feedback
+        self.algorithm = algorithm
+        self.steps = []
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._rss = peak_rss_bytes()
+
+    @contextmanager
+    def step(self, name, features_in=None):
+        record = StepRecord(name, features_in)
+        rss = peak_rss_bytes()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall
+            record.cpu = time.process_time() - cpu
+            end_rss = peak_rss_bytes()
+            if rss is not None and end_rss is not None:
+                record.peak_rss_delta = end_rss - rss
+            self.steps.append(record)
+            self._log(record)
+
+    def call(self, name, func, *args, features_in=None, **kwargs):
+        """Profile func(*args, **kwargs) as one step and return its result"""
+        with self.step(name, features_in):
+            return func(*args, **kwargs)
+
+    def _log(self, record):
+        values = record.as_dict()
+        line = f"[profile] {record.name}: {values['wall_s']:.3f}s wall, {values['cpu_s']:.3f}s cpu"
+        if values['peak_rss_delta_mb'] is not None:
+            line += f", peak RSS +{values['peak_rss_delta_mb']} MB"
+        if record.features_in is not None or record.features_out is not None:
+            line += f", features {record.features_in} -> {record.features_out}"
+        self.feedback.pushInfo(line)
+
+    def as_dict(self):
+        end_rss = peak_rss_bytes()
+        return {
+            'algorithm': self.algorithm,
+            'plugin_version': plugin_version(),
+            'qgis_version': Qgis.version(),
+            'started': self.started,
+            'total': {
+                'wall_s': round(time.perf_counter() - self._wall, 4),
+                'cpu_s': round(time.process_time() - self._cpu, 4),
+                'peak_rss_mb': None if end_rss is None else round(end_rss / 1048576, 2),
+            },
+            'steps': [record.as_dict() for record in self.steps],
+        }
+
+    def save(self, folder):
+        """Write the profile JSON into folder and return its path"""
+        path = os.path.join(folder, PROFILE_FILE.format(version=plugin_version()))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+        self.feedback.pushInfo(f"[profile] written to {path}")
+        return path
+
+
+def profile_step(profiler, name, features_in=None):
+    """profiler.step(), or a no-op context when profiling is off"""
+    if profiler is None:
+        return nullcontext(StepRecord(name, features_in))
+    return profiler.step(name, features_in)
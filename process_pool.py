@@ -0,0 +1,62 @@
+"""
+Process pools that work from inside QGIS.
+
+Inside the desktop application sys.executable is the QGIS binary rather than
+a Python interpreter, so multiprocessing cannot spawn workers with its
+defaults.  These helpers look for the interpreter QGIS embeds and configure a
+spawn context with it.  Callers fall back to in-process execution when no
+interpreter can be found.
+"""
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+
+def python_executable():
+    """Return the path of the Python interpreter QGIS runs on, or None"""
+    if os.path.basename(sys.executable).lower().startswith('python'):
+        return sys.executable
+
+    version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    if sys.platform == 'win32':
+        candidates = [
+            os.path.join(sys.exec_prefix, 'pythonw.exe'),
+            os.path.join(sys.exec_prefix, 'python.exe'),
+        ]
+    else:
+        candidates = [
+            os.path.join(sys.exec_prefix, 'bin', f'python{version}'),
+            os.path.join(sys.exec_prefix, 'bin', 'python3'),
+        ]
+    for candidate in candidates:
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+    return None
+
+
+def worker_count(requested):
+    """Clamp a requested worker count to the available CPUs (0 = all)"""
+    cpus = os.cpu_count() or 1
+    if not requested or requested < 0:
+        return cpus
+    return min(int(requested), cpus)
+
+
+def spawn_context():
+    """A multiprocessing spawn context using the embedded interpreter, or None"""
+    executable = python_executable()
+    if executable is None:
+        return None
+    context = multiprocessing.get_context('spawn')
+    context.set_executable(executable)
+    return context
+
+
+def create_process_pool(max_workers):
+    """Create a ProcessPoolExecutor usable from QGIS, or None when unavailable"""
+    context = spawn_context()
+    if context is None:
+        return None
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
@@ -5,14 +5,14 @@ Group :
 With QGIS : 32815
 """
 
-from .addon_functions import districtlist, districttuple, rule_based_symbology, apply_polygon_labels, delete_small_parcels, toggle_layervisibility, apply_custom_symbol, load_template_and_setup_atlas_with_text, delete_short_lines
+from .addon_functions import districtlist, districttuple, rule_based_symbology, apply_polygon_labels, toggle_layervisibility, apply_custom_symbol, load_template_and_setup_atlas_with_text, include_shared_edge_rules
 from qgis.core import (
     QgsSymbol, QgsRuleBasedRenderer, QgsStyle, QgsWkbTypes,
     QgsProcessing, QgsProcessingAlgorithm, QgsProcessingMultiStepFeedback,
     QgsProcessingParameterVectorLayer, QgsProcessingParameterField, QgsExpressionContextUtils,
     QgsProcessingParameterString, QgsProcessingParameterFeatureSink,
     QgsProcessingException, QgsProject, QgsVectorLayer, QgsProcessingParameterEnum,
-    QgsPalLayerSettings, QgsVectorLayerSimpleLabeling
+    QgsProcessingParameterNumber, QgsProcessingParameterBoolean, QgsPalLayerSettings, QgsVectorLayerSimpleLabeling
 )
 from qgis.PyQt.QtGui import QColor
 import processing
@@ -20,16 +20,28 @@ from PyQt5.QtGui import QFont
 import os
 import inspect
 from qgis.core import QgsPalLayerSettings, QgsVectorLayerSimpleLabeling
+from .ppm_engine import (
+    PPMEngine, DELIVERABLE_WRITERS, PLOT_SHAPEFILE, PLOT_EXPLODELINES, PLOT_VERTICES,
+    BUILTUP_SHAPEFILE, BUILTUP_EXPLODELINES, REF_COL, REF_COL_2, SHARED_EDGE_TOLERANCE
+)
+from .ppm_incremental import IncrementalPPM
+from .ppm_profiler import StepProfiler
 # Get the path to the current project folder
 from qgis.utils import iface
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import (
     QAction
 )
-project = QgsProject.instance()
-project_folder = project.readPath("./")
 assets_folder = os.path.dirname(__file__)+"/assets"
-save_action = iface.mainWindow().findChild(QAction, 'mActionSaveProject')
+
+
+def trigger_project_save():
+    """Run the desktop Save Project action; headless runs save the project themselves"""
+    if iface is None:
+        return
+    save_action = iface.mainWindow().findChild(QAction, 'mActionSaveProject')
+    if save_action:
+        save_action.trigger()
 
 
 class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
@@ -75,11 +87,22 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
             'gram_panchayat_code', 'Grama <b>Panchayat Code </b>', multiLine=False, defaultValue=''))
         self.addParameter(QgsProcessingParameterString(
             'village_code_lgd_code', 'Village Code <b>(LGD CODE)</b>  ', multiLine=False, defaultValue=''))
+        self.addParameter(QgsProcessingParameterEnum('execution_mode', 'Execution Mode',
+                          options=['Serial', 'Parallel plot and plinth branches'], allowMultiple=False, usesStaticStrings=False, defaultValue=0))
+        self.addParameter(QgsProcessingParameterNumber('intersection_workers', 'Intersection Worker Processes (1 = in-process, 0 = one per CPU)',
+                          type=QgsProcessingParameterNumber.Integer, minValue=0, defaultValue=1))
+        self.addParameter(QgsProcessingParameterEnum('output_format', 'Output Format',
+                          options=['ESRI Shapefiles', 'Single GeoPackage (PPM_Deliverables.gpkg)'], allowMultiple=False, usesStaticStrings=False, defaultValue=0))
+        self.addParameter(QgsProcessingParameterBoolean('dedup_shared_edges', 'Write Shared Plot Edges Once in Plot_ExplodeLines (adds Ref_Col_2)',
+                          defaultValue=False))
+        self.addParameter(QgsProcessingParameterBoolean('incremental', 'Incremental Update (reprocess only parcels changed since the last run)',
+                          defaultValue=False))
 
     def processAlgorithm(self, parameters, context, model_feedback):
         # Use a multi-step feedback, so that individual child algorithm progress reports are adjusted for the
         # overall progress through the model
-        feedback = QgsProcessingMultiStepFeedback(17, model_feedback)
+        feedback = QgsProcessingMultiStepFeedback(5, model_feedback)
+        profiler = StepProfiler(feedback, self.name())
         results = {}
         outputs = {}
 
@@ -128,8 +151,8 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
         )
 
         # # Trigger the save action
-        save_action.trigger()
-        project = QgsProject.instance()
+        profiler.call('save project', trigger_project_save)
+        project = context.project()
         project_folder = project.readPath("./")
         map_scales = [100, 150, 250, 500, 1000, 1500, 2000,
                       2500, 3000, 3500, 4000, 4500, 5000, 5500, 6000, 6500, 7000]
@@ -268,7 +291,8 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
             'NAME': 'Panchyat_Code',
             'VALUE': parameters['gram_panchayat_code']
         }
-        outputs['SetPanchyatCodeVariable'] = processing.run(
+        outputs['SetPanchyatCodeVariable'] = profiler.call(
+            f"native:setprojectvariable {alg_params['NAME']}", processing.run,
             'native:setprojectvariable', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
 
         if feedback.isCanceled():
@@ -279,7 +303,8 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
             'NAME': 'Panchyat_eng',
             'VALUE': parameters['name_of_the_grama_panchayat'].title()
         }
-        outputs['SetPanchayatNameVariable'] = processing.run(
+        outputs['SetPanchayatNameVariable'] = profiler.call(
+            f"native:setprojectvariable {alg_params['NAME']}", processing.run,
             'native:setprojectvariable', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
 
         if feedback.isCanceled():
@@ -290,10 +315,10 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
             'NAME': 'Mandal_Name_eng',
             'VALUE': parameters['name_of_the_mandal'].title()
         }
-        outputs['SetMandalNameVariable'] = processing.run(
+        outputs['SetMandalNameVariable'] = profiler.call(
+            f"native:setprojectvariable {alg_params['NAME']}", processing.run,
             'native:setprojectvariable', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
 
-        feedback.setCurrentStep(2)
         if feedback.isCanceled():
             return {}
 
@@ -302,364 +327,104 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
             'NAME': 'P_LGD_Code',
             'VALUE': parameters['village_code_lgd_code']
         }
-        outputs['SetLgdCodeVariable'] = processing.run(
+        outputs['SetLgdCodeVariable'] = profiler.call(
+            f"native:setprojectvariable {alg_params['NAME']}", processing.run,
             'native:setprojectvariable', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
 
         if feedback.isCanceled():
             return {}
 
-        # Fix geometries of plot area
-        alg_params = {
-            'INPUT': parameters['choose_plot_shapefile'],
-            'METHOD': 1,  # Structure
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['FixGeometries_plot'] = processing.run(
-            'native:fixgeometries', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(1)
-        if feedback.isCanceled():
-            return {}
-
-        # Fix geometries of plinth area
-        alg_params = {
-            'INPUT': parameters['choose_plinth_shapefile'],
-            'METHOD': 1,  # Structure
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['FixGeometries_plinth'] = processing.run(
-            'native:fixgeometries', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
         feedback.setCurrentStep(1)
-        if feedback.isCanceled():
-            return {}
 
-     # Create spatial index plot
-        alg_params = {
-            'INPUT': outputs['FixGeometries_plot']['OUTPUT']
-        }
-        outputs['CreateSpatialIndexPlot'] = processing.run(
-            'native:createspatialindex', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(1)
-        if feedback.isCanceled():
+        # Build every deliverable in a single pass over each input layer
+        output_format = self.parameterAsEnum(parameters, 'output_format', context)
+        writer = DELIVERABLE_WRITERS[output_format](
+            project_folder, layer_crs_village, context.transformContext())
+        dedup_shared_edges = self.parameterAsBoolean(parameters, 'dedup_shared_edges', context)
+        engine = PPMEngine(village_layer, another_layer,
+                           parameters['property_parcel_number'], writer, feedback,
+                           shared_edge_tolerance=SHARED_EDGE_TOLERANCE if dedup_shared_edges else None)
+        # Worker threads only read inputs and write files; every project change
+        # below stays on the main thread (FlagNoThreading)
+        parallel = self.parameterAsEnum(parameters, 'execution_mode', context) == 1
+        workers = self.parameterAsInt(parameters, 'intersection_workers', context)
+        # The plinth/plot overlay can be split into tiles on worker processes
+        intersection_workers = None if workers == 1 else workers
+        engine.profiler = profiler
+        ppm_counts = engine.counts
+        if self.parameterAsBoolean(parameters, 'incremental', context):
+            engine = IncrementalPPM(engine, project_folder, {
+                'plot_source': village_layer.source(),
+                'plinth_source': another_layer.source(),
+                'parcel_field': parameters['property_parcel_number'],
+                'crs': layer_crs_village.authid(),
+                'output_format': output_format,
+                'dedup_shared_edges': dedup_shared_edges})
+        with profiler.step('PPM engine', village_layer.featureCount() + another_layer.featureCount()) as step:
+            completed = engine.run(parallel=parallel, intersection_workers=intersection_workers)
+            step.features_out = sum(ppm_counts.values())
+        if not completed:
             return {}
-     # Create spatial index plinth area
-        alg_params = {
-            'INPUT': outputs['FixGeometries_plinth']['OUTPUT']
-        }
-        outputs['CreateSpatialIndexPlinthArea'] = processing.run(
-            'native:createspatialindex', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
 
+        feedback.setCurrentStep(2)
         if feedback.isCanceled():
             return {}
 
-        # Ref_Col Calcluation
-
-        alg_params = {
-            'INPUT': outputs['CreateSpatialIndexPlot']['OUTPUT'],
-            'FIELD_LENGTH': 10,
-            'FIELD_NAME': 'Ref_Col',
-            'FIELD_PRECISION': 0,
-            'FIELD_TYPE': 1,  # Integer (32 bit)
-            'FORMULA': '\"{}\"'.format(parameters['property_parcel_number']),
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['Ref_colCalcluation_plot'] = processing.run(
-            'native:fieldcalculator', alg_params, context=context,  is_child_algorithm=True)
+        with profiler.step('load deliverable layers') as step:
+            # Load plot layer into project
+            newplot_layer = QgsVectorLayer(
+                writer.layer_uri(PLOT_SHAPEFILE), PLOT_SHAPEFILE, 'ogr')
+            project.addMapLayer(newplot_layer, True)
+            toggle_layervisibility(param_value, False, project)
+
+            # Load builtup layer into project
+            newbuiltup_layer = QgsVectorLayer(
+                writer.layer_uri(BUILTUP_SHAPEFILE), BUILTUP_SHAPEFILE, 'ogr')
+            project.addMapLayer(newbuiltup_layer, True)
+            toggle_layervisibility(lpm_param_value, False, project)
+
+            plinth_explode_layer = QgsVectorLayer(
+                writer.layer_uri(BUILTUP_EXPLODELINES), BUILTUP_EXPLODELINES, 'ogr')
+            project.addMapLayer(plinth_explode_layer, True)
+
+            # Load plot explode lines and vertices into project
+            plot_explode_layer = QgsVectorLayer(
+                writer.layer_uri(PLOT_EXPLODELINES), PLOT_EXPLODELINES, 'ogr')
+            project.addMapLayer(plot_explode_layer, True)
+
+            plot_vertices_layer = QgsVectorLayer(
+                writer.layer_uri(PLOT_VERTICES), PLOT_VERTICES, 'ogr')
+            project.addMapLayer(plot_vertices_layer, True)
+            step.features_out = sum(layer.featureCount() for layer in (
+                newplot_layer, newbuiltup_layer, plinth_explode_layer, plot_explode_layer, plot_vertices_layer))
 
         feedback.setCurrentStep(3)
         if feedback.isCanceled():
             return {}
 
-        # Save Plot_shapefile vector features to file
-        alg_params = {
-            'DATASOURCE_OPTIONS': '',
-            'INPUT': outputs['Ref_colCalcluation_plot']['OUTPUT'],
-            'LAYER_NAME': 'Plot_Shapefile',
-            'LAYER_OPTIONS': '',
-            'OUTPUT': project_folder + '/Plot_Shapefile.shp'
-        }
-        outputs['Save_plot_shapefile'] = processing.run(
-            'native:savefeatures', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(4)
-        if feedback.isCanceled():
-            return {}
-
-        # Boundary plot area
-        alg_params = {
-            'INPUT': outputs['Ref_colCalcluation_plot']['OUTPUT'],
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['BoundaryPlotArea'] = processing.run(
-            'native:boundary', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        # Save Plot_Boundary vector features to file
-        alg_params = {
-            'DATASOURCE_OPTIONS': '',
-            'INPUT': outputs['BoundaryPlotArea']['OUTPUT'],
-            'LAYER_NAME': 'Plot_Boundary',
-            'LAYER_OPTIONS': '',
-            'OUTPUT': project_folder + '/Plot_Boundary.shp'
-        }
-        outputs['Save_plot_boundary_VectorFeaturesToFile'] = processing.run(
-            'native:savefeatures', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
+        # Apply deliverable styles
+        styles = [
+            (plot_explode_layer, "/Plot_Explode_Style.qml"),
+            (plinth_explode_layer, "/Builtup_Explode_Style.qml"),
+            (newbuiltup_layer, "/Builtup_Style.qml"),
+            (plot_vertices_layer, "/Plot_Vertices_Style.qml"),
+        ]
+        for style_layer, style_file in styles:
+            alg_params = {
+                'INPUT': style_layer,
+                'STYLE': assets_folder + style_file
+            }
+            profiler.call(f"native:setlayerstyle {style_layer.name()}", processing.run,
+                          'native:setlayerstyle', alg_params,
+                          context=context, feedback=feedback, is_child_algorithm=True,
+                          features_in=style_layer.featureCount())
+            if feedback.isCanceled():
+                return {}
+        if dedup_shared_edges:
+            # A shared edge must also show on the atlas page of its second plot
+            include_shared_edge_rules(plot_explode_layer, REF_COL, REF_COL_2)
 
         feedback.setCurrentStep(4)
-        if feedback.isCanceled():
-            return {}
-
-        # Explode lines plot area
-        alg_params = {
-            'INPUT': outputs['BoundaryPlotArea']['OUTPUT'],
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['ExplodeLinesPlotArea'] = processing.run(
-            'native:explodelines', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(5)
-        if feedback.isCanceled():
-            return {}
-
-        # Intersection
-        alg_params = {
-            'GRID_SIZE': None,
-            'INPUT': parameters['choose_plinth_shapefile'],
-            'INPUT_FIELDS': [''],
-            'OVERLAY': outputs['Ref_colCalcluation_plot']['OUTPUT'],
-            'OVERLAY_FIELDS': [''],
-            'OVERLAY_FIELDS_PREFIX': '',
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['IntersectionofPlinthPlot'] = processing.run(
-            'native:intersection', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(6)
-        if feedback.isCanceled():
-            return {}
-
-        # Create spatial index
-        alg_params = {
-            'INPUT': outputs['IntersectionofPlinthPlot']['OUTPUT']
-        }
-        outputs['CreateSpatialIndex'] = processing.run(
-            'native:createspatialindex', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        # area calculation
-        alg_params = {
-            'INPUT': outputs['IntersectionofPlinthPlot']['OUTPUT'],
-            'FIELD_LENGTH': 10,
-            'FIELD_NAME': 'Area',
-            'FIELD_PRECISION': 2,
-            'FIELD_TYPE': 0,  # Decimal (double)
-            'FORMULA': 'area( $geometry )',
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['Ref_colCalcluation_plinth'] = processing.run(
-            'native:fieldcalculator', alg_params, context=context,  is_child_algorithm=True)
-
-        # Save Builtup_Shapefile vector features to file
-        alg_params = {
-            'DATASOURCE_OPTIONS': '',
-            'INPUT': outputs['Ref_colCalcluation_plinth']['OUTPUT'],
-            'LAYER_NAME': 'Builtup_Shapefile',
-            'LAYER_OPTIONS': '',
-            'OUTPUT': project_folder + '/Builtup_Shapefile.shp'
-        }
-        outputs['Save_builtup_shapefile'] = processing.run(
-            'native:savefeatures', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(8)
-        if feedback.isCanceled():
-            return {}
-
-        # Load plot layer into project
-        newplot_layer = QgsVectorLayer(
-            outputs['Save_plot_shapefile']['OUTPUT'], 'Plot_Shapefile', 'ogr')
-        project.addMapLayer(newplot_layer, True)
-        toggle_layervisibility(param_value, False)
-
-        # Load builtup layer into project
-        newbuiltup_layer = QgsVectorLayer(
-            outputs['Save_builtup_shapefile']['OUTPUT'], 'Builtup_Shapefile', 'ogr')
-        project.addMapLayer(newbuiltup_layer, True)
-
-        delete_small_parcels('Builtup_Shapefile', 1)
-        toggle_layervisibility(lpm_param_value, False)
-
-        # Create spatial index
-        alg_params = {
-            'INPUT': outputs['Save_builtup_shapefile']['OUTPUT']
-        }
-        outputs['CreateSpatialIndex'] = processing.run(
-            'native:createspatialindex', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        # Boundary plinth area
-        alg_params = {
-            # outputs['MergeIntersectionAndDiffrence']['OUTPUT'],
-            'INPUT': outputs['Save_builtup_shapefile']['OUTPUT'],
-            'OUTPUT':  QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['BoundaryPlinthArea'] = processing.run(
-            'native:boundary', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        # Save Builtup_Boundary vector features to file
-        alg_params = {
-            'DATASOURCE_OPTIONS': '',
-            'INPUT': outputs['BoundaryPlinthArea']['OUTPUT'],
-            'LAYER_NAME': 'Builtup_Boundary',
-            'LAYER_OPTIONS': '',
-            'OUTPUT': project_folder + '/Builtup_Boundary.shp'
-        }
-        outputs['SaveVectorFeaturesToFile'] = processing.run(
-            'native:savefeatures', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(9)
-        if feedback.isCanceled():
-            return {}
-
-        # Explode lines plinth area
-        alg_params = {
-            'INPUT': outputs['BoundaryPlinthArea']['OUTPUT'],
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['ExplodeLinesPlinthArea'] = processing.run(
-            'native:explodelines', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(10)
-        if feedback.isCanceled():
-            return {}
-
-        # Refactor plot Exploded Lines
-        alg_params = {
-            'FIELDS_MAPPING': [{'expression': '"Ref_Col"', 'length': 10, 'name': 'Ref_Col', 'precision': 0, 'sub_type': 0, 'type': 2, 'type_name': 'integer'}, {'expression': 'length3D( $geometry)', 'length': 10, 'name': 'Length', 'precision': 1, 'sub_type': 0, 'type': 6, 'type_name': 'double precision'}],
-            'INPUT': outputs['ExplodeLinesPlotArea']['OUTPUT'],
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT
-        }
-        outputs['RefactorplotExplodedLines'] = processing.run(
-            'native:refactorfields', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        # Save Plot_ExplodeLines vector features to file
-        alg_params = {
-            'DATASOURCE_OPTIONS': '',
-            'INPUT': outputs['RefactorplotExplodedLines']['OUTPUT'],
-            'LAYER_NAME': 'Plot_ExplodeLines',
-            'LAYER_OPTIONS': '',
-            'OUTPUT': project_folder + '/Plot_ExplodeLines.shp'
-        }
-        outputs['Save_Plot_ExplodeLines'] = processing.run(
-            'native:savefeatures', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(11)
-        if feedback.isCanceled():
-            return {}
-
-        # Refactor builtup Exploded Lines
-        alg_params = {
-            'FIELDS_MAPPING': [{'expression': '"Ref_Col"', 'length': 10, 'name': 'Ref_Col', 'precision': 0, 'sub_type': 0, 'type': 2, 'type_name': 'integer'}, {'expression': 'length3D( $geometry)', 'length': 10, 'name': 'Length', 'precision': 1, 'sub_type': 0, 'type': 6, 'type_name': 'double precision'}],
-            'INPUT': outputs['ExplodeLinesPlinthArea']['OUTPUT'],
-            'OUTPUT': QgsProcessing.TEMPORARY_OUTPUT,
-
-        }
-        outputs['RefactorplinthExplodedLines'] = processing.run(
-            'native:refactorfields', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        # Save Builtup_ExplodeLines vector features to file
-        alg_params = {
-            'DATASOURCE_OPTIONS': '',
-            'INPUT': outputs['RefactorplinthExplodedLines']['OUTPUT'],
-            'LAYER_NAME': 'Builtup_ExplodeLines',
-            'LAYER_OPTIONS': '',
-            'OUTPUT': project_folder + '/Builtup_ExplodeLines.shp'
-        }
-        outputs['Save_Builtup_ExplodeLines'] = processing.run(
-            'native:savefeatures', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        plinth_explode_layer = QgsVectorLayer(
-            outputs['Save_Builtup_ExplodeLines']['OUTPUT'], 'Builtup_ExplodeLines', 'ogr')
-        project.addMapLayer(plinth_explode_layer, True)
-
-        # Load plot explode lines into project
-        alg_params = {
-            'INPUT': outputs['Save_Plot_ExplodeLines']['OUTPUT'],
-            'NAME': 'Plot_ExplodeLines'
-        }
-        outputs['load_Plot_ExplodeLines'] = processing.run(
-            'native:loadlayer', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(12)
-        if feedback.isCanceled():
-            return {}
-
-        # Extract vertices of plot
-        alg_params = {
-            'INPUT': outputs['Ref_colCalcluation_plot']['OUTPUT'],
-            'OUTPUT': project_folder + '/Plot_Vertices.shp'
-        }
-        outputs['ExtractVerticesof_plot'] = processing.run(
-            'native:extractvertices', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        # Load vertices into project
-
-        alg_params = {
-            'INPUT': outputs['ExtractVerticesof_plot']['OUTPUT'],
-            'NAME': 'Plot_Vertices'
-        }
-        outputs['load_Plot_Vertices'] = processing.run(
-            'native:loadlayer', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-
-        feedback.setCurrentStep(13)
-        if feedback.isCanceled():
-            return {}
-
-        # Set Plot explode style
-        alg_params = {
-            'INPUT': outputs['load_Plot_ExplodeLines']['OUTPUT'],
-            'STYLE': assets_folder + "/Plot_Explode_Style.qml"
-        }
-        outputs['Plot_Explode_Style'] = processing.run(
-            'native:setlayerstyle', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-        print("lokesh")
-        feedback.setCurrentStep(14)
-        if feedback.isCanceled():
-            return {}
-
-        # Set Builtup explode style
-        alg_params = {
-            'INPUT': plinth_explode_layer,
-            'STYLE': assets_folder + "/Builtup_Explode_Style.qml"
-        }
-        outputs['Builtup_Explode_Style'] = processing.run(
-            'native:setlayerstyle', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-        print("lokesh")
-        feedback.setCurrentStep(15)
-        if feedback.isCanceled():
-            return {}
-
-        # Set Builtup style
-        alg_params = {
-            'INPUT': newbuiltup_layer,
-            'STYLE': assets_folder + "/Builtup_Style.qml"
-        }
-        outputs['Builtup_Style'] = processing.run(
-            'native:setlayerstyle', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-        print("lokesh")
-        feedback.setCurrentStep(16)
-        if feedback.isCanceled():
-            return {}
-
-        # Set Plot Vertices style
-        alg_params = {
-            'INPUT': outputs['load_Plot_Vertices']['OUTPUT'],
-            'STYLE': assets_folder + "/Plot_Vertices_Style.qml"
-        }
-        outputs['Plot_Vertices_Style'] = processing.run(
-            'native:setlayerstyle', alg_params, context=context, feedback=feedback, is_child_algorithm=True)
-        print("lokesh")
-        feedback.setCurrentStep(17)
-        if feedback.isCanceled():
-            return {}
 
         feedback.pushWarning(
             '\n Hey there! Are you ready to celebrate? 🤩🤩🎉 I\'m just about to finish adding some beautiful templates for you.')
@@ -670,8 +435,9 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
         # plot_layer = project.mapLayer(param_value)
         if newplot_layer:
 
-            apply_polygon_labels(
-                newplot_layer, parameters['property_parcel_number'])
+            profiler.call('apply_polygon_labels', apply_polygon_labels,
+                          newplot_layer, parameters['property_parcel_number'],
+                          features_in=newplot_layer.featureCount())
             # Rule-based symbology using helper function
             ppmsymbol = os.path.join(assets_folder, "PPM_SYMBOL.xml")
             if not os.path.exists(ppmsymbol):
@@ -687,7 +453,8 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
                     None    # Scale (optional)
                 )
             ]
-            rule_based_symbology(
+            profiler.call(
+                'rule_based_symbology', rule_based_symbology,
                 newplot_layer,
                 rules,
                 outline_status=True,
@@ -698,7 +465,8 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
 
         coverage_layer = newplot_layer
 
-        load_template_and_setup_atlas_with_text(
+        profiler.call(
+            'load_template_and_setup_atlas_with_text', load_template_and_setup_atlas_with_text,
             template_path=assets_folder + "/A4_PPM_TEMPLATE.qpt",
             template_name="A4_PPM_TEMPLATE",
             coverage_layer=coverage_layer,
@@ -708,10 +476,15 @@ class SvamitvaPPMAlgorithm(QgsProcessingAlgorithm):
             text2=': [% \"{}\" %]'.format(
                 parameters['plot_area_in_square_yards']),
             text3=': [% round(\"{}\" ,3) %]'.format(
-                parameters['plot_area_in_square_metres'])
+                parameters['plot_area_in_square_metres']),
+            project=project
         )
 
-        QgsProject.instance().write()
+        profiler.call('write project', project.write)
+        try:
+            profiler.save(project_folder)
+        except OSError as e:
+            feedback.pushWarning(f"Could not write the profile: {e}")
         return {}
 
     def name(self):
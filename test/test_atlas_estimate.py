@@ -0,0 +1,67 @@
+# coding=utf-8
+"""Tests of the interval math of the atlas export estimate."""
+
+import unittest
+
+from .utilities import get_qgis_app
+from ..atlas_estimate import ExportEstimate, extrapolate, format_duration, format_size
+
+QGIS_APP = get_qgis_app()
+
+
+class ExtrapolateTest(unittest.TestCase):
+    """extrapolate scales the sample mean and its 95% interval to the total"""
+
+    def test_single_sample(self):
+        self.assertEqual(extrapolate([2.0], 10), (20.0, None, None))
+
+    def test_interval(self):
+        estimate, low, high = extrapolate([1.0, 3.0], 100)
+        self.assertAlmostEqual(estimate, 200.0)
+        # t(1) * stdev / sqrt(n) = 12.706, narrowed by sqrt((N - n) / (N - 1))
+        margin = 12.706 * (98 / 99) ** 0.5
+        self.assertAlmostEqual(low, 0.0)
+        self.assertAlmostEqual(high, (2.0 + margin) * 100)
+
+    def test_sample_covers_everything(self):
+        self.assertEqual(extrapolate([1.0, 2.0, 3.0], 3), (6.0, 6.0, 6.0))
+
+    def test_constant_samples(self):
+        self.assertEqual(extrapolate([5.0] * 4, 40), (200.0, 200.0, 200.0))
+
+
+class FormatTest(unittest.TestCase):
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(42.4), "42 s")
+        self.assertEqual(format_duration(125), "2 min 5 s")
+        self.assertEqual(format_duration(7260), "2 h 1 min")
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), "512 bytes")
+        self.assertEqual(format_size(1536), "1.5 KB")
+        self.assertEqual(format_size(3 * 1024 ** 3), "3.0 GB")
+        self.assertEqual(format_size(5000 * 1024 ** 3), "5000.0 GB")
+
+
+class ExportEstimateTest(unittest.TestCase):
+
+    def test_duration_divided_by_workers(self):
+        estimate = ExportEstimate(10, workers=4)
+        estimate.seconds = [2.0]
+        self.assertEqual(estimate.duration(), (5.0, None, None))
+
+    def test_workers_capped_by_pages(self):
+        self.assertEqual(ExportEstimate(2, workers=8).workers, 2)
+
+    def test_page_size(self):
+        estimate = ExportEstimate(10)
+        self.assertIsNone(estimate.page_size())
+        estimate.sizes = [100, 300]
+        self.assertEqual(estimate.page_size(), (200, 2))
+        estimate.cancelled = True
+        self.assertIsNone(estimate.page_size())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# coding=utf-8
+"""Tests of the atlas export worker's file names and combined PDF."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest import mock
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from qgis.core import QgsPrintLayout, QgsProject
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
+
+from .utilities import get_qgis_app
+from .test_ppm_engine import memory_layer
+from .. import atlas_pdf
+from ..atlas_export import AtlasExportWorker, ExportFormat, ExportMode, ExportSettings
+from ..atlas_pdf import merge_pdfs
+
+QGIS_APP = get_qgis_app()
+
+
+def atlas_layout(names):
+    """Layout with an atlas over one point per name, sorted by name"""
+    layer = memory_layer('Point?crs=EPSG:32644&field=name:string&field=area:double',
+                         'coverage', [(f'POINT({i} {i})', [name, i * 10.0])
+                                      for i, name in enumerate(names)])
+    QgsProject.instance().addMapLayer(layer)
+    layout = QgsPrintLayout(QgsProject.instance())
+    layout.initializeDefaults()
+    atlas = layout.atlas()
+    atlas.setCoverageLayer(layer)
+    atlas.setSortFeatures(True)
+    atlas.setSortExpression('"name"')
+    atlas.setEnabled(True)
+    return layout, layer
+
+
+class GenerateFilenameTest(unittest.TestCase):
+    """Placeholders are filled from the feature of the page the atlas is on"""
+
+    def setUp(self):
+        self.layout, self.layer = atlas_layout(['South', 'North', 'East'])
+        self.settings = ExportSettings('/tmp/out', '{page}_{name}', ExportFormat.PDF,
+                                       ExportMode.ALL)
+        self.worker = AtlasExportWorker(self.layout, self.settings)
+
+    def tearDown(self):
+        QgsProject.instance().removeMapLayer(self.layer.id())
+
+    def test_placeholder_fields(self):
+        self.assertEqual(self.worker._placeholder_fields(self.layer), ['name'])
+
+    def test_page_order(self):
+        atlas = self.layout.atlas()
+        self.assertTrue(atlas.beginRender())
+        names = []
+        for page in range(atlas.count()):
+            self.assertTrue(atlas.seekTo(page))
+            names.append(self.worker._generate_filename(page, atlas))
+        atlas.endRender()
+        self.assertEqual(names, ['001_East.pdf', '002_North.pdf', '003_South.pdf'])
+
+    def test_without_atlas(self):
+        self.assertEqual(self.worker._generate_filename(1), '002_{name}.pdf')
+
+
+class CombinedPdfTest(unittest.TestCase):
+    """Plain exports stream one PDF; exports writing page files merge them"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.layout, self.layer = atlas_layout(['North'])
+        self.layout.setName('Village: 12')
+        self.settings = ExportSettings(self.folder, '{page}', ExportFormat.PDF, ExportMode.ALL,
+                                       combined_pdf=True)
+
+    def tearDown(self):
+        QgsProject.instance().removeMapLayer(self.layer.id())
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def worker(self, **changes):
+        return AtlasExportWorker(self.layout, replace(self.settings, **changes))
+
+    def test_path(self):
+        self.assertEqual(self.worker()._combined_pdf_path(),
+                         os.path.join(self.folder, 'Village 12.pdf'))
+
+    def test_streams(self):
+        self.assertTrue(self.worker()._streams_combined_pdf())
+        self.assertFalse(self.worker(resume=True)._streams_combined_pdf())
+        self.assertFalse(self.worker(export_mode=ExportMode.CHANGED)._streams_combined_pdf())
+        self.assertFalse(self.worker(export_format=ExportFormat.PNG)._streams_combined_pdf())
+        self.assertFalse(self.worker(combined_pdf=False)._streams_combined_pdf())
+
+    @unittest.skipIf(PdfWriter is None, 'pypdf is not installed')
+    def test_merge(self):
+        paths = []
+        for width in (100, 200, 300):
+            writer = PdfWriter()
+            writer.add_blank_page(width, 100)
+            paths.append(os.path.join(self.folder, f'{width}.pdf'))
+            with open(paths[-1], 'wb') as f:
+                writer.write(f)
+        output = merge_pdfs(paths, os.path.join(self.folder, 'all.pdf'))
+        widths = [float(page.mediabox.width) for page in PdfReader(output).pages]
+        self.assertEqual(widths, [100, 200, 300])
+        self.assertFalse(os.path.exists(output + '.part'))
+
+    def test_merge_unavailable(self):
+        with mock.patch.object(atlas_pdf, 'PdfWriter', None), \
+                mock.patch.object(atlas_pdf, 'PdfMerger', None):
+            with self.assertRaises(ImportError):
+                merge_pdfs([], os.path.join(self.folder, 'all.pdf'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# coding=utf-8
+"""Tests of the atlas export filename check."""
+
+import unittest
+
+from qgis.PyQt.QtCore import QVariant
+
+from .utilities import get_qgis_app
+from ..atlas_filenames import FilenameReport, check_filenames, clean_value, resolve_filename
+
+QGIS_APP = get_qgis_app()
+
+
+class FilenamesTest(unittest.TestCase):
+    """File names are resolved per page and checked for clashes and empty values"""
+
+    def test_resolve_filename(self):
+        self.assertEqual(resolve_filename('{page}_{index}_{name}', 4, {'name': 'A/B'}, 'pdf'),
+                         '005_4_AB.pdf')
+        self.assertEqual(clean_value('Plot 7: north'), 'Plot 7 north')
+
+    def test_unique(self):
+        features = [{'name': 'North'}, {'name': 'South'}]
+        report = check_filenames(features, 'map_{name}', ['name'], 'png')
+        self.assertEqual(report.pages, 2)
+        self.assertEqual(report.names, {1: 'map_North.png', 2: 'map_South.png'})
+        self.assertFalse(report.has_conflicts())
+        self.assertIn('All file names are unique', report.as_text())
+
+    def test_case_insensitive_duplicates(self):
+        features = [{'name': 'North'}, {'name': 'east'}, {'name': 'NORTH'}]
+        report = check_filenames(features, 'map_{name}', ['name'], 'png')
+        self.assertEqual(report.duplicates, {'map_North.png': [1, 3]})
+        self.assertTrue(report.has_conflicts())
+
+    def test_empty_and_altered(self):
+        features = [{'name': QVariant()}, {'name': None}, {'name': ' '}, {'name': 'a:b'}]
+        report = check_filenames(features, '{page}_{name}', ['name'], 'pdf')
+        self.assertEqual(report.empty, [(1, 'name'), (2, 'name'), (3, 'name')])
+        self.assertEqual(report.altered, [(4, 'name', 'a:b')])
+
+    def test_selected_pages(self):
+        features = [{'name': 'same'}] * 3
+        report = check_filenames(features, 'map_{name}', ['name'], 'pdf', pages={0, 2})
+        self.assertEqual(sorted(report.names), [1, 3])
+        self.assertEqual(report.duplicates, {'map_same.pdf': [1, 3]})
+
+    def test_cancelled(self):
+        report = check_filenames([{'name': 'a'}], '{name}', ['name'], 'pdf',
+                                 is_cancelled=lambda: True)
+        self.assertTrue(report.cancelled)
+        self.assertEqual(report.pages, 0)
+
+    def test_size_in_report(self):
+        report = FilenameReport()
+        report.pages = 10
+        self.assertIn('unknown', report.as_text())
+        report.page_size = (1024 * 1024, 5)
+        self.assertIn('10.0 MB', report.as_text())
+
+
+if __name__ == '__main__':
+    unittest.main()
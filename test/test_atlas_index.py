@@ -0,0 +1,70 @@
+# coding=utf-8
+"""Tests of the cached atlas page index."""
+
+import os
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from qgis.core import QgsFeature, QgsGeometry, QgsProject
+
+from .utilities import get_qgis_app
+from .test_atlas_export import atlas_layout
+from ..atlas_index import atlas_index
+
+QGIS_APP = get_qgis_app()
+
+
+class AtlasIndexTest(unittest.TestCase):
+    """Pages follow the atlas sort and filter, and edits rebuild the index"""
+
+    def setUp(self):
+        self.layout, self.layer = atlas_layout(['South', 'North', 'East'])
+        self.atlas = self.layout.atlas()
+        self.index = atlas_index(self.layout)
+
+    def tearDown(self):
+        QgsProject.instance().removeMapLayer(self.layer.id())
+
+    def names(self):
+        return [self.index.feature(page)['name'] for page in range(self.index.count())]
+
+    def test_page_order(self):
+        self.assertIs(atlas_index(self.layout), self.index)
+        self.assertEqual(self.names(), ['East', 'North', 'South'])
+        self.assertEqual(self.index.count(), self.atlas.count())
+        self.assertEqual(self.index.page_of(self.index.feature_id(1)), 1)
+        self.assertIsNone(self.index.feature_id(3))
+
+    def test_values(self):
+        fid = self.index.feature_id(0)
+        self.assertEqual(self.index.values(fid, ['name', 'area']), {'name': 'East', 'area': 20.0})
+
+    def test_feature_added(self):
+        self.assertEqual(self.index.count(), 3)
+        self.layer.startEditing()
+        feature = QgsFeature(self.layer.fields())
+        feature.setGeometry(QgsGeometry.fromWkt('POINT(5 5)'))
+        feature.setAttributes(['Central', 50.0])
+        self.layer.addFeature(feature)
+        self.assertEqual(self.names(), ['Central', 'East', 'North', 'South'])
+        self.layer.rollBack()
+        self.assertEqual(self.names(), ['East', 'North', 'South'])
+
+    def test_attribute_changed(self):
+        fid = self.index.feature_id(0)
+        self.assertEqual(self.index.values(fid, ['name'])['name'], 'East')
+        self.layer.startEditing()
+        self.layer.changeAttributeValue(fid, self.layer.fields().lookupField('name'), 'West')
+        self.assertEqual(self.names(), ['North', 'South', 'West'])
+        self.assertEqual(self.index.values(fid, ['name'])['name'], 'West')
+        self.layer.rollBack()
+
+    def test_filter_changed(self):
+        self.atlas.setFilterFeatures(True)
+        self.atlas.setFilterExpression('"area" > 5')
+        self.assertEqual(self.names(), ['East', 'North'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# coding=utf-8
+"""Tests of the atlas export manifest."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from dataclasses import replace
+
+from qgis.core import QgsFeature, QgsFields, QgsGeometry
+
+from .utilities import get_qgis_app
+from ..atlas_export import ExportFormat, ExportMode, ExportSettings
+from ..atlas_manifest import ExportManifest, feature_hash, settings_hash
+
+QGIS_APP = get_qgis_app()
+
+
+def point_feature(fid, wkt):
+    feature = QgsFeature(QgsFields(), fid)
+    feature.setGeometry(QgsGeometry.fromWkt(wkt))
+    return feature
+
+
+class SettingsHashTest(unittest.TestCase):
+    """Only the settings that change a rendered page change the hash"""
+
+    def setUp(self):
+        self.settings = ExportSettings('/tmp/out', 'page_{page}', ExportFormat.PDF, ExportMode.ALL)
+
+    def test_page_neutral_settings(self):
+        digest = settings_hash('layout', self.settings)
+        self.assertEqual(digest, settings_hash('layout', replace(
+            self.settings, output_dir='/tmp/other', export_mode=ExportMode.CHANGED,
+            parallel_workers=4, resume=True, record_page_content=True)))
+
+    def test_rendering_settings(self):
+        digest = settings_hash('layout', self.settings)
+        self.assertNotEqual(digest, settings_hash('layout', replace(self.settings, dpi=150)))
+        self.assertNotEqual(digest, settings_hash(
+            'layout', replace(self.settings, export_format=ExportFormat.PNG)))
+        self.assertNotEqual(digest, settings_hash('other layout', self.settings))
+
+
+class ExportManifestTest(unittest.TestCase):
+    """Recorded pages are current until the file, feature or settings change"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.manifest = ExportManifest(self.folder)
+        self.path = os.path.join(self.folder, 'page_001.pdf')
+        with open(self.path, 'wb') as f:
+            f.write(b'%PDF page one')
+        self.feature = point_feature(1, 'POINT(1 1)')
+
+    def tearDown(self):
+        self.manifest.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def record(self, content=None):
+        self.manifest.record('1', 0, 'settings', feature_hash(self.feature), self.path, content)
+
+    def test_current(self):
+        self.record('content')
+        digest = feature_hash(self.feature)
+        self.assertTrue(self.manifest.is_current('1', 'settings', digest, self.path))
+        self.assertTrue(self.manifest.is_current('1', 'settings', digest, self.path, 'content'))
+        self.assertFalse(self.manifest.is_current('1', 'settings', digest, self.path, 'edited'))
+        self.assertFalse(self.manifest.is_current('1', 'other', digest, self.path))
+        self.assertFalse(self.manifest.is_current('2', 'settings', digest, self.path))
+
+    def test_feature_changed(self):
+        self.record()
+        moved = feature_hash(point_feature(1, 'POINT(2 1)'))
+        self.assertFalse(self.manifest.is_current('1', 'settings', moved, self.path))
+
+    def test_file_changed(self):
+        self.record()
+        digest = feature_hash(self.feature)
+        with open(self.path, 'wb') as f:
+            f.write(b'%PDF page ONE')
+        self.assertFalse(self.manifest.is_current('1', 'settings', digest, self.path))
+        os.remove(self.path)
+        self.assertFalse(self.manifest.is_current('1', 'settings', digest, self.path))
+
+    def test_reopened(self):
+        self.record()
+        self.manifest.close()
+        self.manifest = ExportManifest(self.folder)
+        self.assertEqual(self.manifest.entry('1')['output'], 'page_001.pdf')
+
+    def test_average_size(self):
+        self.assertEqual(self.manifest.average_size('settings'), (0, 0))
+        self.record()
+        self.assertEqual(self.manifest.average_size('settings'), (os.path.getsize(self.path), 1))
+        self.assertEqual(self.manifest.average_size('other'), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
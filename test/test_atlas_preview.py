@@ -0,0 +1,83 @@
+# coding=utf-8
+"""Tests of the background preview rendering of the atlas export dialog."""
+
+import os
+import time
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from qgis.PyQt.QtCore import QCoreApplication, QSize
+from qgis.PyQt.QtGui import QImage
+from qgis.core import QgsPrintLayout, QgsProject
+
+from .utilities import get_qgis_app
+from ..atlas_preview import AtlasPreviewManager
+
+QGIS_APP = get_qgis_app()
+
+
+def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+class AtlasPreviewManagerTest(unittest.TestCase):
+    """Previews are rendered off the GUI thread from a clone and cached"""
+
+    def setUp(self):
+        self.calls = []
+        self.layout = QgsPrintLayout(QgsProject.instance())
+        self.layout.setName('preview')
+        self.manager = AtlasPreviewManager(self.render)
+        self.ready = []
+        self.manager.preview_ready.connect(self.ready.append)
+        self.size = QSize(40, 30)
+
+    def tearDown(self):
+        self.manager.shutdown()
+
+    def render(self, layout, page_index, is_atlas, size):
+        self.calls.append((layout, page_index))
+        return QImage(size, QImage.Format_ARGB32)
+
+    def rendered_pages(self):
+        return sorted(page for _, page in self.calls)
+
+    def test_render_and_cache(self):
+        self.assertIsNone(self.manager.request(self.layout, 1, True, self.size, 3))
+        self.assertTrue(wait_for(lambda: len(self.manager._cache) == 3))
+        self.assertEqual(self.ready[0].size(), self.size)
+        # The requested page first, then its neighbours, all from one clone
+        self.assertEqual(self.calls[0][1], 1)
+        self.assertEqual(self.rendered_pages(), [0, 1, 2])
+        self.assertEqual(len({id(layout) for layout, _ in self.calls}), 1)
+        self.assertIsNot(self.calls[0][0], self.layout)
+
+        self.assertIsNotNone(self.manager.request(self.layout, 2, True, self.size, 3))
+        self.assertIsNotNone(self.manager.request(self.layout, 0, True, self.size, 3))
+        # Past the debounce interval nothing is left to render
+        wait_for(lambda: False, timeout=0.5)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_layout_change_invalidates(self):
+        self.manager.request(self.layout, 0, False, self.size, 1)
+        self.assertTrue(wait_for(lambda: self.ready))
+        self.assertIsNotNone(self.manager.request(self.layout, 0, False, self.size, 1))
+        self.layout.changed.emit()
+        self.assertIsNone(self.manager.request(self.layout, 0, False, self.size, 1))
+        self.assertTrue(wait_for(lambda: len(self.ready) == 2))
+        self.assertIsNot(self.calls[0][0], self.calls[1][0])
+
+    def test_only_latest_request(self):
+        for page in range(5):
+            self.manager.request(self.layout, page, False, self.size, 5)
+        self.assertTrue(wait_for(lambda: self.ready))
+        self.assertEqual(self.rendered_pages(), [4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# coding=utf-8
+"""Tests of the static layer cache of atlas exports."""
+
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from qgis.PyQt.QtCore import QRectF
+from qgis.core import QgsLayoutItemMap, QgsPrintLayout, QgsProject, QgsRasterLayer
+
+from .utilities import get_qgis_app
+from .test_ppm_engine import memory_layer
+from ..atlas_render_cache import StaticLayerCache, is_static, scale_key, set_static
+
+QGIS_APP = get_qgis_app()
+
+
+def square(x, size):
+    return f'POLYGON(({x} 0, {x + size} 0, {x + size} {size}, {x} {size}, {x} 0))'
+
+
+class StaticLayerCacheTest(unittest.TestCase):
+    """Atlas maps draw the cache raster only on pages at a cached scale"""
+
+    def setUp(self):
+        self.coverage = memory_layer('Polygon?crs=EPSG:32644&field=id:integer', 'coverage',
+                                     [(square(0, 10), [1]), (square(50, 10), [2]),
+                                      (square(100, 100), [3])])
+        self.static = memory_layer('Polygon?crs=EPSG:32644', 'plots', [])
+        self.dynamic = memory_layer('Polygon?crs=EPSG:32644', 'plinths', [])
+        self.raster = QgsRasterLayer(
+            os.path.join(os.path.dirname(__file__), 'tenbytenraster.asc'), 'cache', 'gdal')
+        self.layers = [self.coverage, self.static, self.dynamic]
+        QgsProject.instance().addMapLayers(self.layers)
+
+        self.layout = QgsPrintLayout(QgsProject.instance())
+        self.layout.initializeDefaults()
+        self.map = QgsLayoutItemMap(self.layout)
+        self.map.attemptSetSceneRect(QRectF(10, 10, 100, 100))
+        self.map.setLayers([self.dynamic, self.static])
+        self.map.setAtlasDriven(True)
+        self.map.setAtlasScalingMode(QgsLayoutItemMap.Auto)
+        self.layout.addLayoutItem(self.map)
+        self.atlas = self.layout.atlas()
+        self.atlas.setCoverageLayer(self.coverage)
+        self.atlas.setEnabled(True)
+        self.cache = StaticLayerCache(self.layout, [self.static.id()], 96, tempfile.gettempdir())
+
+    def tearDown(self):
+        QgsProject.instance().removeMapLayers([layer.id() for layer in self.layers])
+
+    def test_layer_swap(self):
+        self.assertTrue(self.atlas.beginRender())
+        self.atlas.seekTo(0)
+        resolution = self.cache._resolution(self.map)
+        self.cache.rasters = {scale_key(resolution): self.raster}
+        with self.cache.applied():
+            self.atlas.seekTo(1)
+            self.assertEqual(self.map.layers(), [self.dynamic, self.raster])
+            self.assertTrue(self.map.keepLayerSet())
+            self.assertEqual(self.cache.layers_for(self.map), [self.dynamic, self.static])
+
+            # Page 3 is at another scale and draws the static layer live
+            self.atlas.seekTo(2)
+            self.assertEqual(self.map.layers(), [self.dynamic, self.static])
+        self.atlas.endRender()
+        self.assertEqual(self.map.layers(), [self.dynamic, self.static])
+        self.assertFalse(self.map.keepLayerSet())
+
+    def test_empty_cache(self):
+        with self.cache.applied():
+            self.assertTrue(self.atlas.beginRender())
+            self.atlas.seekTo(0)
+            self.assertEqual(self.map.layers(), [self.dynamic, self.static])
+        self.atlas.endRender()
+
+    def test_scale_key(self):
+        self.assertEqual(scale_key(0.0123456789), scale_key(0.0123456701))
+        self.assertNotEqual(scale_key(0.0123456789), scale_key(0.0123457789))
+
+    def test_static_property(self):
+        self.assertFalse(is_static(self.static))
+        set_static(self.static, True)
+        self.assertTrue(is_static(self.static))
+        set_static(self.static, False)
+        self.assertFalse(is_static(self.static))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+# coding=utf-8
+"""Tests of the bulk shoelace areas."""
+
+import math
+import unittest
+from unittest import mock
+
+from qgis.core import QgsGeometry
+
+from .utilities import get_qgis_app
+from .. import geometry_arrays
+from ..geometry_arrays import polygon_areas
+
+QGIS_APP = get_qgis_app()
+
+WKTS = [
+    'POLYGON((0 0, 4 0, 4 4, 0 4, 0 0))',
+    # Clockwise exterior, counter-clockwise hole
+    'POLYGON((0 0, 0 10, 10 10, 10 0, 0 0), (2 2, 4 2, 4 4, 2 4, 2 2))',
+    'MULTIPOLYGON(((0 0, 1 0, 1 1, 0 0)), ((5 5, 7 5, 7 7, 5 7, 5 5)))',
+    'POLYGON Z((0 0 5, 3 0 5, 3 3 9, 0 3 9, 0 0 5))',
+    'LINESTRING(0 0, 10 10)',
+]
+
+
+class PolygonAreasTest(unittest.TestCase):
+    """polygon_areas matches QgsGeometry.area(), with and without NumPy"""
+
+    def check_areas(self):
+        geometries = [QgsGeometry.fromWkt(wkt) for wkt in WKTS] + [QgsGeometry()]
+        areas = polygon_areas(geometries)
+        for geom, area in zip(geometries[:-1], areas):
+            self.assertAlmostEqual(area, geom.area())
+        self.assertEqual(areas[:4], [16.0, 96.0, 4.5, 9.0])
+        self.assertTrue(math.isnan(areas[-1]))
+
+    def test_areas(self):
+        if geometry_arrays.np is None:
+            self.skipTest('NumPy is not installed')
+        self.check_areas()
+
+    def test_areas_without_numpy(self):
+        with mock.patch.object(geometry_arrays, 'np', None):
+            self.check_areas()
+
+    def test_empty(self):
+        self.assertEqual(polygon_areas([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,259 @@
+# coding=utf-8
+"""Tests of the geometry tool's vertex cache, layer indexes, labels and vertex moves."""
+
+import unittest
+from unittest import mock
+
+from qgis.core import QgsFeature, QgsGeometry, QgsPointXY, QgsRectangle, QgsVectorLayer
+
+from .utilities import get_qgis_app
+from .. import polygon_adjuster
+from ..polygon_adjuster import (
+    DimensionLabelManager, LayerGeometryIndex, UnifiedGeometryEditTool, VertexCache
+)
+
+QGIS_APP, CANVAS, IFACE, PARENT = get_qgis_app()
+
+RING = 'POLYGON((0 0, 10 0, 10 10, 0 10, 0 0))'
+
+
+class VertexCacheTest(unittest.TestCase):
+    """VertexCache.nearest with and without NumPy"""
+
+    def check_nearest(self):
+        cache = VertexCache(QgsGeometry.fromWkt(RING))
+        self.assertEqual(cache.nearest(QgsPointXY(9, 9.5), 2), (2, QgsPointXY(10, 10)))
+        self.assertEqual(cache.nearest(QgsPointXY(0.5, 9), 2), (3, QgsPointXY(0, 10)))
+        # Outside the distance in y only
+        self.assertIsNone(cache.nearest(QgsPointXY(10, 5), 2))
+        self.assertIsNone(cache.nearest(QgsPointXY(20, 20), 2))
+        # The first and closing vertices coincide; the lower index wins
+        self.assertEqual(cache.nearest(QgsPointXY(0.1, 0.1), 1)[0], 0)
+        self.assertEqual(len(cache.ring_points(True)), 4)
+        self.assertEqual(len(cache.ring_points(False)), 5)
+
+    def test_nearest(self):
+        if polygon_adjuster.np is None:
+            self.skipTest('NumPy is not installed')
+        self.check_nearest()
+
+    def test_nearest_without_numpy(self):
+        with mock.patch.object(polygon_adjuster, 'np', None):
+            self.check_nearest()
+
+
+
+class DimensionLabelManagerTest(unittest.TestCase):
+    """Labels are culled to the extent, kept apart and drawn from a pool"""
+
+    def setUp(self):
+        CANVAS.setExtent(QgsRectangle(0, 0, 100, 100))
+        self.labels = DimensionLabelManager(CANVAS)
+
+    def tearDown(self):
+        self.labels.remove()
+
+    def shown(self):
+        return sorted(item.toPlainText() for item in self.labels.items if item.isVisible())
+
+    def test_culled_to_extent(self):
+        self.labels.set_segments([(QgsPointXY(10, 10), 'a', 1), (QgsPointXY(90, 90), 'b', 2),
+                                  (QgsPointXY(500, 500), 'c', 3)])
+        self.assertEqual(self.shown(), ['a', 'b'])
+        self.assertEqual(len(self.labels.items), 2)
+
+    def test_overlap_keeps_longest(self):
+        self.labels.set_segments([(QgsPointXY(50, 50), 'short', 1),
+                                  (QgsPointXY(50.5, 50), 'long', 5)])
+        self.assertEqual(self.shown(), ['long'])
+
+    def test_items_reused(self):
+        self.labels.set_segments([(QgsPointXY(10, 10), 'a', 1), (QgsPointXY(50, 50), 'b', 2),
+                                  (QgsPointXY(90, 90), 'c', 3)])
+        items = list(self.labels.items)
+        self.labels.set_segments([(QgsPointXY(10, 90), 'd', 1)])
+        self.assertEqual(self.labels.items, items)
+        self.assertEqual(self.shown(), ['d'])
+        self.labels.clear()
+        self.assertEqual(self.shown(), [])
+        self.assertFalse(self.labels.connected)
+
+    def test_extent_change_schedules_one_update(self):
+        self.labels.set_segments([(QgsPointXY(10, 10), 'a', 1)])
+        CANVAS.setExtent(QgsRectangle(50, 50, 150, 150))
+        self.assertTrue(self.labels.timer.isActive())
+        self.labels.timer.stop()
+        self.labels.update()
+        self.assertEqual(self.shown(), [])
+
+def polygon_layer(name, *wkts):
+    layer = QgsVectorLayer('Polygon?crs=EPSG:32644', name, 'memory')
+    features = []
+    for wkt in wkts:
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromWkt(wkt))
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def square(x):
+    return f'POLYGON(({x} 0, {x + 10} 0, {x + 10} 10, {x} 10, {x} 0))'
+
+
+class LayerGeometryIndexTest(unittest.TestCase):
+    """The spatial index follows edits and is rebuilt on commit and rollback"""
+
+    def setUp(self):
+        self.layer = polygon_layer('parcels', square(0), square(20))
+        self.index = LayerGeometryIndex(self.layer)
+        self.first, self.second = [feature.id() for feature in self.layer.getFeatures()]
+
+    def tearDown(self):
+        if self.layer.isEditable():
+            self.layer.rollBack()
+
+    def near(self, x):
+        return sorted(fid for fid, _ in self.index.candidates(QgsRectangle(x + 4, 4, x + 6, 6)))
+
+    def add(self, x):
+        feature = QgsFeature(self.layer.fields())
+        feature.setGeometry(QgsGeometry.fromWkt(square(x)))
+        self.assertTrue(self.layer.addFeature(feature))
+        return feature.id()
+
+    def test_candidates(self):
+        self.assertEqual(self.near(0), [self.first])
+        self.assertEqual(self.near(20), [self.second])
+        self.assertEqual(self.near(40), [])
+        fid, geometry = self.index.candidates(QgsRectangle(4, 4, 6, 6))[0]
+        self.assertEqual(geometry.asWkt(), QgsGeometry.fromWkt(square(0)).asWkt())
+
+    def test_edits(self):
+        self.near(0)
+        self.layer.startEditing()
+        added = self.add(40)
+        self.assertEqual(self.near(40), [added])
+        self.layer.changeGeometry(self.first, QgsGeometry.fromWkt(square(60)))
+        self.assertEqual(self.near(0), [])
+        self.assertEqual(self.near(60), [self.first])
+        self.layer.deleteFeature(self.second)
+        self.assertEqual(self.near(20), [])
+
+    def test_commit(self):
+        self.near(0)
+        self.layer.startEditing()
+        self.add(40)
+        self.assertTrue(self.layer.commitChanges())
+        # The added feature has its provider id after the commit
+        committed = [feature.id() for feature in self.layer.getFeatures()
+                     if feature.id() not in (self.first, self.second)]
+        self.assertEqual(self.near(40), committed)
+
+    def test_rollback(self):
+        self.near(0)
+        self.layer.startEditing()
+        self.add(40)
+        self.layer.changeGeometry(self.first, QgsGeometry.fromWkt(square(60)))
+        self.layer.rollBack()
+        self.assertEqual(self.near(0), [self.first])
+        self.assertEqual(self.near(40), [])
+        self.assertEqual(self.near(60), [])
+
+    def test_subset_string(self):
+        self.near(0)
+        self.layer.setSubsetString(f'$id = {self.second}')
+        self.assertEqual(self.near(0), [])
+        self.assertEqual(self.near(20), [self.second])
+
+
+
+class VertexGridTest(unittest.TestCase):
+    """vertices_near finds coincident vertices through the vertex grid"""
+
+    def setUp(self):
+        self.layer = polygon_layer('parcels', square(0), square(10), square(40))
+        self.index = LayerGeometryIndex(self.layer)
+        self.first, self.second, self.third = [feature.id() for feature in self.layer.getFeatures()]
+
+    def tearDown(self):
+        if self.layer.isEditable():
+            self.layer.rollBack()
+
+    def near(self, x, y, tolerance=0.5):
+        return sorted((fid, vertex_index) for fid, vertex_index, _
+                      in self.index.vertices_near(QgsPointXY(x, y), tolerance))
+
+    def test_shared_vertex(self):
+        self.assertEqual(self.near(10.2, 10), [(self.first, 2), (self.second, 3)])
+        # The closing vertex of a ring is found with the first one
+        self.assertEqual(self.near(0, 0), [(self.first, 0), (self.first, 4)])
+        self.assertEqual(self.near(5, 5), [])
+
+    def test_large_tolerance(self):
+        # Wider than the layer, so the occupied cells are scanned instead
+        found = self.near(25, 5, 100)
+        self.assertEqual(len(found), 15)
+
+    def test_geometry_changed(self):
+        self.near(0, 0)
+        self.layer.startEditing()
+        self.layer.changeGeometry(self.second, QgsGeometry.fromWkt(square(11)))
+        self.assertEqual(self.near(10, 10), [(self.first, 2)])
+        self.assertEqual(self.near(11, 10), [(self.second, 3)])
+        self.layer.deleteFeature(self.first)
+        self.assertEqual(self.near(10, 10), [])
+        self.layer.rollBack()
+        self.assertEqual(self.near(10, 10), [(self.first, 2), (self.second, 3)])
+
+class MoveVerticesTest(unittest.TestCase):
+    """moveVertices is one undo command per layer and all or nothing"""
+
+    def setUp(self):
+        self.tool = UnifiedGeometryEditTool(CANVAS)
+        # Two parcels sharing the vertex (10 0)
+        self.left = polygon_layer('left', 'POLYGON((0 0, 10 0, 10 10, 0 10, 0 0))')
+        self.right = polygon_layer('right', 'POLYGON((10 0, 20 0, 20 10, 10 10, 10 0))')
+        self.left.startEditing()
+
+    def tearDown(self):
+        for layer in (self.left, self.right):
+            if layer.isEditable():
+                layer.rollBack()
+
+    def shared_vertex(self):
+        return [{'layer': self.left, 'feature': next(self.left.getFeatures()), 'vertex_index': 1},
+                {'layer': self.right, 'feature': next(self.right.getFeatures()), 'vertex_index': 0}]
+
+    def wkt(self, layer):
+        return next(layer.getFeatures()).geometry().asWkt()
+
+    def test_one_command_per_layer(self):
+        self.right.startEditing()
+        self.tool.moveVertices(self.shared_vertex(), QgsPointXY(11, 1), "Move vertex")
+        for layer in (self.left, self.right):
+            self.assertEqual(layer.undoStack().count(), 1)
+            self.assertIn('11 1', self.wkt(layer))
+            layer.undoStack().undo()
+            self.assertNotIn('11 1', self.wkt(layer))
+
+    def test_failed_layer_undoes_the_others(self):
+        before = self.wkt(self.left)
+        # The right layer is not editable, so its change fails after the left one
+        with self.assertRaises(RuntimeError):
+            self.tool.moveVertices(self.shared_vertex(), QgsPointXY(11, 1), "Move vertex")
+        self.assertEqual(self.wkt(self.left), before)
+        self.assertEqual(self.left.undoStack().index(), 0)
+
+    def test_missing_vertex_changes_nothing(self):
+        self.right.startEditing()
+        vertices = self.shared_vertex()
+        vertices[1]['vertex_index'] = 42
+        with self.assertRaises(RuntimeError):
+            self.tool.moveVertices(vertices, QgsPointXY(11, 1), "Move vertex")
+        self.assertEqual(self.left.undoStack().count(), 0)
+        self.assertEqual(self.right.undoStack().count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+# coding=utf-8
+"""End to end tests of the fused PPM engine on a tiny plot/plinth pair."""
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem, QgsFeature, QgsGeometry, QgsProcessingFeedback, QgsProject,
+    QgsVectorLayer, QgsWkbTypes
+)
+
+from .utilities import get_qgis_app
+from ..ppm_engine import (
+    AREA, BUILTUP_SHAPEFILE, DELIVERABLES, PLOT_SHAPEFILE, PLOT_VERTICES, REF_COL,
+    GeoPackageDeliverableWriter, GeoPackageSink, PPMEngine, SharedEdgeBuilder,
+    ShapefileDeliverableWriter
+)
+
+QGIS_APP = get_qgis_app()
+
+
+def memory_layer(definition, name, rows):
+    layer = QgsVectorLayer(definition, name, 'memory')
+    features = []
+    for wkt, attributes in rows:
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromWkt(wkt))
+        feature.setAttributes(attributes)
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def writer_path(folder, name):
+    return os.path.join(folder, f"{name}.shp")
+
+
+class MessageFeedback(QgsProcessingFeedback):
+    """Keeps the info messages pushed to it"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def pushInfo(self, info):
+        self.messages.append(info)
+
+
+class PPMEngineTest(unittest.TestCase):
+    """PPMEngine.run writes every deliverable from a plot and its plinths"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.plots = memory_layer(
+            'Polygon?crs=EPSG:32644&field=parcel:integer', 'plots',
+            [('POLYGON((0 0, 10 0, 10 10, 0 10, 0 0))', [7])])
+        self.plinths = memory_layer(
+            'Polygon?crs=EPSG:32644&field=name:string', 'plinths',
+            [('POLYGON((2 2, 6 2, 6 6, 2 6, 2 2))', ['house']),
+             # Below MIN_BUILTUP_AREA, dropped from the builtup deliverables
+             ('POLYGON((8 8, 8.5 8, 8.5 8.5, 8 8.5, 8 8))', ['shed'])])
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def run_engine(self, parallel):
+        writer = ShapefileDeliverableWriter(
+            self.folder, self.plots.crs(), QgsProject.instance().transformContext())
+        self.feedback = MessageFeedback()
+        engine = PPMEngine(self.plots, self.plinths, 'parcel', writer, self.feedback)
+        self.assertTrue(engine.run(parallel=parallel))
+        return engine
+
+    def check_outputs(self, engine):
+        self.assertEqual(engine.counts[PLOT_SHAPEFILE], 1)
+        self.assertEqual(engine.counts[PLOT_VERTICES], 5)
+        self.assertEqual(engine.counts[BUILTUP_SHAPEFILE], 1)
+        self.assertEqual(engine.small_parts, 1)
+        self.assertIn(f"{BUILTUP_SHAPEFILE}: 1 parts smaller than 1 sq.m dropped",
+                      self.feedback.messages)
+        for name in DELIVERABLES:
+            self.assertTrue(os.path.exists(writer_path(self.folder, name)), name)
+
+        builtup = QgsVectorLayer(writer_path(self.folder, BUILTUP_SHAPEFILE), 'builtup', 'ogr')
+        self.assertTrue(builtup.isValid())
+        feature = next(builtup.getFeatures())
+        self.assertAlmostEqual(feature[AREA], 16.0, places=2)
+        self.assertEqual(feature[REF_COL], 7)
+        self.assertEqual(feature['name'], 'house')
+
+    def test_run_serial(self):
+        """Serial run writes the plot and builtup deliverables"""
+        self.check_outputs(self.run_engine(parallel=False))
+
+    def test_run_parallel_branches(self):
+        """Plot and plinth branches on two threads give the same output"""
+        self.check_outputs(self.run_engine(parallel=True))
+
+
+class GeoPackageWriterTest(unittest.TestCase):
+    """GeoPackage deliverables are written in batches into one file"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_batches(self):
+        writer = GeoPackageDeliverableWriter(
+            self.folder, QgsCoordinateReferenceSystem('EPSG:32644'),
+            QgsProject.instance().transformContext())
+        fields = memory_layer('Point?field=n:integer', 'points', []).fields()
+        sink = writer.create('points', fields, QgsWkbTypes.Point)
+        total = GeoPackageSink.BATCH_SIZE + 5
+        for n in range(total):
+            sink.add(QgsGeometry.fromWkt(f'POINT({n} 0)'), [n])
+            if n == GeoPackageSink.BATCH_SIZE:
+                # The first batch is already in the file
+                layer = QgsVectorLayer(writer.layer_uri('points'), 'points', 'ogr')
+                self.assertEqual(layer.featureCount(), GeoPackageSink.BATCH_SIZE)
+                del layer
+        sink.close()
+        layer = QgsVectorLayer(writer.layer_uri('points'), 'points', 'ogr')
+        self.assertEqual(layer.featureCount(), total)
+        self.assertEqual(sink.count, total)
+
+
+class ListSink:
+    """Keeps the features a writer adds"""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, geometry, attributes):
+        self.rows.append((geometry, attributes))
+
+
+class WriteVerticesTest(unittest.TestCase):
+    """write_vertices matches QgsGeometry.distanceToVertex and angleAtVertex"""
+
+    def check(self, wkt):
+        geom = QgsGeometry.fromWkt(wkt)
+        sink = ListSink()
+        PPMEngine.write_vertices(sink, geom, ['a'])
+        self.assertEqual(len(sink.rows), len(list(geom.vertices())))
+        for vertex_index, (_, attributes) in enumerate(sink.rows):
+            self.assertEqual(attributes[0], 'a')
+            self.assertEqual(attributes[1], vertex_index)
+            self.assertAlmostEqual(attributes[5], geom.distanceToVertex(vertex_index))
+            self.assertAlmostEqual(
+                attributes[6], math.degrees(geom.angleAtVertex(vertex_index)))
+
+    def test_polygon_with_hole(self):
+        self.check('MULTIPOLYGON(((0 0, 10 0, 12 7, 0 10, 0 0), (2 2, 2 4, 4 4, 2 2)),'
+                   '((20 0, 25 0, 25 5, 20 0)))')
+
+    def test_line(self):
+        self.check('MULTILINESTRING((0 0, 3 4, 3 10), (5 5, 6 6))')
+
+
+class SharedEdgeBuilderTest(unittest.TestCase):
+    """An edge shared by two plots is kept once, with both Ref_Cols"""
+
+    def setUp(self):
+        self.left = QgsGeometry.fromWkt('POLYGON((0 0, 10 0, 10 10, 0 10, 0 0))')
+        self.right = QgsGeometry.fromWkt('POLYGON((10 0, 20 0, 20 10, 10 10, 10 0))')
+
+    def edges(self, builder):
+        return {segment.asWkt(0): attributes for segment, attributes in builder.features()}
+
+    def test_shared_edge(self):
+        builder = SharedEdgeBuilder()
+        builder.add(self.left, 1)
+        builder.add(self.right, 2)
+        edges = self.edges(builder)
+        self.assertEqual(len(edges), 7)
+        self.assertEqual(edges['LineString (10 0, 10 10)'], [1, 10.0, 2])
+        self.assertEqual(edges['LineString (0 0, 10 0)'], [1, 10.0, None])
+        self.assertEqual(edges['LineString (10 0, 20 0)'], [2, 10.0, None])
+
+    def test_context_neighbour(self):
+        builder = SharedEdgeBuilder()
+        builder.add_context(self.right, 2)
+        builder.add(self.left, 1)
+        edges = self.edges(builder)
+        self.assertEqual(len(edges), 4)
+        self.assertEqual(edges['LineString (10 0, 10 10)'], [1, 10.0, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# coding=utf-8
+"""Tests of the incremental PPM regeneration."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from qgis.core import (
+    QgsCoordinateTransformContext, QgsProject, QgsVectorFileWriter, QgsVectorLayer
+)
+
+from .utilities import get_qgis_app
+from .test_ppm_engine import MessageFeedback, memory_layer, writer_path
+from ..ppm_engine import PLOT_SHAPEFILE, PPMEngine, ShapefileDeliverableWriter
+from ..ppm_incremental import IncrementalPPM
+
+QGIS_APP = get_qgis_app()
+
+
+def square(x):
+    return f'POLYGON(({x} 0, {x + 10} 0, {x + 10} 10, {x} 10, {x} 0))'
+
+
+class IncrementalPPMTest(unittest.TestCase):
+    """Only the parcels that changed are regenerated"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.output = os.path.join(self.folder, 'out')
+        os.makedirs(self.output)
+        plots = memory_layer('Polygon?crs=EPSG:32644&field=parcel:integer', 'plots',
+                             [(square(x), [parcel]) for parcel, x in ((1, 0), (2, 100), (3, 200))])
+        self.plot_path = os.path.join(self.folder, 'plots.shp')
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = 'ESRI Shapefile'
+        QgsVectorFileWriter.writeAsVectorFormatV2(
+            plots, self.plot_path, QgsCoordinateTransformContext(), options)
+        self.plinths = memory_layer('Polygon?crs=EPSG:32644&field=name:string', 'plinths',
+                                    [('POLYGON((202 2, 206 2, 206 6, 202 6, 202 2))', ['house'])])
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def run_incremental(self):
+        plots = QgsVectorLayer(self.plot_path, 'plots', 'ogr')
+        feedback = MessageFeedback()
+        writer = ShapefileDeliverableWriter(
+            self.output, plots.crs(), QgsProject.instance().transformContext())
+        engine = PPMEngine(plots, self.plinths, 'parcel', writer, feedback)
+        self.assertTrue(IncrementalPPM(engine, self.folder, {'plot': self.plot_path}).run())
+        return feedback.messages
+
+    def test_deleted_plot_renumbers_fids(self):
+        """Deleting the first plot renumbers the others but regenerates only its parcel"""
+        self.assertTrue(any(m.startswith("Full rebuild") for m in self.run_incremental()))
+
+        plots = QgsVectorLayer(self.plot_path, 'plots', 'ogr')
+        first = next(f.id() for f in plots.getFeatures() if f['parcel'] == 1)
+        self.assertTrue(plots.dataProvider().deleteFeatures([first]))
+        del plots
+
+        messages = self.run_incremental()
+        self.assertIn("Incremental update: regenerating 1 of 2 parcels", messages)
+        result = QgsVectorLayer(writer_path(self.output, PLOT_SHAPEFILE), 'result', 'ogr')
+        self.assertEqual(sorted(f['parcel'] for f in result.getFeatures()), [2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
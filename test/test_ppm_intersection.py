@@ -0,0 +1,90 @@
+# coding=utf-8
+"""Tests of the tile ownership rules of the partitioned plinth/plot intersection."""
+
+import unittest
+
+from qgis.core import QgsFeedback, QgsGeometry
+
+from .utilities import get_qgis_app
+from ..ppm_engine import PlotRecord
+from ..ppm_intersection import PartitionedIntersection, _owns, _tile_range, intersect_tile
+
+QGIS_APP = get_qgis_app()
+
+
+def square(x, y, size):
+    return QgsGeometry.fromWkt(
+        f'POLYGON(({x} {y}, {x + size} {y}, {x + size} {y + size}, {x} {y + size}, {x} {y}))')
+
+
+def wkb(geometry):
+    return bytes(geometry.asWkb())
+
+
+class TileRangeTest(unittest.TestCase):
+    """_tile_range pads by one tile and clamps to the grid"""
+
+    def test_padded(self):
+        self.assertEqual(_tile_range(25, 35, 0, 10, 10), (1, 4))
+
+    def test_clamped(self):
+        self.assertEqual(_tile_range(0, 5, 0, 10, 3), (0, 1))
+        self.assertEqual(_tile_range(25, 30, 0, 10, 3), (1, 2))
+
+
+class OwnsTest(unittest.TestCase):
+    """_owns is half-open except on the last row and column"""
+
+    def test_inner_tile(self):
+        tile = (0, 0, 10, 10, False, False)
+        self.assertTrue(_owns(tile, 0, 0))
+        self.assertTrue(_owns(tile, 9.99, 9.99))
+        self.assertFalse(_owns(tile, 10, 5))
+        self.assertFalse(_owns(tile, 5, 10))
+        self.assertFalse(_owns(tile, -0.01, 5))
+
+    def test_last_tile_owns_far_edge(self):
+        tile = (0, 0, 10, 10, True, True)
+        self.assertTrue(_owns(tile, 10, 10))
+        self.assertFalse(_owns(tile, 10.01, 5))
+
+
+class IntersectTileTest(unittest.TestCase):
+    """intersect_tile reports a pair only in the tile owning its overlap corner"""
+
+    def setUp(self):
+        self.plots = [(1, wkb(square(0, 0, 10))), (2, wkb(square(10, 0, 10)))]
+        # Straddles both plots; the overlap with plot 2 starts at x=10
+        self.plinths = [(0, wkb(square(8, 2, 4)))]
+
+    def test_ownership(self):
+        left = intersect_tile((0, 0, 10, 20, False, True), self.plinths, self.plots, 0)
+        right = intersect_tile((10, 0, 20, 20, True, True), self.plinths, self.plots, 0)
+        self.assertEqual([(order, fid) for order, fid, _, _ in left], [(0, 1)])
+        self.assertEqual([(order, fid) for order, fid, _, _ in right], [(0, 2)])
+        for _, _, _, area in left + right:
+            self.assertAlmostEqual(area, 8.0)
+
+    def test_min_area(self):
+        parts = intersect_tile((0, 0, 20, 20, True, True), self.plinths, self.plots, 10)
+        self.assertEqual(parts, [])
+
+
+class PartitionedIntersectionTest(unittest.TestCase):
+    """Every plinth/plot pair is emitted once, whatever the tiling"""
+
+    def test_no_duplicates(self):
+        plots = {fid: PlotRecord(fid, square(x, y, 10), [fid])
+                 for fid, (x, y) in enumerate(((0, 0), (10, 0), (0, 10), (10, 10)), 1)}
+        # One plinth on the shared corner of all four plots, one inside plot 1
+        plinths = [(None, square(8, 8, 4), []), (None, square(2, 2, 2), [])]
+        overlay = PartitionedIntersection(2, QgsFeedback())
+        pairs = []
+        for tile, tile_plinths, tile_plots in overlay.partition(plinths, plots):
+            pairs.extend((order, fid) for order, fid, _, _ in
+                         intersect_tile(tile, tile_plinths, tile_plots, 0))
+        self.assertEqual(sorted(pairs), [(0, 1), (0, 2), (0, 3), (0, 4), (1, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
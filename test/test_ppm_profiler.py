@@ -0,0 +1,59 @@
+# coding=utf-8
+"""Tests of the per-step PPM profiler."""
+
+import json
+import os
+import tempfile
+import unittest
+
+from .utilities import get_qgis_app
+from .test_ppm_engine import MessageFeedback
+from ..ppm_profiler import PROFILE_FILE, StepProfiler, plugin_version, profile_step
+
+QGIS_APP = get_qgis_app()
+
+
+class StepProfilerTest(unittest.TestCase):
+    """Each step is timed, logged and saved with its feature counts"""
+
+    def setUp(self):
+        self.feedback = MessageFeedback()
+        self.profiler = StepProfiler(self.feedback, 'ppm')
+
+    def test_step(self):
+        with self.profiler.step('read', features_in=3) as record:
+            record.features_out = 2
+        self.assertEqual(self.profiler.call('sum', sum, [1, 2], features_in=2), 3)
+        steps = [record.as_dict() for record in self.profiler.steps]
+        self.assertEqual([step['step'] for step in steps], ['read', 'sum'])
+        self.assertEqual((steps[0]['features_in'], steps[0]['features_out']), (3, 2))
+        self.assertGreaterEqual(steps[0]['wall_s'], 0)
+        self.assertEqual(len(self.feedback.messages), 2)
+        self.assertTrue(self.feedback.messages[0].startswith('[profile] read: '))
+        self.assertTrue(self.feedback.messages[0].endswith('features 3 -> 2'))
+
+    def test_step_recorded_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.profiler.step('fail'):
+                raise ValueError
+        self.assertEqual([record.name for record in self.profiler.steps], ['fail'])
+
+    def test_save(self):
+        with self.profiler.step('read'):
+            pass
+        folder = tempfile.mkdtemp()
+        path = self.profiler.save(folder)
+        self.assertEqual(path, os.path.join(folder, PROFILE_FILE.format(version=plugin_version())))
+        with open(path, encoding='utf-8') as f:
+            profile = json.load(f)
+        self.assertEqual(profile['algorithm'], 'ppm')
+        self.assertEqual([step['step'] for step in profile['steps']], ['read'])
+
+    def test_disabled(self):
+        with profile_step(None, 'read', 4) as record:
+            record.features_out = 1
+        self.assertEqual(record.features_in, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()